@@ -0,0 +1,31 @@
+"""Add sync watermarks for incremental WooCommerce reconciliation
+
+Revision ID: 0023_sync_watermarks
+Revises: 0022_expand_blog_slug_length
+Create Date: 2026-10-19 09:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0023_sync_watermarks"
+down_revision: Union[str, None] = "0022_expand_blog_slug_length"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "sync_watermarks",
+        sa.Column("name", sa.String(length=100), nullable=False),
+        sa.Column("value", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.PrimaryKeyConstraint("name"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("sync_watermarks")
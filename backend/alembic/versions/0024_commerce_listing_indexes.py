@@ -0,0 +1,30 @@
+"""Index commerce listing keyset and painting title search
+
+Revision ID: 0024_commerce_listing_indexes
+Revises: 0023_sync_watermarks
+Create Date: 2026-10-19 10:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0024_commerce_listing_indexes"
+down_revision: Union[str, None] = "0023_sync_watermarks"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index("ix_wc_links_updated_at_id", "wc_links", ["updated_at", "id"], unique=False)
+    op.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    op.execute(
+        sa.text("CREATE INDEX IF NOT EXISTS ix_paintings_title_trgm ON paintings USING gin (lower(title) gin_trgm_ops)")
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP INDEX IF EXISTS ix_paintings_title_trgm"))
+    op.drop_index("ix_wc_links_updated_at_id", table_name="wc_links")
@@ -0,0 +1,33 @@
+"""Add the unlogged rate limit bucket table
+
+Revision ID: 0025_rate_limit_buckets
+Revises: 0024_commerce_listing_indexes
+Create Date: 2026-10-19 12:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0025_rate_limit_buckets"
+down_revision: Union[str, None] = "0024_commerce_listing_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # UNLOGGED: limiter state is disposable, so skip the WAL and replication traffic
+    op.execute(
+        sa.text(
+            "CREATE UNLOGGED TABLE IF NOT EXISTS rate_limit_buckets ("
+            "key text PRIMARY KEY, "
+            "tat double precision NOT NULL"
+            ")"
+        )
+    )
+
+
+def downgrade() -> None:
+    op.execute(sa.text("DROP TABLE IF EXISTS rate_limit_buckets"))
@@ -0,0 +1,26 @@
+"""Add users.token_version
+
+Revision ID: 0026_user_token_version
+Revises: 0025_rate_limit_buckets
+Create Date: 2026-10-19 13:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0026_user_token_version"
+down_revision: Union[str, None] = "0025_rate_limit_buckets"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # a constant default is a metadata-only change on Postgres 11+, no table rewrite
+    op.add_column("users", sa.Column("token_version", sa.Integer(), nullable=False, server_default="0"))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "token_version")
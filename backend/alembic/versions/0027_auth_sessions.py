@@ -0,0 +1,45 @@
+"""Add the auth_sessions table for rotating refresh tokens
+
+Revision ID: 0027_auth_sessions
+Revises: 0026_user_token_version
+Create Date: 2026-10-19 14:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0027_auth_sessions"
+down_revision: Union[str, None] = "0026_user_token_version"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "auth_sessions",
+        sa.Column("id", sa.String(length=32), primary_key=True),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("refresh_jti", sa.String(length=32), nullable=False),
+        sa.Column("previous_jti", sa.String(length=32), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("rotated_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("revoked_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_auth_sessions_user_id", "auth_sessions", ["user_id"])
+    # workers load recent revocations at startup and on every LISTEN reconnect
+    op.create_index(
+        "ix_auth_sessions_revoked_at",
+        "auth_sessions",
+        ["revoked_at"],
+        postgresql_where=sa.text("revoked_at IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_auth_sessions_revoked_at", table_name="auth_sessions")
+    op.drop_index("ix_auth_sessions_user_id", table_name="auth_sessions")
+    op.drop_table("auth_sessions")
@@ -0,0 +1,24 @@
+"""Drop the wc_links (updated_at, id) index now that the commerce listing pages by id
+
+Revision ID: 0028_drop_wc_links_updated_at_index
+Revises: 0027_auth_sessions
+Create Date: 2026-10-19 16:00:00.000000
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "0028_drop_wc_links_updated_at_index"
+down_revision: Union[str, None] = "0027_auth_sessions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_wc_links_updated_at_id", table_name="wc_links")
+
+
+def downgrade() -> None:
+    op.create_index("ix_wc_links_updated_at_id", "wc_links", ["updated_at", "id"], unique=False)
@@ -0,0 +1,121 @@
+"""Per-route concurrency limits for expensive endpoints.
+
+A bulkhead caps how many requests of one kind run at once in a worker, so a batch of
+gallery uploads or a burst of searches cannot take every threadpool thread and DB
+connection from cheap public reads. Routes declare it next to their other dependencies,
+after the auth check so a caller about to be refused never takes a slot:
+
+    @router.post("/upload", dependencies=[Depends(EDITORS), bulkhead("uploads", limit=2)])
+
+Work a sync handler only sometimes does (an LQIP for a changed image) holds a slot from
+``bulkhead_slot`` around just that work instead.
+
+Requests over the limit wait in line for up to ``BULKHEAD_MAX_WAIT_SECONDS``; when the line
+is longer than ``BULKHEAD_MAX_QUEUE`` or the wait runs out they get ``503`` with a
+``Retry-After`` estimated from recent hold times. ``BULKHEAD_LIMITS`` overrides a limit by
+name. Current saturation is at ``GET /metrics/bulkheads``.
+"""
+
+from __future__ import annotations
+
+import math
+import time
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import AbstractContextManager, contextmanager
+
+import anyio
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.params import Depends as DependsParam
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge
+from app.core.resilience import Bulkhead, BulkheadFull
+
+IN_USE = Gauge("bulkhead_in_use", "Requests holding a bulkhead slot.", ("bulkhead",))
+QUEUED = Gauge("bulkhead_queued", "Requests waiting for a bulkhead slot.", ("bulkhead",))
+REJECTED = Counter("bulkhead_rejections_total", "Requests turned away with 503 by a bulkhead.", ("bulkhead", "reason"))
+
+bulkheads: dict[str, Bulkhead] = {}
+
+
+def _compartment(name: str, limit: int) -> Bulkhead:
+    compartment = bulkheads.get(name)
+    if compartment is None:
+        compartment = bulkheads[name] = Bulkhead(
+            name,
+            limit=settings.BULKHEAD_LIMITS.get(name, limit),
+            max_wait=settings.BULKHEAD_MAX_WAIT_SECONDS,
+            max_queue=settings.BULKHEAD_MAX_QUEUE,
+        )
+    return compartment
+
+
+async def _acquire(compartment: Bulkhead) -> None:
+    queued = compartment.full
+    if queued:
+        QUEUED.labels(compartment.name).inc()
+    try:
+        await compartment.acquire()
+    except BulkheadFull as exc:
+        REJECTED.labels(compartment.name, exc.reason).inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Too many concurrent {compartment.name} requests, try again shortly",
+            headers={"Retry-After": str(math.ceil(exc.retry_after))},
+        ) from None
+    finally:
+        if queued:
+            QUEUED.labels(compartment.name).dec()
+    IN_USE.labels(compartment.name).inc()
+
+
+def _release(compartment: Bulkhead, started: float) -> None:
+    compartment.release(time.monotonic() - started)
+    IN_USE.labels(compartment.name).dec()
+
+
+def bulkhead(name: str, *, limit: int, only_if: Callable[[Request], bool] | None = None) -> DependsParam:
+    """Route dependency holding a slot of bulkhead ``name`` while the handler runs.
+
+    Routes sharing a name share the slots. ``only_if`` limits the bulkhead to some requests
+    (e.g. searches on a listing), the rest go straight through. Route dependencies resolve
+    in order and before the handler's own, so list the auth dependency first.
+    """
+    compartment = _compartment(name, limit)
+
+    async def _hold(request: Request) -> AsyncIterator[None]:
+        if only_if is not None and not only_if(request):
+            yield
+            return
+        await _acquire(compartment)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            _release(compartment, started)
+
+    return Depends(_hold)
+
+
+def bulkhead_slot(name: str, *, limit: int) -> Callable[[], AbstractContextManager[None]]:
+    """Context manager factory holding a slot of bulkhead ``name`` from a sync handler.
+
+    The handler runs on a threadpool thread; the slot is taken and given back on the event
+    loop, and a full bulkhead raises the same ``503`` as the route dependency.
+    """
+    compartment = _compartment(name, limit)
+
+    @contextmanager
+    def _hold() -> Iterator[None]:
+        anyio.from_thread.run(_acquire, compartment)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            anyio.from_thread.run_sync(_release, compartment, started)
+
+    return _hold
+
+
+def snapshot() -> dict[str, dict]:
+    return {name: compartment.snapshot() for name, compartment in sorted(bulkheads.items())}
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from fastapi import Depends, Request
+from fastapi.params import Depends as DependsParam
+
+from app.core.config import settings
+
+POLICY_STATE_KEY = "cache_policy"
+SURROGATE_STATE_KEY = "surrogate_keys"
+
+
+@dataclass(frozen=True, slots=True)
+class CachePolicy:
+    public: bool
+    max_age: int = 0
+    s_maxage: int | None = None
+    stale_while_revalidate: int | None = None
+    no_store: bool = False
+
+    def header(self) -> str:
+        if self.no_store:
+            return "private, no-store" if not self.public else "no-store"
+        directives = ["public" if self.public else "private", f"max-age={self.max_age}"]
+        if self.public and self.s_maxage is not None:
+            directives.append(f"s-maxage={self.s_maxage}")
+        if self.stale_while_revalidate is not None:
+            directives.append(f"stale-while-revalidate={self.stale_while_revalidate}")
+        return ", ".join(directives)
+
+
+PUBLIC_CONTENT = CachePolicy(
+    public=True,
+    max_age=settings.CACHE_PUBLIC_MAX_AGE_SECONDS,
+    s_maxage=settings.CACHE_PUBLIC_S_MAXAGE_SECONDS,
+    stale_while_revalidate=settings.CACHE_PUBLIC_STALE_WHILE_REVALIDATE_SECONDS,
+)
+PRIVATE = CachePolicy(public=False, no_store=True)
+
+
+def cache_control(policy: CachePolicy) -> DependsParam:
+    """Router or route dependency declaring the Cache-Control policy for its responses.
+
+    The header is written by CacheHeadersMiddleware, so it also lands on responses a
+    handler builds itself (304s, pre-serialized bodies). Route-level declarations run
+    after the router's and win. Authenticated requests are always answered ``PRIVATE``.
+    """
+
+    def _declare(request: Request) -> None:
+        setattr(request.state, POLICY_STATE_KEY, policy)
+
+    return Depends(_declare)
+
+
+def surrogate_key(*keys: str) -> DependsParam:
+    """Route dependency for responses whose ``Surrogate-Key`` values are known up front."""
+
+    def _tag(request: Request) -> None:
+        tag_response(request, *keys)
+
+    return Depends(_tag)
+
+
+def tag_response(request: Request, *keys: str) -> None:
+    """Add ``Surrogate-Key`` values (e.g. ``blog:12``) so a CDN can purge this response by key."""
+    existing = getattr(request.state, SURROGATE_STATE_KEY, None)
+    if existing is None:
+        existing = set()
+        setattr(request.state, SURROGATE_STATE_KEY, existing)
+    existing.update(keys)
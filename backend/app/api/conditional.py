@@ -0,0 +1,103 @@
+"""Validators and 304 handling for public read endpoints.
+
+Handlers compute an ETag (and, when they know it, a Last-Modified time) as cheaply as
+possible, usually from ``updated_at`` columns, and call :func:`not_modified` before doing
+the expensive part of the request:
+
+    validators = Validators(etag=weak_etag("blog", row.id, row.updated_at), last_modified=row.updated_at)
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    apply_validators(response, validators)
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response, status
+
+
+@dataclass(frozen=True, slots=True)
+class Validators:
+    etag: str
+    last_modified: datetime | None = None
+
+
+def _stamp(part: Any) -> str:
+    if isinstance(part, datetime):
+        return str(_as_utc(part).timestamp())
+    return str(part)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def weak_etag(*parts: Any) -> str:
+    """Weak ETag from row identities and versions, e.g. ``weak_etag("blog", id, updated_at)``."""
+    digest = hashlib.blake2b("|".join(_stamp(part) for part in parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def payload_etag(body: bytes) -> str:
+    """Strong ETag for an exact serialized body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def latest(*values: datetime | None) -> datetime | None:
+    present = [_as_utc(value) for value in values if value is not None]
+    return max(present) if present else None
+
+
+def _opaque(tag: str) -> str:
+    return tag.strip().removeprefix("W/")
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses the weak comparison (RFC 9110 13.1.2)
+    candidates = {_opaque(candidate) for candidate in header.split(",")}
+    return "*" in candidates or _opaque(etag) in candidates
+
+
+def _not_modified_since(header: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    # HTTP dates have one-second resolution
+    return _as_utc(last_modified).replace(microsecond=0) <= since
+
+
+def _headers(validators: Validators) -> dict[str, str]:
+    headers = {"ETag": validators.etag}
+    if validators.last_modified is not None:
+        headers["Last-Modified"] = format_datetime(_as_utc(validators.last_modified), usegmt=True)
+    return headers
+
+
+def is_not_modified(request: Request, validators: Validators) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # If-None-Match wins over If-Modified-Since when both are sent
+        return _etag_matches(if_none_match, validators.etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and validators.last_modified is not None:
+        return _not_modified_since(if_modified_since, validators.last_modified)
+    return False
+
+
+def not_modified(request: Request, validators: Validators) -> Response | None:
+    """Return a ready 304 when the client's copy is current, else ``None``."""
+    if request.method not in {"GET", "HEAD"} or not is_not_modified(request, validators):
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_headers(validators))
+
+
+def apply_validators(response: Response, validators: Validators) -> None:
+    response.headers.update(_headers(validators))
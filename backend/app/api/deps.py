@@ -1,14 +1,22 @@
 from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
 from dataclasses import dataclass
+from functools import partial
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, Query, Security, status
+from fastapi import Depends, HTTPException, Query, Request, Security, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.core import tracing
+from app.core.config import settings
 from app.core.security import decode_token
-from app.db.session import get_db
+from app.db.routing import async_read_session, get_async_read_db, get_read_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User, UserRole
+from app.services.auth import aload_user, load_user
+from app.services.sessions import revoked as revoked_sessions
 
 reusable_oauth2 = HTTPBearer(auto_error=False)
 
@@ -17,10 +25,29 @@ def get_db_session() -> Session:
     yield from get_db()
 
 
-def get_current_user(
-    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
-    db: Session = Depends(get_db_session),
-) -> User:
+async def get_async_db_session() -> AsyncSession:
+    async for db in get_async_db():
+        yield db
+
+
+def get_read_db_session(request: Request) -> Session:
+    yield from get_read_db(request)
+
+
+async def get_async_read_db_session(request: Request) -> AsyncSession:
+    async for db in get_async_read_db(request):
+        yield db
+
+
+AsyncSessionOpener = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+def get_async_read_session_opener(request: Request) -> AsyncSessionOpener:
+    """Defer opening a read session until the handler misses its cache."""
+    return partial(async_read_session, request)
+
+
+def _access_claims(credentials: HTTPAuthorizationCredentials | None) -> tuple[int, dict]:
     if credentials is None or credentials.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
 
@@ -32,6 +59,10 @@ def get_current_user(
     if payload.get("type") != "access":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token type")
 
+    # an in-memory lookup: revocations reach every worker through NOTIFY
+    if payload.get("sid") in revoked_sessions:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Session revoked")
+
     subject = payload.get("sub")
     if subject is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject")
@@ -41,14 +72,50 @@ def get_current_user(
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject") from None
 
-    user = db.get(User, user_id)
+    return user_id, payload
+
+
+def _request_claims(request: Request, credentials: HTTPAuthorizationCredentials | None) -> tuple[int, dict]:
+    # require_roles and get_current_user both read the token; decode and verify it once per request
+    claims = getattr(request.state, "access_claims", None)
+    if claims is None:
+        claims = request.state.access_claims = _access_claims(credentials)
+    return claims
+
+
+def _token_version(payload: dict) -> int:
+    # tokens issued before versioning carry no claim and match version 0
+    version = payload.get("ver", 0)
+    if not isinstance(version, int):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return version
+
+
+def _note_viewer(user: User) -> None:
+    if user.role == UserRole.ADMIN:
+        tracing.reveal_timing()
+
+
+def _load_current_user(db: Session, user_id: int, payload: dict) -> User:
+    with tracing.span("auth", phase="auth"):
+        user = load_user(db, user_id, _token_version(payload))
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    _note_viewer(user)
     return user
 
 
+def get_current_user(
+    request: Request,
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
+    db: Session = Depends(get_db_session),
+) -> User:
+    return _load_current_user(db, *_request_claims(request, credentials))
+
+
 def get_current_user_optional(
+    request: Request,
     credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
     db: Session = Depends(get_db_session),
 ) -> User | None:
@@ -56,13 +123,54 @@ def get_current_user_optional(
         return None
     if credentials.scheme.lower() != "bearer":
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication scheme")
-    return get_current_user(credentials, db)
+    return get_current_user(request, credentials, db)
 
 
-def require_roles(*roles: UserRole) -> Callable[[User], User]:
+async def get_current_user_optional_async(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
+    db: AsyncSession = Depends(get_async_db_session),
+) -> User | None:
+    if credentials is None:
+        return None
+    if credentials.scheme.lower() != "bearer":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid authentication scheme")
+    with tracing.span("auth", phase="auth"):
+        user_id, payload = _access_claims(credentials)
+        user = await aload_user(db, user_id, _token_version(payload))
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    _note_viewer(user)
+    return user
+
+
+def require_roles(*roles: UserRole) -> Callable[..., User]:
+    """Require one of ``roles``.
+
+    With ``ACCESS_TOKEN_ROLE_CLAIMS`` the role is read from the token, so a request
+    without the role is refused before any user lookup. A role change bumps the
+    token version, which revokes tokens carrying the old role. The token is decoded
+    once for both checks, and a user in ``user_cache`` costs no query; the database is
+    only read on a cache miss.
+    """
     role_set = set(roles)
+    role_names = {role.value for role in roles}
+
+    def _check_role_claim(
+        request: Request,
+        credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
+    ) -> None:
+        if not settings.ACCESS_TOKEN_ROLE_CLAIMS or credentials is None:
+            return
+        _, payload = _request_claims(request, credentials)
+        claimed = payload.get("role")
+        if claimed is not None and claimed not in role_names:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
 
-    def _dependency(current_user: User = Depends(get_current_user)) -> User:
+    # dependencies resolve in parameter order, so the claim is checked before the lookup
+    def _dependency(
+        _: None = Depends(_check_role_claim),
+        current_user: User = Depends(get_current_user),
+    ) -> User:
         if current_user.role not in role_set:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions")
         return current_user
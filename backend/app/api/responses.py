@@ -0,0 +1,46 @@
+"""JSON rendering for API responses.
+
+Handlers normally return models and let FastAPI validate the result against
+``response_model``, turn it into plain Python and hand that to the response class. The
+app's default response class is :class:`ORJSONResponse`, so that last step is orjson
+instead of the stdlib encoder.
+
+Handlers that build their result with ``Schema.model_validate(row)`` from ORM objects
+(``from_attributes`` models) have already validated it once. They return
+``serialized(result)`` instead, which writes the JSON straight from the model with
+pydantic-core and skips the second validation pass and the intermediate dicts:
+
+    with tracing.span("serialize", phase="serialize"):
+        return serialized([PageRead.model_validate(page) for page in pages], list[PageRead])
+
+``response_model`` still documents the route. ``RESPONSE_VALIDATE_TRUSTED`` turns the
+second validation back on, e.g. while changing a schema.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import TypeAdapter
+
+from app.core.config import settings
+
+__all__ = ["ORJSONResponse", "serialized"]
+
+_adapters: dict[Any, TypeAdapter] = {}
+
+
+def _adapter(schema: Any) -> TypeAdapter:
+    adapter = _adapters.get(schema)
+    if adapter is None:
+        adapter = _adapters[schema] = TypeAdapter(schema)
+    return adapter
+
+
+def serialized(value: Any, schema: Any = None, *, status_code: int = 200) -> Any:
+    """Pre-serialized response for an already validated model (or a list of them, given ``schema``)."""
+    if settings.RESPONSE_VALIDATE_TRUSTED:
+        return value
+    body = _adapter(schema if schema is not None else type(value)).dump_json(value)
+    return Response(content=body, status_code=status_code, media_type="application/json")
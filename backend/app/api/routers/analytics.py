@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PRIVATE, cache_control
 from app.api.deps import get_db_session, require_roles
 from app.models.user import User, UserRole
 from app.models.site_settings import SiteSettings
@@ -8,7 +9,7 @@ from app.models.painting import Painting
 from app.models.blog import BlogPost
 from app.models.submission import Submission
 
-router = APIRouter(prefix="/analytics", tags=["analytics"])
+router = APIRouter(prefix="/analytics", tags=["analytics"], dependencies=[cache_control(PRIVATE)])
 
 
 @router.get("/summary")
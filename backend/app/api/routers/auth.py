@@ -1,21 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Security, status
+from fastapi.security import HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, get_current_user
+from app.api.cache_policy import PRIVATE, cache_control
+from app.api.deps import get_async_db_session, get_db_session, get_current_user, reusable_oauth2
+from app.core.rate_limit import client_ip
 from app.core.security import decode_token
+from app.models.auth_session import AuthSession
 from app.models.user import User
 from app.schemas.auth import LoginRequest, RefreshRequest, TokenResponse
-from app.services.auth import authenticate_user, issue_tokens_for_user
+from app.services.auth import authenticate_user, load_user, throttle_login
+from app.services.sessions import revoke_session, rotate_session, start_session
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], dependencies=[cache_control(PRIVATE)])
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(data: LoginRequest, db: Session = Depends(get_db_session)) -> TokenResponse:
-    user = authenticate_user(db, email=data.email, password=data.password)
+async def login(request: Request, data: LoginRequest, db: AsyncSession = Depends(get_async_db_session)) -> TokenResponse:
+    await throttle_login(data.email, client_ip(request.scope))
+    user = await authenticate_user(db, email=data.email, password=data.password)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect email or password")
-    tokens = issue_tokens_for_user(user)
+    tokens = await start_session(db, user)
     return TokenResponse(**tokens)
 
 
@@ -38,14 +47,34 @@ def refresh_tokens(data: RefreshRequest, db: Session = Depends(get_db_session))
     except (TypeError, ValueError):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token subject") from None
 
-    user = db.get(User, user_id)
+    session_id, jti, version = payload.get("sid"), payload.get("jti"), payload.get("ver", 0)
+    if not isinstance(session_id, str) or not isinstance(jti, str) or not isinstance(version, int):
+        # issued before sessions existed; these cannot be revoked, so they are no longer accepted
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token")
+
+    user = load_user(db, user_id, version)
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
-    tokens = issue_tokens_for_user(user)
+    tokens = rotate_session(db, user, session_id, jti)
+    if tokens is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token revoked")
     return TokenResponse(**tokens)
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    credentials: Annotated[HTTPAuthorizationCredentials | None, Security(reusable_oauth2)],
+    db: Session = Depends(get_db_session),
+    current_user: User = Depends(get_current_user),
+) -> None:
+    """End the session behind the access token; its refresh and access tokens stop working."""
+    session_id = decode_token(credentials.credentials).get("sid") if credentials is not None else None
+    session = db.get(AuthSession, session_id) if isinstance(session_id, str) else None
+    if session is not None and session.user_id == current_user.id and session.revoked_at is None:
+        revoke_session(db, session)
+
+
 @router.get("/verify")
 def verify_token(current_user: User = Depends(get_current_user)) -> dict:
     return {"user_id": current_user.id, "email": current_user.email}
\ No newline at end of file
@@ -4,13 +4,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
 from app.api.deps import get_db_session, require_roles
+from app.api.responses import serialized
 from app.models.blog_category import BlogCategory
 from app.models.user import User, UserRole
 from app.schemas.blog import BlogCategoryCreate, BlogCategoryRead, BlogCategoryUpdate
 from app.utils.slugify import slugify
 
-router = APIRouter(prefix="/blog-categories", tags=["blog-categories"])
+router = APIRouter(prefix="/blog-categories", tags=["blog-categories"], dependencies=[cache_control(PUBLIC_CONTENT)])
 
 
 def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: Optional[int] = None) -> str:
@@ -34,7 +36,7 @@ def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: Optional[int] =
         index += 1
 
 
-@router.get("", response_model=list[BlogCategoryRead])
+@router.get("", response_model=list[BlogCategoryRead], dependencies=[surrogate_key("blog_categories")])
 def list_categories(
     query: Optional[str] = Query(None, description="Filter by name"),
     db: Session = Depends(get_db_session),
@@ -44,7 +46,7 @@ def list_categories(
         like_term = f"%{query.lower()}%"
         stmt = stmt.filter(BlogCategory.name.ilike(like_term))
     items = stmt.all()
-    return [BlogCategoryRead.model_validate(item) for item in items]
+    return serialized([BlogCategoryRead.model_validate(item) for item in items], list[BlogCategoryRead])
 
 
 @router.post("", response_model=BlogCategoryRead, status_code=status.HTTP_201_CREATED)
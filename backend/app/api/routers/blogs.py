@@ -1,11 +1,17 @@
 from typing import Optional
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import func, select
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_current_user_optional, get_db_session, require_roles
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.bulkheads import bulkhead
+from app.api.cache_policy import PRIVATE, PUBLIC_CONTENT, cache_control, surrogate_key, tag_response
+from app.api.conditional import Validators, apply_validators, latest, not_modified, weak_etag
+from app.api.deps import get_async_read_db_session, get_current_user_optional_async, get_db_session, require_roles
+from app.api.responses import serialized
+from app.core import tracing
 from app.core.config import settings
 from app.models.blog_category import BlogCategory
 from app.models.blog import BlogPost
@@ -13,7 +19,9 @@ from app.models.user import User, UserRole
 from app.schemas.blog import BlogCreate, BlogListResponse, BlogRead, BlogUpdate
 from app.utils.slugify import slugify
 
-router = APIRouter(prefix="/blogs", tags=["blogs"])
+router = APIRouter(prefix="/blogs", tags=["blogs"], dependencies=[cache_control(PUBLIC_CONTENT)])
+# full-text LIKE scans; plain listings are cheap and stay unlimited
+SEARCH_BULKHEAD = bulkhead("search", limit=8, only_if=lambda request: "query" in request.query_params)
 
 
 def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: Optional[int] = None) -> str:
@@ -93,12 +101,14 @@ def _apply_reader_scope(query, current_user: User | None):
     return query
 
 
-def _resolve_category_filter(db: Session, identifier: str) -> BlogCategory:
-    stmt = db.query(BlogCategory)
+def _category_stmt(identifier: str):
     if identifier.isdigit():
-        category = stmt.filter(BlogCategory.id == int(identifier)).first()
-    else:
-        category = stmt.filter(BlogCategory.slug == identifier).first()
+        return select(BlogCategory).where(BlogCategory.id == int(identifier))
+    return select(BlogCategory).where(BlogCategory.slug == identifier)
+
+
+def _resolve_category_filter(db: Session, identifier: str) -> BlogCategory:
+    category = db.execute(_category_stmt(identifier)).scalars().first()
     if not category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
     return category
@@ -120,23 +130,37 @@ def _enforce_author_scope(blog: BlogPost, current_user: User):
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Authors can only modify their posts")
 
 
-@router.get("", response_model=BlogListResponse)
-def list_blogs(
+async def read_latest_blogs(db: AsyncSession, limit: int) -> list[BlogRead]:
+    stmt = _apply_reader_scope(select(BlogPost).options(selectinload(BlogPost.category)), None)
+    items = (await db.execute(stmt.order_by(BlogPost.id.desc()).limit(limit))).scalars().all()
+    with tracing.span("serialize", phase="serialize"):
+        return [BlogRead.model_validate(_normalize_blog(item)) for item in items]
+
+
+async def read_published_blog(db: AsyncSession, blog_id: int) -> BlogRead | None:
+    stmt = _apply_reader_scope(select(BlogPost).options(selectinload(BlogPost.category)), None)
+    blog = (await db.execute(stmt.where(BlogPost.id == blog_id))).scalars().first()
+    with tracing.span("serialize", phase="serialize"):
+        return BlogRead.model_validate(_normalize_blog(blog)) if blog else None
+
+
+@router.get("", response_model=BlogListResponse, dependencies=[surrogate_key("blogs"), SEARCH_BULKHEAD])
+async def list_blogs(
     query: Optional[str] = Query(None),
     tags: Optional[str] = Query(None),
     category: Optional[str] = Query(None, description="Category slug or id"),
     cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> BlogListResponse:
-    stmt = db.query(BlogPost).order_by(BlogPost.id.desc())
+    stmt = select(BlogPost).options(selectinload(BlogPost.category)).order_by(BlogPost.id.desc())
     # Only show published blogs for public access
-    stmt = stmt.filter(BlogPost.published_at.isnot(None))
-    stmt = stmt.filter(BlogPost.published_at <= func.now())
+    stmt = stmt.where(BlogPost.published_at.isnot(None))
+    stmt = stmt.where(BlogPost.published_at <= func.now())
 
     if query:
         like_term = f"%{query.lower()}%"
-        stmt = stmt.filter(
+        stmt = stmt.where(
             func.lower(BlogPost.title).like(like_term)
             | func.lower(BlogPost.content_md).like(like_term)
             | func.lower(func.coalesce(BlogPost.excerpt, "")).like(like_term)
@@ -145,20 +169,22 @@ def list_blogs(
     if tags:
         tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
         if tag_list:
-            stmt = stmt.filter(BlogPost.tags.contains(tag_list))
+            stmt = stmt.where(BlogPost.tags.contains(tag_list))
 
     if category:
-        category_obj = _resolve_category_filter(db, category)
-        stmt = stmt.filter(BlogPost.category_id == category_obj.id)
+        category_obj = (await db.execute(_category_stmt(category))).scalars().first()
+        if not category_obj:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
+        stmt = stmt.where(BlogPost.category_id == category_obj.id)
 
     if cursor:
         try:
             cursor_id = int(cursor)
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
-        stmt = stmt.filter(BlogPost.id > cursor_id)
+        stmt = stmt.where(BlogPost.id > cursor_id)
 
-    items = stmt.limit(limit + 1).all()
+    items = list((await db.execute(stmt.limit(limit + 1))).scalars().all())
     next_cursor = None
     if len(items) > limit:
         next_cursor = str(items[-1].id)
@@ -166,27 +192,50 @@ def list_blogs(
 
     normalized_items = [_normalize_blog(item) for item in items]
 
-    return BlogListResponse(
-        items=[BlogRead.model_validate(item) for item in normalized_items],
-        next_cursor=next_cursor,
-    )
+    with tracing.span("serialize", phase="serialize"):
+        return serialized(
+            BlogListResponse(
+                items=[BlogRead.model_validate(item) for item in normalized_items],
+                next_cursor=next_cursor,
+            )
+        )
 
 
-def _get_blog_by_identifier(db: Session, identifier: str, current_user: User | None) -> BlogPost:
-    stmt = db.query(BlogPost)
+async def _get_blog_by_identifier(db: AsyncSession, identifier: str, current_user: User | None) -> BlogPost:
+    stmt = select(BlogPost).options(selectinload(BlogPost.category))
     stmt = _apply_reader_scope(stmt, current_user)
 
     blog = None
     if identifier.isdigit():
-        blog = stmt.filter(BlogPost.id == int(identifier)).first()
+        blog = (await db.execute(stmt.where(BlogPost.id == int(identifier)))).scalars().first()
     if not blog:
-        blog = stmt.filter(BlogPost.slug == identifier).first()
+        blog = (await db.execute(stmt.where(BlogPost.slug == identifier))).scalars().first()
     if not blog:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog post not found")
     return blog
 
 
-@router.get("/admin", response_model=BlogListResponse)
+async def _probe_blog(db: AsyncSession, identifier: str, current_user: User | None):
+    """Versions of the post and its category, without loading the body."""
+    stmt = select(
+        BlogPost.id,
+        BlogPost.updated_at,
+        BlogPost.category_id,
+        BlogCategory.updated_at.label("category_updated_at"),
+    ).outerjoin(BlogCategory, BlogPost.category_id == BlogCategory.id)
+    stmt = _apply_reader_scope(stmt, current_user)
+
+    row = None
+    if identifier.isdigit():
+        row = (await db.execute(stmt.where(BlogPost.id == int(identifier)))).first()
+    if not row:
+        row = (await db.execute(stmt.where(BlogPost.slug == identifier))).first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog post not found")
+    return row
+
+
+@router.get("/admin", response_model=BlogListResponse, dependencies=[cache_control(PRIVATE)])
 def list_blogs_admin(
     query: Optional[str] = Query(None),
     tags: Optional[str] = Query(None),
@@ -231,13 +280,16 @@ def list_blogs_admin(
 
     normalized_items = [_normalize_blog(item) for item in items]
 
-    return BlogListResponse(
-        items=[BlogRead.model_validate(item) for item in normalized_items],
-        next_cursor=next_cursor,
-    )
+    with tracing.span("serialize", phase="serialize"):
+        return serialized(
+            BlogListResponse(
+                items=[BlogRead.model_validate(item) for item in normalized_items],
+                next_cursor=next_cursor,
+            )
+        )
 
 
-@router.get("/preview/{blog_id}", response_model=BlogRead)
+@router.get("/preview/{blog_id}", response_model=BlogRead, dependencies=[cache_control(PRIVATE)])
 def preview_blog(
     blog_id: int,
     db: Session = Depends(get_db_session),
@@ -247,18 +299,34 @@ def preview_blog(
     if not blog:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Blog post not found")
     blog = _normalize_blog(blog)
-    return BlogRead.model_validate(blog)
+    with tracing.span("serialize", phase="serialize"):
+        return BlogRead.model_validate(blog)
 
 
 @router.get("/{identifier}", response_model=BlogRead)
-def get_blog(
+async def get_blog(
     identifier: str,
-    db: Session = Depends(get_db_session),
-    current_user: User | None = Depends(get_current_user_optional),
-) -> BlogRead:
-    blog = _get_blog_by_identifier(db, identifier, current_user)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_read_db_session),
+    current_user: User | None = Depends(get_current_user_optional_async),
+) -> BlogRead | Response:
+    probe = await _probe_blog(db, identifier, current_user)
+    tag_response(request, f"blog:{probe.id}")
+    if probe.category_id is not None:
+        tag_response(request, f"category:{probe.category_id}")
+    validators = Validators(
+        etag=weak_etag("blog", probe.id, probe.updated_at, probe.category_updated_at),
+        last_modified=latest(probe.updated_at, probe.category_updated_at),
+    )
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    apply_validators(response, validators)
+
+    blog = await _get_blog_by_identifier(db, str(probe.id), current_user)
     blog = _normalize_blog(blog)
-    return BlogRead.model_validate(blog)
+    with tracing.span("serialize", phase="serialize"):
+        return BlogRead.model_validate(blog)
 
 
 @router.post("", response_model=BlogRead, status_code=status.HTTP_201_CREATED)
@@ -305,7 +373,8 @@ def create_blog(
     db.add(blog)
     db.commit()
     db.refresh(blog)
-    return BlogRead.model_validate(blog)
+    with tracing.span("serialize", phase="serialize"):
+        return BlogRead.model_validate(blog)
 
 
 @router.patch("/{blog_id}", response_model=BlogRead)
@@ -368,7 +437,8 @@ def update_blog(
 
     db.commit()
     db.refresh(blog)
-    return BlogRead.model_validate(blog)
+    with tracing.span("serialize", phase="serialize"):
+        return BlogRead.model_validate(blog)
 
 
 @router.delete("/{blog_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -3,13 +3,20 @@ from urllib.parse import urlparse
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
 from app.api.deps import get_db_session, require_roles
+from app.core.cache import TTLCache
+from app.db import changes
 from app.models.biography import Biography
 from app.models.user import User, UserRole
 from app.schemas.biography import BiographyRead, BiographyUpdate
 from app.core.config import settings
 
-router = APIRouter(prefix="/biography", tags=["biography"])
+router = APIRouter(prefix="/biography", tags=["biography"], dependencies=[cache_control(PUBLIC_CONTENT)])
+
+biography_cache: TTLCache[BiographyRead] = changes.bind_cache(
+    TTLCache(ttl=settings.CONTENT_CACHE_TTL_SECONDS, maxsize=1, name="biography"), "biography"
+)
 
 
 def _get_singleton(db: Session) -> Biography:
@@ -89,24 +96,28 @@ def _sanitize_timeline(items: list[dict] | None) -> list[dict[str, str]]:
 @router.get(
     "",
     response_model=BiographyRead,
+    dependencies=[surrogate_key("biography")],
 )
 def get_biography(
     db: Session = Depends(get_db_session),
 ) -> BiographyRead:
-    biography = _get_singleton(db)
-    mutated = False
-    normalized_portrait = _normalize_portrait_url(biography.portrait_url)
-    if normalized_portrait != biography.portrait_url:
-        biography.portrait_url = normalized_portrait
-        mutated = True
-    sanitized_timeline = _sanitize_timeline(biography.timeline or [])
-    if sanitized_timeline != (biography.timeline or []):
-        biography.timeline = sanitized_timeline
-        mutated = True
-    if mutated:
-        db.commit()
-        db.refresh(biography)
-    return BiographyRead.model_validate(biography)
+    def _load() -> BiographyRead:
+        biography = _get_singleton(db)
+        mutated = False
+        normalized_portrait = _normalize_portrait_url(biography.portrait_url)
+        if normalized_portrait != biography.portrait_url:
+            biography.portrait_url = normalized_portrait
+            mutated = True
+        sanitized_timeline = _sanitize_timeline(biography.timeline or [])
+        if sanitized_timeline != (biography.timeline or []):
+            biography.timeline = sanitized_timeline
+            mutated = True
+        if mutated:
+            db.commit()
+            db.refresh(biography)
+        return BiographyRead.model_validate(biography)
+
+    return biography_cache.get_or_load("biography", _load, tags=("biography",))
 
 
 @router.patch(
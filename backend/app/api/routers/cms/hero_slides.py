@@ -1,14 +1,17 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
 from app.api.deps import PaginationParams, get_db_session, get_pagination, require_roles
 from app.models.hero_slide import HeroSlide
 from app.models.user import User, UserRole
 from app.schemas.hero_slide import HeroSlideCreate, HeroSlideListResponse, HeroSlideRead, HeroSlideUpdate
 
-router = APIRouter(prefix="/hero-slides", tags=["hero-slides"])
+router = APIRouter(prefix="/hero-slides", tags=["hero-slides"], dependencies=[cache_control(PUBLIC_CONTENT)])
 
 
 def _sort_clause(sort: str, direction: str):
@@ -25,9 +28,15 @@ def _sort_clause(sort: str, direction: str):
     return column.desc() if direction_normalized == "desc" else column.asc()
 
 
+async def read_hero_slides(db: AsyncSession, limit: int = 20) -> list[HeroSlideRead]:
+    stmt = select(HeroSlide).order_by(HeroSlide.sort.asc(), HeroSlide.id.asc()).limit(limit)
+    return [HeroSlideRead.model_validate(item) for item in (await db.execute(stmt)).scalars().all()]
+
+
 @router.get(
     "",
     response_model=HeroSlideListResponse,
+    dependencies=[surrogate_key("hero_slides")],
 )
 def list_hero_slides(
     pagination: PaginationParams = Depends(get_pagination),
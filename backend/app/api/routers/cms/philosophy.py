@@ -1,14 +1,24 @@
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
 from app.api.deps import get_db_session, require_roles
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import changes
 from app.models.philosophy import Philosophy
 from app.models.user import User, UserRole
 from app.schemas.philosophy import PhilosophyRead, PhilosophyUpdate
 
-router = APIRouter(prefix="/philosophy", tags=["philosophy"])
+router = APIRouter(prefix="/philosophy", tags=["philosophy"], dependencies=[cache_control(PUBLIC_CONTENT)])
+
+philosophy_cache: TTLCache[PhilosophyRead] = changes.bind_cache(
+    TTLCache(ttl=settings.CONTENT_CACHE_TTL_SECONDS, maxsize=1, name="philosophy"), "philosophy"
+)
 
 
 def _get_singleton(db: Session) -> Philosophy:
@@ -62,20 +72,33 @@ def _sanitize_manifesto(items: list[dict] | None) -> list[dict[str, str]]:
     return cleaned
 
 
+async def read_philosophy(db: AsyncSession) -> PhilosophyRead | None:
+    """Read-only counterpart of ``get_philosophy``: no row is created and nothing is written back."""
+    record = (await db.execute(select(Philosophy).order_by(Philosophy.id.asc()).limit(1))).scalars().first()
+    if record is None:
+        return None
+    record.manifesto_blocks = _sanitize_manifesto(record.manifesto_blocks)
+    return PhilosophyRead.model_validate(record)
+
+
 @router.get(
     "",
     response_model=PhilosophyRead,
+    dependencies=[surrogate_key("philosophy")],
 )
 def get_philosophy(
     db: Session = Depends(get_db_session),
 ) -> PhilosophyRead:
-    record = _get_singleton(db)
-    sanitized = _sanitize_manifesto(record.manifesto_blocks)
-    if sanitized != (record.manifesto_blocks or []):
-        record.manifesto_blocks = sanitized
-        db.commit()
-        db.refresh(record)
-    return PhilosophyRead.model_validate(record)
+    def _load() -> PhilosophyRead:
+        record = _get_singleton(db)
+        sanitized = _sanitize_manifesto(record.manifesto_blocks)
+        if sanitized != (record.manifesto_blocks or []):
+            record.manifesto_blocks = sanitized
+            db.commit()
+            db.refresh(record)
+        return PhilosophyRead.model_validate(record)
+
+    return philosophy_cache.get_or_load("philosophy", _load, tags=("philosophy",))
 
 
 @router.patch(
@@ -1,46 +1,80 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session, aliased
 
+from app.api.cache_policy import PRIVATE, cache_control
 from app.api.deps import get_db_session, require_roles
 from app.models.painting import Painting
 from app.models.user import User, UserRole
-from app.models.wc_link import WCLink, WCProductKind
+from app.models.wc_link import WCLink, WCProductKind, WCSyncState
 from app.schemas.commerce import CommerceProduct, CommerceProductList
+from app.services.woocommerce import LISTING_TABLES, listing_cache
 
-router = APIRouter(prefix="/commerce/products", tags=["commerce"])
+router = APIRouter(prefix="/commerce/products", tags=["commerce"], dependencies=[cache_control(PRIVATE)])
+
+
+# Keyed on id, which never changes: webhooks and reconcile runs keep bumping updated_at,
+# and a row moving past the cursor mid-walk would be skipped or listed twice.
+def _decode_cursor(cursor: str) -> int:
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from None
 
 
 @router.get("", response_model=CommerceProductList)
 def list_products(
     kind: WCProductKind | None = Query(None),
     search: str | None = Query(None),
+    stock_status: str | None = Query(None),
+    sync_state: WCSyncState | None = Query(None),
+    cursor: str | None = Query(None),
+    limit: int = Query(100, ge=1, le=100),
     db: Session = Depends(get_db_session),
     _: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR, UserRole.READER)),
 ) -> CommerceProductList:
+    cache_key = (kind, search, stock_status, sync_state, cursor, limit)
+    cached = listing_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = listing_cache.generation
+
     painting_alias = aliased(Painting)
     query = (
-        db.query(WCLink, painting_alias)
+        db.query(WCLink, painting_alias.title)
         .outerjoin(
             painting_alias,
             (WCLink.kind == WCProductKind.PAINTING) & (WCLink.local_fk == painting_alias.id),
         )
-        .order_by(WCLink.updated_at.desc())
+        .order_by(WCLink.id.desc())
     )
 
     if kind:
         query = query.filter(WCLink.kind == kind)
+    if stock_status:
+        query = query.filter(WCLink.stock_status == stock_status)
+    if sync_state:
+        query = query.filter(WCLink.sync_state == sync_state)
 
     if search:
+        # lower(title) LIKE matches the trigram index on paintings (0024_commerce_listing_indexes)
         term = f"%{search.lower()}%"
         if not kind or kind == WCProductKind.PAINTING:
-            query = query.filter(func.lower(func.coalesce(painting_alias.title, "")).like(term))
+            query = query.filter(func.lower(painting_alias.title).like(term))
         else:
             query = query.filter(func.lower(func.coalesce(WCLink.notes, "")).like(term))
 
+    if cursor:
+        query = query.filter(WCLink.id < _decode_cursor(cursor))
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1][0].id)
+
     items: list[CommerceProduct] = []
-    for link, painting in query.all():
-        title = painting.title if painting else None
+    for link, title in rows:
         items.append(
             CommerceProduct(
                 wc_product_id=link.wc_product_id,
@@ -55,4 +89,6 @@ def list_products(
             )
         )
 
-    return CommerceProductList(items=items)
+    result = CommerceProductList(items=items, next_cursor=next_cursor)
+    listing_cache.set(cache_key, result, tags=LISTING_TABLES, generation=generation)
+    return result
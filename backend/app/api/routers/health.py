@@ -2,11 +2,11 @@ from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
 from app.core.rate_limit import limiter
+from app.services.woocommerce import breaker as wc_breaker
 
 router = APIRouter(tags=["health"])
 
 
-@router.get("/health")
-@limiter.limit("30/minute")
+@router.get("/health", dependencies=[limiter.limit("30/minute")])
 def health_check(request: Request) -> JSONResponse:
-    return JSONResponse({"status": "ok"})
+    return JSONResponse({"status": "ok", "integrations": {"woocommerce": wc_breaker.snapshot()}})
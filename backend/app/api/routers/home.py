@@ -0,0 +1,82 @@
+from fastapi import APIRouter, Query, Request, Response
+
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
+from app.api.conditional import Validators, not_modified, payload_etag
+from app.api.routers.blogs import read_latest_blogs, read_published_blog
+from app.api.routers.cms.hero_slides import read_hero_slides
+from app.api.routers.cms.philosophy import read_philosophy
+from app.api.routers.home_sections import read_enabled_sections
+from app.api.routers.paintings import read_published_paintings
+from app.api.routers.site_settings import read_public_settings
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.db import changes
+from app.db.routing import async_read_session
+from app.schemas.home import HomeResponse
+
+router = APIRouter(prefix="/home", tags=["home"], dependencies=[cache_control(PUBLIC_CONTENT)])
+
+# Every table the payload is built from; a commit touching any of them drops the cached payloads.
+HOME_TABLES = (
+    "site_settings",
+    "hero_slides",
+    "home_sections",
+    "blogs",
+    "blog_categories",
+    "paintings",
+    "philosophy",
+)
+
+home_cache: TTLCache[tuple[bytes, str]] = changes.bind_cache(
+    TTLCache(ttl=settings.HOME_CACHE_TTL_SECONDS, maxsize=32, name="home"), *HOME_TABLES
+)
+
+
+async def _load_home(request: Request, blogs_limit: int, paintings_limit: int) -> HomeResponse:
+    # One session, parts in turn: each is a single cheap query, and a session per part
+    # would take six pool connections for every cold /home request.
+    async with async_read_session(request) as db:
+        site_settings = await read_public_settings(db)
+        hero_slides = await read_hero_slides(db)
+        sections = await read_enabled_sections(db)
+        latest_blogs = await read_latest_blogs(db, blogs_limit)
+        paintings = await read_published_paintings(db, paintings_limit)
+        philosophy = await read_philosophy(db)
+
+        featured_blog = None
+        featured_id = site_settings.hero_featured_blog_id
+        if featured_id is not None:
+            featured_blog = next((blog for blog in latest_blogs if blog.id == featured_id), None)
+            if featured_blog is None:
+                featured_blog = await read_published_blog(db, featured_id)
+
+    return HomeResponse(
+        settings=site_settings,
+        hero_slides=hero_slides,
+        sections=sections,
+        latest_blogs=latest_blogs,
+        featured_blog=featured_blog,
+        paintings=paintings,
+        philosophy=philosophy,
+    )
+
+
+@router.get("", response_model=HomeResponse, dependencies=[surrogate_key("home")])
+async def get_home(
+    request: Request,
+    blogs_limit: int = Query(12, ge=1, le=50),
+    paintings_limit: int = Query(12, ge=1, le=50),
+) -> Response:
+    cache_key = (blogs_limit, paintings_limit)
+    cached = home_cache.get(cache_key)
+    if cached is None:
+        generation = home_cache.generation
+        payload = await _load_home(request, blogs_limit, paintings_limit)
+        body = payload.model_dump_json().encode()
+        cached = (body, payload_etag(body))
+        home_cache.set(cache_key, cached, tags=HOME_TABLES, generation=generation)
+
+    body, etag = cached
+    if (unchanged := not_modified(request, Validators(etag=etag))) is not None:
+        return unchanged
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
@@ -1,18 +1,27 @@
 from typing import Optional
 from urllib.parse import urlparse
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, require_roles
+from app.api.cache_policy import PRIVATE, PUBLIC_CONTENT, cache_control, surrogate_key
+from app.api.conditional import Validators, apply_validators, not_modified, weak_etag
+from app.api.deps import AsyncSessionOpener, get_async_read_session_opener, get_db_session, require_roles
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.db import changes
 from app.models.blog_category import BlogCategory
 from app.models.home_section import HomeSection, HomeSectionKind
 from app.models.user import User, UserRole
 from app.schemas.home_section import HomeSectionCreate, HomeSectionRead, HomeSectionUpdate
 
-router = APIRouter(prefix="/home/sections", tags=["home-sections"])
+router = APIRouter(prefix="/home/sections", tags=["home-sections"], dependencies=[cache_control(PUBLIC_CONTENT)])
+
+enabled_sections_cache: TTLCache[list[HomeSectionRead]] = changes.bind_cache(
+    TTLCache(ttl=settings.CONTENT_CACHE_TTL_SECONDS, maxsize=1, name="home_sections"), "home_sections"
+)
 
 
 def _normalize_media_url(value: Optional[str]) -> Optional[str]:
@@ -35,14 +44,13 @@ def _ensure_category(db: Session, category_id: Optional[int]) -> BlogCategory |
     return category
 
 
-@router.get("", response_model=list[HomeSectionRead])
-def list_sections(db: Session = Depends(get_db_session)) -> list[HomeSectionRead]:
-    sections = (
-        db.query(HomeSection)
-        .filter(HomeSection.enabled.is_(True))
+async def read_enabled_sections(db: AsyncSession) -> list[HomeSectionRead]:
+    stmt = (
+        select(HomeSection)
+        .where(HomeSection.enabled.is_(True))
         .order_by(HomeSection.sort_order.asc(), HomeSection.id.asc())
-        .all()
     )
+    sections = (await db.execute(stmt)).scalars().all()
     items = []
     for section in sections:
         if section.image_url:
@@ -51,7 +59,26 @@ def list_sections(db: Session = Depends(get_db_session)) -> list[HomeSectionRead
     return items
 
 
-@router.get("/admin", response_model=list[HomeSectionRead])
+@router.get("", response_model=list[HomeSectionRead], dependencies=[surrogate_key("home_sections")])
+async def list_sections(
+    request: Request,
+    response: Response,
+    open_db: AsyncSessionOpener = Depends(get_async_read_session_opener),
+) -> list[HomeSectionRead] | Response:
+    async def _load() -> list[HomeSectionRead]:
+        async with open_db() as db:
+            return await read_enabled_sections(db)
+
+    sections = await enabled_sections_cache.aget_or_load("enabled", _load, tags=("home_sections",))
+    # no Last-Modified: removing a section changes the list without moving max(updated_at)
+    validators = Validators(etag=weak_etag("home_sections", *(part for s in sections for part in (s.id, s.updated_at))))
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    apply_validators(response, validators)
+    return sections
+
+
+@router.get("/admin", response_model=list[HomeSectionRead], dependencies=[cache_control(PRIVATE)])
 def list_sections_admin(
     db: Session = Depends(get_db_session),
     _: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR)),
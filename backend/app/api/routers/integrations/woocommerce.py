@@ -1,9 +1,12 @@
+import math
 from datetime import datetime, timezone
 from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import case, update
 from sqlalchemy.orm import Session
 
+from app.api.bulkheads import bulkhead
 from app.api.deps import get_db_session, require_roles
 from app.core.config import settings
 from app.models.painting import Painting
@@ -13,12 +16,15 @@ from app.schemas.wc import SyncResponse
 from app.services.woocommerce import (
     WooCommerceAPIError,
     WooCommerceConfigurationError,
+    WooCommerceUnavailableError,
     SyncResult,
     sync_painting,
     verify_webhook_signature,
 )
 
 router = APIRouter(prefix="/integrations/wc", tags=["integrations:woocommerce"])
+# one instance, so the route dependency and the handler share a single check per request
+EDITORS = require_roles(UserRole.ADMIN, UserRole.EDITOR)
 
 
 def _get_or_create_link(db: Session, kind: WCProductKind, local_fk: int | None) -> WCLink:
@@ -40,12 +46,13 @@ def _get_or_create_link(db: Session, kind: WCProductKind, local_fk: int | None)
     "/sync/{local_id}",
     response_model=SyncResponse,
     status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(EDITORS), bulkhead("woocommerce_sync", limit=2)],
 )
 def trigger_sync(
     local_id: int,
     kind: WCProductKind = Query(..., description="Product kind to sync."),
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR)),
+    current_user: User = Depends(EDITORS),
 ) -> SyncResponse:
     try:
         if kind == WCProductKind.PAINTING:
@@ -58,6 +65,12 @@ def trigger_sync(
             raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Book sync not yet implemented")
     except WooCommerceConfigurationError as exc:
         raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)) from exc
+    except WooCommerceUnavailableError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=exc.detail,
+            headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+        ) from exc
     except WooCommerceAPIError as exc:
         if kind == WCProductKind.PAINTING:
             link = _get_or_create_link(db, kind, local_id)
@@ -142,20 +155,47 @@ async def order_webhook(
     if not order_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Missing order id")
 
-    line_items = payload.get("line_items", [])
-    now = datetime.now(timezone.utc)
-    for item in line_items:
+    quantities: dict[int, int] = {}
+    for item in payload.get("line_items", []):
         product_id = item.get("product_id")
         if not product_id:
             continue
-        link = db.query(WCLink).filter(WCLink.wc_product_id == product_id).first()
-        if link:
-            link.notes = f"Updated by order #{order_id}"
-            link.last_synced_at = now
+        quantities[product_id] = quantities.get(product_id, 0) + _to_int(item.get("quantity"))
+
+    if quantities:
+        values: dict[str, Any] = {
+            "notes": f"Updated by order #{order_id}",
+            "last_synced_at": datetime.now(timezone.utc),
+        }
+        # Only a newly created order consumes stock; later order.updated deliveries
+        # would otherwise decrement the same line items again.
+        topic = request.headers.get("x-wc-webhook-topic")
+        if topic in (None, "order.created"):
+            ordered = case(quantities, value=WCLink.wc_product_id, else_=0)
+            sold_out = WCLink.stock_quantity <= ordered
+            values["stock_quantity"] = case(
+                (WCLink.stock_quantity.is_(None), None),
+                (sold_out, 0),
+                else_=WCLink.stock_quantity - ordered,
+            )
+            values["stock_status"] = case((sold_out, "outofstock"), else_=WCLink.stock_status)
+        db.execute(
+            update(WCLink)
+            .where(WCLink.wc_product_id.in_(quantities))
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
     db.commit()
     return {"status": "accepted"}
 
 
+def _to_int(value: Any) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
 def _to_float(value: Any) -> float | None:
     if value is None or value == "":
         return None
@@ -7,13 +7,20 @@ from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
 from PIL import Image
 from sqlalchemy.orm import Session
 
+from app.api.bulkheads import bulkhead
+from app.api.cache_policy import PRIVATE, cache_control
 from app.api.deps import get_db_session, require_roles
 from app.core.config import settings
+from app.core.rate_limit import limiter
+from app.core.storage import content_hashed, precompress_file
 from app.models.media import MediaFile
 from app.models.user import User, UserRole
 from app.schemas.media import MediaFileRead
+from app.utils import image_processing
 
-router = APIRouter(prefix="/media", tags=["media"])
+router = APIRouter(prefix="/media", tags=["media"], dependencies=[cache_control(PRIVATE)])
+# one instance, so the route dependency and the handler share a single check per request
+EDITORS = require_roles(UserRole.ADMIN, UserRole.EDITOR)
 
 ALLOWED_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg"}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
@@ -85,12 +92,17 @@ def _sanitize_filename(filename: str) -> str:
     return name or f"upload{Path(filename).suffix or ''}"
 
 
-@router.post("/upload", response_model=MediaFileRead)
+@router.post(
+    "/upload",
+    response_model=MediaFileRead,
+    # auth before the bulkhead: a refused caller never takes an upload slot
+    dependencies=[limiter.limit("30/minute", per="user"), Depends(EDITORS), bulkhead("uploads", limit=2)],
+)
 async def upload_file(
     file: UploadFile = File(...),
     resize: bool = True,
     db: Session = Depends(get_db_session),
-    current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR)),
+    current_user: User = Depends(EDITORS),
 ) -> MediaFileRead:
     """Upload and process media file into the local media folder."""
 
@@ -120,8 +132,13 @@ async def upload_file(
         destination.write(content)
 
     if resize and file_ext in {".jpg", ".jpeg", ".png", ".gif", ".webp"}:
-        file_path = _process_image(file_path)
-        safe_filename = file_path.name
+        file_path = await image_processing.run("resize", _process_image, file_path)
+    # hashing and compressing read the whole file; keep them off the event loop too
+    if settings.MEDIA_CONTENT_HASHED_NAMES:
+        file_path = await image_processing.run("hash", content_hashed, file_path)
+    if file_ext == ".svg":
+        await image_processing.run("precompress", precompress_file, file_path)
+    safe_filename = file_path.name
 
     file_url = f"{settings.MEDIA_BASE_URL.rstrip('/')}/{safe_filename}"
 
@@ -174,8 +191,8 @@ def delete_media_file(
 
     if stored_filename:
         file_path = _ensure_media_dir() / stored_filename
-        if file_path.exists():
-            file_path.unlink()
+        for path in (file_path, file_path.with_name(f"{file_path.name}.br"), file_path.with_name(f"{file_path.name}.gz")):
+            path.unlink(missing_ok=True)
 
     db.delete(media_file)
     db.commit()
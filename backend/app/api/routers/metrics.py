@@ -0,0 +1,78 @@
+import hmac
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+
+from app.api import bulkheads
+from app.api.cache_policy import PRIVATE, cache_control
+from app.api.deps import require_roles
+from app.core.config import settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.db.pool import pool_snapshot
+from app.db.routing import replicas
+from app.db.session import async_engine, engine
+from app.db.slow_queries import slow_query_log
+from app.models.user import User, UserRole
+
+router = APIRouter(prefix="/metrics", tags=["metrics"], dependencies=[cache_control(PRIVATE)])
+
+
+def _require_scrape_token(request: Request) -> None:
+    # scrapers authenticate with a static token; without one configured the endpoint is hidden
+    expected = settings.METRICS_SCRAPE_TOKEN
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), expected.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid scrape token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+@router.get("", include_in_schema=False, dependencies=[Depends(_require_scrape_token)])
+def prometheus_metrics() -> Response:
+    """Every worker's metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+@router.get("/db-pool")
+def db_pool_metrics(_: User = Depends(require_roles(UserRole.ADMIN))) -> dict[str, dict]:
+    metrics = {
+        "sync": pool_snapshot(engine.pool),
+        "async": pool_snapshot(async_engine.sync_engine.pool),
+    }
+    for index, replica in enumerate(replicas.replicas):
+        metrics[f"replica_{index}"] = {
+            "host": replica.engine.url.host,
+            "breaker": replica.breaker.snapshot(),
+            "sync": pool_snapshot(replica.engine.pool),
+            "async": pool_snapshot(replica.async_engine.sync_engine.pool),
+        }
+    return metrics
+
+
+@router.get("/bulkheads")
+def bulkhead_metrics(_: User = Depends(require_roles(UserRole.ADMIN))) -> dict[str, dict]:
+    """Slots in use, queue length and rejections per bulkhead in this worker."""
+    return bulkheads.snapshot()
+
+
+@router.get("/slow-queries")
+def slow_queries(
+    order_by: Literal["total_ms", "max_ms", "calls"] = Query("total_ms"),
+    limit: int = Query(20, ge=1, le=200),
+    _: User = Depends(require_roles(UserRole.ADMIN)),
+) -> dict:
+    return {
+        "enabled": settings.DB_SLOW_QUERY_LOG_ENABLED,
+        "threshold_ms": settings.DB_SLOW_QUERY_THRESHOLD_MS,
+        "fingerprints": len(slow_query_log),
+        "items": slow_query_log.ranking(order_by=order_by, limit=limit),
+    }
+
+
+@router.delete("/slow-queries", status_code=status.HTTP_204_NO_CONTENT)
+def reset_slow_queries(_: User = Depends(require_roles(UserRole.ADMIN))) -> None:
+    slow_query_log.reset()
@@ -2,14 +2,16 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
-from app.api.deps import get_current_user_optional, get_db_session, require_roles
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
+from app.api.deps import get_current_user_optional, get_db_session, get_read_db_session, require_roles
+from app.api.responses import serialized
 from app.models.museum_artifact import MuseumArtifact
 from app.models.museum_room import MuseumRoom
 from app.models.painting import Painting
 from app.models.user import User, UserRole
 from app.schemas.museum import MuseumArtifactCreate, MuseumArtifactRead, MuseumArtifactUpdate
 
-router = APIRouter(prefix="/museum/artifacts", tags=["museum-artifacts"])
+router = APIRouter(prefix="/museum/artifacts", tags=["museum-artifacts"], dependencies=[cache_control(PUBLIC_CONTENT)])
 
 
 def _artifact_with_painting(db: Session, artifact_id: int) -> MuseumArtifact:
@@ -24,11 +26,11 @@ def _artifact_with_painting(db: Session, artifact_id: int) -> MuseumArtifact:
     return artifact
 
 
-@router.get("", response_model=list[MuseumArtifactRead])
+@router.get("", response_model=list[MuseumArtifactRead], dependencies=[surrogate_key("museum")])
 def list_artifacts(
     room_id: int | None = Query(default=None),
     painting_id: int | None = Query(default=None),
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
     current_user: User | None = Depends(get_current_user_optional),
 ) -> list[MuseumArtifactRead]:
     query = db.query(MuseumArtifact).options(joinedload(MuseumArtifact.painting))
@@ -43,7 +45,7 @@ def list_artifacts(
     if painting_id is not None:
         query = query.filter(MuseumArtifact.painting_id == painting_id)
     artifacts = query.order_by(MuseumArtifact.sort.asc(), MuseumArtifact.id.asc()).all()
-    return [MuseumArtifactRead.model_validate(artifact) for artifact in artifacts]
+    return serialized([MuseumArtifactRead.model_validate(artifact) for artifact in artifacts], list[MuseumArtifactRead])
 
 
 def _ensure_relations(db: Session, room_id: int, painting_id: int) -> None:
@@ -2,13 +2,15 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, require_roles
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
+from app.api.deps import get_db_session, get_read_db_session, require_roles
+from app.api.responses import serialized
 from app.models.museum_room import MuseumRoom
 from app.models.user import User, UserRole
 from app.schemas.museum import MuseumRoomCreate, MuseumRoomRead, MuseumRoomUpdate
 from app.utils.slugify import slugify
 
-router = APIRouter(prefix="/museum/rooms", tags=["museum-rooms"])
+router = APIRouter(prefix="/museum/rooms", tags=["museum-rooms"], dependencies=[cache_control(PUBLIC_CONTENT)])
 
 
 def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: int | None = None) -> str:
@@ -31,12 +33,12 @@ def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: int | None = No
         index += 1
 
 
-@router.get("", response_model=list[MuseumRoomRead])
+@router.get("", response_model=list[MuseumRoomRead], dependencies=[surrogate_key("museum")])
 def list_rooms(
-    db: Session = Depends(get_db_session),
+    db: Session = Depends(get_read_db_session),
 ) -> list[MuseumRoomRead]:
     rooms = db.query(MuseumRoom).order_by(MuseumRoom.sort.asc(), MuseumRoom.id.asc()).all()
-    return [MuseumRoomRead.model_validate(room) for room in rooms]
+    return serialized([MuseumRoomRead.model_validate(room) for room in rooms], list[MuseumRoomRead])
 
 
 @router.post("", response_model=MuseumRoomRead, status_code=status.HTTP_201_CREATED)
@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.api.deps import get_db_session, require_roles
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+
+from app.api.cache_policy import PRIVATE, PUBLIC_CONTENT, cache_control, surrogate_key, tag_response
+from app.api.conditional import Validators, not_modified, payload_etag
+from app.api.deps import get_async_read_db_session, get_db_session, get_read_db_session, require_roles
+from app.api.responses import serialized
 from app.models.page import Page, PageSection
 from app.models.user import User, UserRole
 from app.schemas.page import (
@@ -14,38 +19,48 @@ from app.schemas.page import (
     PageWithSections,
 )
 
-router = APIRouter(prefix="/pages", tags=["pages"])
+router = APIRouter(prefix="/pages", tags=["pages"], dependencies=[cache_control(PUBLIC_CONTENT)])
 
 
-@router.get("", response_model=list[PageRead])
-def list_pages(db: Session = Depends(get_db_session)) -> list[PageRead]:
+@router.get("", response_model=list[PageRead], dependencies=[surrogate_key("pages")])
+def list_pages(db: Session = Depends(get_read_db_session)) -> list[PageRead]:
     pages = (
         db.query(Page)
         .filter(Page.is_active.is_(True))
         .order_by(Page.created_at.asc())
         .all()
     )
-    return [PageRead.model_validate(p) for p in pages]
+    return serialized([PageRead.model_validate(p) for p in pages], list[PageRead])
 
 
-@router.get("/{slug}", response_model=PageWithSections)
-def get_page(slug: str, db: Session = Depends(get_db_session)) -> PageWithSections:
-    page = (
-        db.query(Page)
-        .filter(Page.slug == slug, Page.is_active.is_(True))
-        .first()
+@router.get("/{slug}", response_model=PageWithSections, dependencies=[surrogate_key("page_sections")])
+async def get_page(
+    slug: str,
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db_session),
+) -> PageWithSections | Response:
+    stmt = (
+        select(Page)
+        .options(selectinload(Page.sections))
+        .where(Page.slug == slug, Page.is_active.is_(True))
     )
+    page = (await db.execute(stmt)).scalars().first()
     if not page:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Page not found")
+    tag_response(request, f"page:{page.id}")
     # sections ordered by order asc
-    _ = page.sections
     page.sections.sort(key=lambda s: s.order)
-    return PageWithSections.model_validate(page)
+    # page_sections has no updated_at to probe, so the validator is a hash of the body
+    body = PageWithSections.model_validate(page).model_dump_json().encode()
+    validators = Validators(etag=payload_etag(body))
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    return Response(content=body, media_type="application/json", headers={"ETag": validators.etag})
 
 
 # Admin endpoints
 
-@router.get("/admin", response_model=list[PageRead])
+@router.get("/admin", response_model=list[PageRead], dependencies=[cache_control(PRIVATE)])
 def list_pages_admin(
     db: Session = Depends(get_db_session),
     _: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR)),
@@ -54,7 +69,7 @@ def list_pages_admin(
     return [PageRead.model_validate(p) for p in pages]
 
 
-@router.get("/admin/slug/{slug}", response_model=PageWithSections)
+@router.get("/admin/slug/{slug}", response_model=PageWithSections, dependencies=[cache_control(PRIVATE)])
 def get_page_admin_by_slug(
     slug: str,
     db: Session = Depends(get_db_session),
@@ -140,7 +155,7 @@ def delete_page(
     db.commit()
 
 
-@router.get("/admin/{page_id}/sections", response_model=list[PageSectionRead])
+@router.get("/admin/{page_id}/sections", response_model=list[PageSectionRead], dependencies=[cache_control(PRIVATE)])
 def list_sections(
     page_id: int,
     db: Session = Depends(get_db_session),
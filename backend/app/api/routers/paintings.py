@@ -1,20 +1,38 @@
 from datetime import datetime, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_current_user_optional, get_db_session, require_roles
+from app.api.bulkheads import bulkhead, bulkhead_slot
+from app.api.cache_policy import PRIVATE, PUBLIC_CONTENT, cache_control, surrogate_key, tag_response
+from app.api.conditional import Validators, apply_validators, not_modified, weak_etag
+from app.api.deps import (
+    get_async_read_db_session,
+    get_current_user_optional,
+    get_db_session,
+    get_read_db_session,
+    require_roles,
+)
+from app.api.responses import serialized
+from app.core import tracing
 from app.models.painting import Painting
 from app.models.museum_artifact import MuseumArtifact
 from app.models.wc_link import WCLink, WCProductKind, WCSyncState
 from app.models.user import User, UserRole
 from app.schemas.painting import PaintingCreate, PaintingListResponse, PaintingRead, PaintingUpdate
+from app.utils import image_processing
 from app.utils.lqip import generate_lqip
 from app.utils.slugify import slugify
 
-router = APIRouter(prefix="/paintings", tags=["paintings"])
+router = APIRouter(prefix="/paintings", tags=["paintings"], dependencies=[cache_control(PUBLIC_CONTENT)])
+# shares its slots with blog search
+SEARCH_BULKHEAD = bulkhead("search", limit=8, only_if=lambda request: "query" in request.query_params)
+# writes block a threadpool thread on the image pool while the LQIP is generated; only
+# writes that set a new image take a slot
+LQIP_SLOT = bulkhead_slot("lqip", limit=2)
 
 
 def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: Optional[int] = None) -> str:
@@ -43,7 +61,8 @@ def _ensure_unique_slug(db: Session, base_slug: str, exclude_id: Optional[int] =
 def _maybe_generate_lqip(image_url: Optional[str]) -> Optional[str]:
     if not image_url:
         return None
-    return generate_lqip(image_url)
+    with LQIP_SLOT():
+        return image_processing.submit("lqip", generate_lqip, image_url).result()
 
 
 def _normalize_timestamp(value: Optional[datetime]) -> Optional[datetime]:
@@ -61,52 +80,61 @@ def _apply_reader_scope(query, current_user: User | None):
     return query
 
 
-@router.get("", response_model=PaintingListResponse)
-def list_paintings(
+async def read_published_paintings(db: AsyncSession, limit: int) -> list[PaintingRead]:
+    stmt = _apply_reader_scope(select(Painting), None).order_by(Painting.id.asc()).limit(limit)
+    with tracing.span("serialize", phase="serialize"):
+        return [PaintingRead.model_validate(item) for item in (await db.execute(stmt)).scalars().all()]
+
+
+@router.get("", response_model=PaintingListResponse, dependencies=[surrogate_key("paintings"), SEARCH_BULKHEAD])
+async def list_paintings(
     query: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
     medium: Optional[str] = Query(None),
     tags: Optional[str] = Query(None),
     cursor: Optional[str] = Query(None),
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db_session),
+    db: AsyncSession = Depends(get_async_read_db_session),
 ) -> PaintingListResponse:
-    stmt = db.query(Painting).order_by(Painting.id.asc())
+    stmt = select(Painting).order_by(Painting.id.asc())
     # Only show published paintings for public access
-    stmt = stmt.filter(Painting.published_at.isnot(None))
-    stmt = stmt.filter(Painting.published_at <= func.now())
+    stmt = stmt.where(Painting.published_at.isnot(None))
+    stmt = stmt.where(Painting.published_at <= func.now())
 
     if query:
         like_term = f"%{query.lower()}%"
-        stmt = stmt.filter(
+        stmt = stmt.where(
             func.lower(Painting.title).like(like_term) | func.lower(Painting.description).like(like_term)
         )
     if year is not None:
-        stmt = stmt.filter(Painting.year == year)
+        stmt = stmt.where(Painting.year == year)
     if medium:
-        stmt = stmt.filter(func.lower(Painting.medium) == medium.lower())
+        stmt = stmt.where(func.lower(Painting.medium) == medium.lower())
     if tags:
         tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
         if tag_list:
-            stmt = stmt.filter(Painting.tags.contains(tag_list))
+            stmt = stmt.where(Painting.tags.contains(tag_list))
 
     if cursor:
         try:
             cursor_id = int(cursor)
         except ValueError:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
-        stmt = stmt.filter(Painting.id > cursor_id)
+        stmt = stmt.where(Painting.id > cursor_id)
 
-    items = stmt.limit(limit + 1).all()
+    items = list((await db.execute(stmt.limit(limit + 1))).scalars().all())
     next_cursor = None
     if len(items) > limit:
         next_cursor = str(items[-1].id)
         items = items[:limit]
 
-    return PaintingListResponse(
-        items=[PaintingRead.model_validate(item) for item in items],
-        next_cursor=next_cursor,
-    )
+    with tracing.span("serialize", phase="serialize"):
+        return serialized(
+            PaintingListResponse(
+                items=[PaintingRead.model_validate(item) for item in items],
+                next_cursor=next_cursor,
+            )
+        )
 
 
 def _get_painting_by_identifier(db: Session, identifier: str, current_user: User | None) -> Painting:
@@ -123,7 +151,7 @@ def _get_painting_by_identifier(db: Session, identifier: str, current_user: User
     return painting
 
 
-@router.get("/admin", response_model=PaintingListResponse)
+@router.get("/admin", response_model=PaintingListResponse, dependencies=[cache_control(PRIVATE)])
 def list_paintings_admin(
     query: Optional[str] = Query(None),
     year: Optional[int] = Query(None),
@@ -164,20 +192,39 @@ def list_paintings_admin(
         next_cursor = str(items[-1].id)
         items = items[:limit]
 
-    return PaintingListResponse(
-        items=[PaintingRead.model_validate(item) for item in items],
-        next_cursor=next_cursor,
-    )
+    with tracing.span("serialize", phase="serialize"):
+        return PaintingListResponse(
+            items=[PaintingRead.model_validate(item) for item in items],
+            next_cursor=next_cursor,
+        )
 
 
 @router.get("/{identifier}", response_model=PaintingRead)
 def get_painting(
     identifier: str,
-    db: Session = Depends(get_db_session),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db_session),
     current_user: User | None = Depends(get_current_user_optional),
-) -> PaintingRead:
-    painting = _get_painting_by_identifier(db, identifier, current_user)
-    return PaintingRead.model_validate(painting)
+) -> PaintingRead | Response:
+    probe = _apply_reader_scope(db.query(Painting.id, Painting.updated_at), current_user)
+    row = None
+    if identifier.isdigit():
+        row = probe.filter(Painting.id == int(identifier)).first()
+    if not row:
+        row = probe.filter(Painting.slug == identifier).first()
+    if not row:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Painting not found")
+
+    tag_response(request, f"painting:{row.id}")
+    validators = Validators(etag=weak_etag("painting", row.id, row.updated_at), last_modified=row.updated_at)
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    apply_validators(response, validators)
+
+    painting = _get_painting_by_identifier(db, str(row.id), current_user)
+    with tracing.span("serialize", phase="serialize"):
+        return PaintingRead.model_validate(painting)
 
 
 @router.post("", response_model=PaintingRead, status_code=status.HTTP_201_CREATED)
@@ -215,7 +262,8 @@ def create_painting(
     db.commit()
     db.refresh(painting)
 
-    return PaintingRead.model_validate(painting)
+    with tracing.span("serialize", phase="serialize"):
+        return PaintingRead.model_validate(painting)
 
 
 @router.patch("/{identifier}", response_model=PaintingRead)
@@ -249,7 +297,8 @@ def update_painting(
 
     db.commit()
     db.refresh(painting)
-    return PaintingRead.model_validate(painting)
+    with tracing.span("serialize", phase="serialize"):
+        return PaintingRead.model_validate(painting)
 
 
 @router.delete("/{identifier}", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,17 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.api.deps import get_db_session, require_roles
+from app.api.cache_policy import PUBLIC_CONTENT, cache_control, surrogate_key
+from app.api.conditional import Validators, apply_validators, not_modified, weak_etag
+from app.api.deps import AsyncSessionOpener, get_async_read_session_opener, get_db_session, require_roles
+from app.core import config
+from app.core.cache import TTLCache
 from app.core.rate_limit import limiter
+from app.db import changes
+from app.db.session import AsyncSessionLocal
 from app.models.site_settings import SiteSettings
 from app.models.user import User, UserRole
 from app.schemas.site_settings import SiteSettingsRead, SiteSettingsUpdate
 
-router = APIRouter(prefix="/site/settings", tags=["site-settings"])
+router = APIRouter(prefix="/site/settings", tags=["site-settings"], dependencies=[cache_control(PUBLIC_CONTENT)])
+
+public_settings_cache: TTLCache[SiteSettingsRead] = changes.bind_cache(
+    TTLCache(ttl=config.settings.CONTENT_CACHE_TTL_SECONDS, maxsize=1, name="site_settings"), "site_settings"
+)
+
+
+def _find_settings(db: Session) -> SiteSettings | None:
+    return db.query(SiteSettings).order_by(SiteSettings.id.asc()).first()
 
 
 def _get_or_create_settings(db: Session) -> SiteSettings:
-    settings = db.query(SiteSettings).order_by(SiteSettings.id.asc()).first()
+    settings = _find_settings(db)
     if settings:
         return settings
     settings = SiteSettings()
@@ -21,18 +36,50 @@ def _get_or_create_settings(db: Session) -> SiteSettings:
     return settings
 
 
-@router.get("", response_model=SiteSettingsRead)
-@limiter.limit("30/minute")
-def get_settings(request: Request, response: Response, db: Session = Depends(get_db_session)) -> SiteSettingsRead:
+def _load_public_settings(db: Session) -> SiteSettings:
     settings = _get_or_create_settings(db)
     # normalize nav_links shape (older rows may store an object)
     if isinstance(settings.nav_links, dict):
         settings.nav_links = []
         db.commit()
         db.refresh(settings)
+    return settings
+
+
+async def read_public_settings(db: AsyncSession) -> SiteSettingsRead:
+    settings = await db.run_sync(_find_settings)
+    if settings is None or isinstance(settings.nav_links, dict):
+        # creating or repairing the row is a write, which a replica session cannot take
+        async with AsyncSessionLocal() as primary:
+            settings = await primary.run_sync(_load_public_settings)
     return SiteSettingsRead.model_validate(settings)
 
 
+@router.get(
+    "",
+    response_model=SiteSettingsRead,
+    dependencies=[surrogate_key("site_settings"), limiter.limit("30/minute")],
+)
+async def get_settings(
+    request: Request,
+    response: Response,
+    open_db: AsyncSessionOpener = Depends(get_async_read_session_opener),
+) -> SiteSettingsRead | Response:
+    async def _load() -> SiteSettingsRead:
+        async with open_db() as db:
+            return await read_public_settings(db)
+
+    site_settings = await public_settings_cache.aget_or_load("public", _load, tags=("site_settings",))
+    validators = Validators(
+        etag=weak_etag("site_settings", site_settings.id, site_settings.updated_at),
+        last_modified=site_settings.updated_at,
+    )
+    if (cached := not_modified(request, validators)) is not None:
+        return cached
+    apply_validators(response, validators)
+    return site_settings
+
+
 @router.patch("", response_model=SiteSettingsRead)
 def update_settings(
     payload: SiteSettingsUpdate,
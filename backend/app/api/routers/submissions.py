@@ -1,12 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PRIVATE, cache_control
 from app.api.deps import get_db_session, require_roles
 from app.models.submission import Submission
 from app.models.user import User, UserRole
 from app.schemas.submission import SubmissionCreate, SubmissionRead, SubmissionUpdate
 
-router = APIRouter(prefix="/submissions", tags=["submissions"])
+router = APIRouter(prefix="/submissions", tags=["submissions"], dependencies=[cache_control(PRIVATE)])
 
 
 @router.post("", response_model=SubmissionRead, status_code=status.HTTP_201_CREATED)
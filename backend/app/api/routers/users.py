@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from typing import Optional
 from sqlalchemy.orm import Session
 
+from app.api.cache_policy import PRIVATE, cache_control
 from app.api.deps import get_db_session, require_roles
+from app.core.security import aget_password_hash, averify_password
 from app.models.user import User, UserRole
 from app.schemas.user import (
     PasswordChange,
@@ -11,9 +13,9 @@ from app.schemas.user import (
     UserRead,
     UserUpdateAdmin,
 )
-from app.services.auth import create_user, verify_password, get_password_hash
+from app.services.auth import create_user, revoke_access_tokens
 
-router = APIRouter(prefix="/users", tags=["users"])
+router = APIRouter(prefix="/users", tags=["users"], dependencies=[cache_control(PRIVATE)])
 
 
 @router.get("", response_model=list[UserRead])
@@ -29,7 +31,7 @@ def list_users(
 
 
 @router.post("", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def create_user_endpoint(
+async def create_user_endpoint(
     data: UserCreate,
     db: Session = Depends(get_db_session),
     _: User = Depends(require_roles(UserRole.ADMIN)),
@@ -38,7 +40,7 @@ def create_user_endpoint(
     if existing:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
 
-    user = create_user(
+    user = await create_user(
         db,
         email=data.email,
         password=data.password,
@@ -73,19 +75,20 @@ def update_me(
 
 
 @router.post("/me/password", status_code=status.HTTP_204_NO_CONTENT)
-def change_password(
+async def change_password(
     payload: PasswordChange,
     db: Session = Depends(get_db_session),
     current_user: User = Depends(require_roles(UserRole.ADMIN, UserRole.EDITOR, UserRole.AUTHOR, UserRole.READER)),
 ) -> None:
-    if not verify_password(payload.old_password, current_user.password_hash):
+    if not await averify_password(payload.old_password, current_user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Incorrect current password")
-    current_user.password_hash = get_password_hash(payload.new_password)
+    current_user.password_hash = await aget_password_hash(payload.new_password)
+    revoke_access_tokens(current_user)
     db.commit()
 
 
 @router.put("/{user_id}", response_model=UserRead)
-def update_user_admin(
+async def update_user_admin(
     user_id: int,
     payload: UserUpdateAdmin,
     db: Session = Depends(get_db_session),
@@ -99,9 +102,11 @@ def update_user_admin(
         existing = db.query(User).filter(User.email == data["email"], User.id != user_id).first()
         if existing:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already in use")
+    if "password" in data or data.get("role", user.role) != user.role:
+        revoke_access_tokens(user)
     for field, value in data.items():
         if field == "password":
-            user.password_hash = get_password_hash(value)
+            user.password_hash = await aget_password_hash(value)
         else:
             setattr(user, field, value)
     db.commit()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable, Iterable
+from typing import Generic, TypeVar
+
+from app.core.metrics import Counter
+
+V = TypeVar("V")
+
+REQUESTS = Counter("cache_requests_total", "In-process cache lookups by result.", ("cache", "result"))
+
+
+class TTLCache(Generic[V]):
+    """Small thread-safe LRU cache whose entries expire after ``ttl`` seconds.
+
+    Entries may carry tags (e.g. table names) so a write can drop every entry built from it.
+    ``generation`` changes on every invalidation; pass the value read before a slow load
+    to ``set`` and the result is discarded if a write landed in the meantime.
+    Named caches report hits and misses to /metrics.
+    """
+
+    def __init__(
+        self,
+        *,
+        ttl: float,
+        maxsize: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+        name: str | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._clock = clock
+        self._lock = threading.Lock()
+        # expiry, value and the entry's tags, so whatever removes an entry can unindex it
+        self._entries: OrderedDict[Hashable, tuple[float, V, tuple[str, ...]]] = OrderedDict()
+        self._tags: dict[str, set[Hashable]] = {}
+        self._generation = 0
+        self._hits = REQUESTS.labels(name, "hit") if name else None
+        self._misses = REQUESTS.labels(name, "miss") if name else None
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def get(self, key: Hashable) -> V | None:
+        value = self._get(key)
+        if self._hits is not None:
+            (self._misses if value is None else self._hits).inc()
+        return value
+
+    def _get(self, key: Hashable) -> V | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at <= self._clock():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V, *, tags: Iterable[str] = (), generation: int | None = None) -> None:
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._drop(key)
+            tags = tuple(tags)
+            self._entries[key] = (self._clock() + self.ttl, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: Hashable) -> bool:
+        # caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+        return True
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V], *, tags: Iterable[str] = ()) -> V:
+        value = self.get(key)
+        if value is None:
+            generation = self.generation
+            value = loader()
+            self.set(key, value, tags=tags, generation=generation)
+        return value
+
+    async def aget_or_load(self, key: Hashable, loader: Callable[[], Awaitable[V]], *, tags: Iterable[str] = ()) -> V:
+        value = self.get(key)
+        if value is None:
+            generation = self.generation
+            value = await loader()
+            self.set(key, value, tags=tags, generation=generation)
+        return value
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Drop every entry stored under any of ``tags``; returns how many were removed."""
+        removed = 0
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    if self._drop(key):
+                        removed += 1
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tags.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
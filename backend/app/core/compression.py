@@ -0,0 +1,123 @@
+"""Content negotiation and encoders shared by CompressionMiddleware and the response cache.
+
+Brotli is used when the ``brotli`` package is installed; otherwise responses fall back to
+gzip, which only needs zlib. Streaming encoders flush after every chunk so a slow or
+long-lived body still reaches the client as it is produced. Bodies stored in the response
+cache are compressed once, at a higher level, when the entry is filled.
+"""
+
+from __future__ import annotations
+
+import zlib
+from collections.abc import Mapping
+
+from starlette.datastructures import MutableHeaders
+
+from app.core.config import settings
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+# server preference when the client weighs encodings equally
+ENCODINGS: tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_STREAM_LEVELS = {"br": 4, "gzip": 6}
+_STORED_LEVELS = {"br": 9, "gzip": 9}
+# SVG is XML text even though it lives under image/
+_COMPRESSIBLE_EXCEPTIONS = ("image/svg+xml",)
+
+
+def negotiate(accept_encoding: str) -> str | None:
+    """The encoding to use for a request's ``Accept-Encoding``; ``None`` for identity."""
+    if not accept_encoding:
+        return None
+    weights: dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: str | None) -> bool:
+    if not content_type:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type in _COMPRESSIBLE_EXCEPTIONS:
+        return True
+    return not any(media_type.startswith(prefix) for prefix in settings.COMPRESSION_EXCLUDED_TYPES)
+
+
+def add_vary(headers: MutableHeaders) -> None:
+    vary = headers.get("vary")
+    if vary is None:
+        headers["Vary"] = "Accept-Encoding"
+    elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+        headers["Vary"] = f"{vary}, Accept-Encoding"
+
+
+def mark_encoded(headers: MutableHeaders, encoding: str, length: int | None = None) -> None:
+    """Headers of a body sent with ``encoding``; ``length`` is unknown while streaming."""
+    headers["Content-Encoding"] = encoding
+    if length is None:
+        del headers["content-length"]
+    else:
+        headers["Content-Length"] = str(length)
+    add_vary(headers)
+    # ranges would address the encoded bytes, which nothing here can serve
+    del headers["accept-ranges"]
+    # a strong ETag names exact bytes; the encoded body is a different representation
+    etag = headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        headers["ETag"] = f"W/{etag}"
+
+
+class StreamEncoder:
+    """Incremental encoder; each chunk comes back flushed so nothing waits for the next one."""
+
+    def __init__(self, encoding: str, level: int | None = None) -> None:
+        level = _STREAM_LEVELS[encoding] if level is None else level
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=level)
+            self._zlib = None
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data: bytes, *, final: bool) -> bytes:
+        if self._brotli is not None:
+            out = self._brotli.process(data) if data else b""
+            return out + (self._brotli.finish() if final else self._brotli.flush())
+        out = self._zlib.compress(data) if data else b""
+        return out + self._zlib.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+def compress(body: bytes, encoding: str, level: int | None = None) -> bytes:
+    return StreamEncoder(encoding, _STORED_LEVELS[encoding] if level is None else level).chunk(body, final=True)
+
+
+def precompress(body: bytes, headers: Mapping[str, str]) -> dict[str, bytes]:
+    """Encoded copies of a cacheable body, one per available encoding, if it is worth it."""
+    if (
+        not settings.COMPRESSION_ENABLED
+        or len(body) < settings.COMPRESSION_MIN_SIZE
+        or "content-encoding" in headers
+        or not is_compressible(headers.get("content-type"))
+    ):
+        return {}
+    variants = {encoding: compress(body, encoding) for encoding in ENCODINGS}
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
@@ -11,10 +11,30 @@ class Settings(BaseSettings):
 
     APP_NAME: str = "memshaheb-backend"
     DATABASE_URL: str
+    DATABASE_READ_URLS: list[str] = []
+    DB_READ_YOUR_WRITES_SECONDS: float = 10
+    DB_REPLICA_RETRY_SECONDS: float = 30
+    DB_WRITE_MARKER_PATH: Path = Path("/tmp/memshaheb-db-last-write")
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 15000
+    DB_PGBOUNCER_TRANSACTION_MODE: bool = False
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60
     REFRESH_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 14
+    ACCESS_TOKEN_ROLE_CLAIMS: bool = False
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    LOGIN_RATE_PER_IP: str = "10/minute"
+    LOGIN_RATE_PER_ACCOUNT: str = "10/15minutes"
+    REFRESH_REUSE_GRACE_SECONDS: float = 10
+    AUTH_REVOCATION_CHANNEL: str = "memshaheb_auth_revocations"
+    USER_CACHE_TTL_SECONDS: float = 30
+    USER_CACHE_MAX_ENTRIES: int = 1024
 
     INITIAL_ADMIN_EMAIL: EmailStr = "admin@example.com"
     INITIAL_ADMIN_PASSWORD: str = "ChangeMePlease!"
@@ -29,6 +49,10 @@ class Settings(BaseSettings):
     MEDIA_S3_ACCESS_KEY_ID: Optional[str] = None
     MEDIA_S3_SECRET_ACCESS_KEY: Optional[str] = None
     MEDIA_SIGNED_URL_EXPIRE_SECONDS: int = 3600
+    MEDIA_CONTENT_HASHED_NAMES: bool = True
+    MEDIA_CACHE_MAX_AGE_SECONDS: int = 3600
+    MEDIA_FILE_CACHE_ENTRIES: int = 256
+    MEDIA_FILE_CACHE_TTL_SECONDS: float = 5
 
     WC_STORE_URL: Optional[str] = None
     WC_CONSUMER_KEY: Optional[str] = None
@@ -37,9 +61,79 @@ class Settings(BaseSettings):
     WC_API_VERSION: str = "v3"
     WC_MAX_RETRIES: int = 3
     WC_RETRY_BACKOFF_SECONDS: float = 1.5
+    WC_REQUEST_TIMEOUT_SECONDS: float = 20
+    WC_BREAKER_FAILURE_THRESHOLD: int = 5
+    WC_BREAKER_RESET_SECONDS: float = 30
+    WC_RATE_LIMIT_PER_SECOND: float = 5
+    WC_RATE_LIMIT_BURST: int = 10
+    WC_RATE_LIMIT_MAX_WAIT_SECONDS: float = 5
+    WC_RATE_LIMIT_STATE_PATH: Path = Path("/tmp/memshaheb-wc-ratelimit")
+    WC_PRODUCT_CACHE_TTL_SECONDS: float = 15
+    WC_RECONCILE_PAGE_SIZE: int = 100
+    WC_RECONCILE_CONCURRENCY: int = 4
+    WC_RECONCILE_INITIAL_LOOKBACK_HOURS: int = 24
+    WC_RECONCILE_OVERLAP_SECONDS: int = 300
+
+    HOME_CACHE_TTL_SECONDS: float = 60
+    CONTENT_CACHE_TTL_SECONDS: float = 300
+    CACHE_INVALIDATION_NOTIFY: bool = True
+    CACHE_INVALIDATION_LISTEN: bool = True
+    CACHE_INVALIDATION_LISTEN_URL: Optional[str] = None
+    CACHE_INVALIDATION_CHANNEL: str = "memshaheb_cache"
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_BACKEND: Literal["memory", "file"] = "memory"
+    RESPONSE_CACHE_DIR: Path = Path("/tmp/memshaheb-response-cache")
+    RESPONSE_CACHE_TTL_SECONDS: float = 30
+    RESPONSE_CACHE_STALE_SECONDS: float = 300
+    RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1_000_000
+    RESPONSE_VALIDATE_TRUSTED: bool = False
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_EXCLUDED_TYPES: list[str] = [
+        "image/",
+        "video/",
+        "audio/",
+        "font/woff",
+        "application/zip",
+        "application/gzip",
+        "application/x-gzip",
+        "application/pdf",
+        "application/octet-stream",
+    ]
+    CACHE_PUBLIC_MAX_AGE_SECONDS: int = 60
+    CACHE_PUBLIC_S_MAXAGE_SECONDS: int = 300
+    CACHE_PUBLIC_STALE_WHILE_REVALIDATE_SECONDS: int = 600
+    CDN_PURGE_BACKEND: Literal["none", "http"] = "none"
+    CDN_PURGE_URL: Optional[str] = None
+    CDN_PURGE_TOKEN: Optional[str] = None
+    CDN_PURGE_TIMEOUT_SECONDS: float = 5
 
     REQUEST_ID_HEADER: str = "X-Request-ID"
+    METRICS_MULTIPROC_DIR: Optional[Path] = None
+    METRICS_SCRAPE_TOKEN: Optional[str] = None
+    IMAGE_PROCESSING_WORKERS: int = 2
+    BULKHEAD_LIMITS: dict[str, int] = {}
+    BULKHEAD_MAX_WAIT_SECONDS: float = 2
+    BULKHEAD_MAX_QUEUE: int = 16
+    SERVER_TIMING_ENABLED: bool = True
+    TRACING_EXPORTER: Literal["none", "stdout", "file", "otlp"] = "none"
+    TRACING_FILE_PATH: Path = Path("/tmp/memshaheb-spans.jsonl")
+    TRACING_OTLP_ENDPOINT: Optional[str] = None
+    TRACING_SAMPLE_RATE: float = 1.0
+    TRACING_SERVICE_NAME: str = "memshaheb-api"
+    DB_REPEATED_QUERY_THRESHOLD: int = 10
+    DB_SLOW_QUERY_LOG_ENABLED: bool = False
+    DB_SLOW_QUERY_THRESHOLD_MS: float = 250
+    DB_SLOW_QUERY_EXPLAIN_MS: float = 1000
+    DB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS: float = 600
+    DB_SLOW_QUERY_MAX_FINGERPRINTS: int = 500
     DEFAULT_RATE_LIMIT: str = "60/minute"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: Literal["memory", "file", "postgres"] = "file"
+    RATE_LIMIT_FILE_PATH: Path = Path("/tmp/memshaheb-rate-limits.bin")
+    RATE_LIMIT_FILE_SLOTS: int = 65536
+    TRUSTED_PROXIES: list[str] = ["127.0.0.1/32", "::1/128"]
     CORS_ALLOW_ORIGINS: list[str] = [
         "http://localhost:3000",
         "http://localhost:8000",
@@ -62,6 +156,14 @@ class Settings(BaseSettings):
             raise ValueError("DATABASE_URL must be a PostgreSQL URL.")
         return v
 
+    @field_validator("DATABASE_READ_URLS")
+    @classmethod
+    def ensure_postgres_read_urls(cls, v: list[str]) -> list[str]:
+        for url in v:
+            if not url.startswith("postgresql"):
+                raise ValueError("DATABASE_READ_URLS must contain PostgreSQL URLs.")
+        return v
+
     @field_validator("MEDIA_BASE_URL")
     @classmethod
     def ensure_media_base_url(cls, v: str) -> str:
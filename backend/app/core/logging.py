@@ -4,6 +4,8 @@ from typing import Any, Dict
 
 import structlog
 
+from app.db.query_stats import add_query_stats
+
 
 def configure_logging() -> None:
     timestamper = structlog.processors.TimeStamper(fmt="iso")
@@ -11,6 +13,7 @@ def configure_logging() -> None:
     structlog.configure(
         processors=[
             structlog.contextvars.merge_contextvars,
+            add_query_stats,
             timestamper,
             structlog.stdlib.add_log_level,
             structlog.stdlib.PositionalArgumentsFormatter(),
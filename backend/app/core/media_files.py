@@ -0,0 +1,303 @@
+"""Serve the local media directory mounted at ``/media``.
+
+Compared with Starlette's ``StaticFiles``:
+
+* Hot files stay open. :class:`FileCache` keeps descriptors with their validators and
+  content type, and re-stats a file at most every ``MEDIA_FILE_CACHE_TTL_SECONDS``
+  rather than on every request.
+* Content-hashed names (``photo.3fa9c0d2e1b4a7c5.jpg``, see
+  ``app.core.storage.content_hashed``) are sent as ``immutable`` with a one-year max-age.
+  Other files get ``MEDIA_CACHE_MAX_AGE_SECONDS`` and revalidate through ETag and
+  Last-Modified.
+* ``photo.svg.br`` and ``photo.svg.gz``, written next to an SVG at upload time, are served
+  to clients that accept that encoding.
+* Single byte ranges work, including ``If-Range``, so audio seeks without downloading the
+  whole file. A request for several ranges is answered with the full file, which RFC 9110
+  allows.
+* Bodies use the server's zero-copy ``sendfile`` when it offers the ASGI
+  ``http.response.zerocopysend`` extension. Otherwise they are read with ``pread`` from the
+  cached descriptor, in a worker thread for anything larger than one chunk.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from pathlib import Path
+
+import anyio
+from starlette._utils import get_route_path
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.exceptions import HTTPException
+from starlette.requests import Request
+from starlette.types import Receive, Scope, Send
+
+from app.api.conditional import Validators, is_not_modified
+from app.core import compression
+from app.core.cache import REQUESTS
+from app.core.config import settings
+
+IMMUTABLE = "public, max-age=31536000, immutable"
+# <stem>.<16 hex digits>.<ext>, as written by app.core.storage.content_hashed
+HASHED_NAME = re.compile(r"\.[0-9a-f]{16}\.[A-Za-z0-9]+$")
+_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass(slots=True, eq=False)
+class OpenFile:
+    fd: int
+    size: int
+    identity: tuple[int, int, int]
+    etag: str
+    last_modified: datetime
+    content_type: str
+    # precompressed siblings found next to the file
+    encodings: tuple[str, ...] = ()
+    checked_at: float = 0.0
+    refs: int = 0
+    evicted: bool = False
+
+    def fileno(self) -> int:
+        return self.fd
+
+
+def _identity(result: os.stat_result) -> tuple[int, int, int]:
+    return (result.st_ino, result.st_size, result.st_mtime_ns)
+
+
+def _content_type(path: str) -> str:
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    return f"{content_type}; charset=utf-8" if content_type.startswith("text/") else content_type
+
+
+class FileCache:
+    """LRU of open descriptors and their metadata, re-checked against the file every ``ttl`` seconds.
+
+    Callers ``acquire`` an entry and ``release`` it when the body is sent; an evicted or
+    replaced descriptor is closed once its last reader is done.
+    """
+
+    def __init__(self, *, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, OpenFile] = OrderedDict()
+        self._hits = REQUESTS.labels("media_files", "hit")
+        self._misses = REQUESTS.labels("media_files", "miss")
+
+    def acquire(self, path: str) -> OpenFile | None:
+        """The open file at ``path``, or ``None`` if it is missing or not a regular file."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None and now - entry.checked_at < self.ttl:
+                self._entries.move_to_end(path)
+                self._hits.inc()
+                entry.refs += 1
+                return entry
+            try:
+                result = os.stat(path)
+            except OSError:
+                result = None
+            if entry is not None and result is not None and _identity(result) == entry.identity:
+                entry.checked_at = now
+                self._entries.move_to_end(path)
+                self._hits.inc()
+                entry.refs += 1
+                return entry
+
+            self._misses.inc()
+            if entry is not None:
+                del self._entries[path]
+                self._retire(entry)
+            if result is None or not stat.S_ISREG(result.st_mode):
+                return None
+            try:
+                entry = self._open(path, result, now)
+            except OSError:
+                return None
+            entry.refs = 1
+            self._entries[path] = entry
+            while len(self._entries) > self.maxsize:
+                _, victim = self._entries.popitem(last=False)
+                self._retire(victim)
+            return entry
+
+    def release(self, entry: OpenFile) -> None:
+        with self._lock:
+            entry.refs -= 1
+            if entry.evicted and entry.refs == 0:
+                os.close(entry.fd)
+
+    def clear(self) -> None:
+        with self._lock:
+            for entry in self._entries.values():
+                self._retire(entry)
+            self._entries.clear()
+
+    def _retire(self, entry: OpenFile) -> None:
+        entry.evicted = True
+        if entry.refs == 0:
+            os.close(entry.fd)
+
+    @staticmethod
+    def _open(path: str, result: os.stat_result, now: float) -> OpenFile:
+        fd = os.open(path, os.O_RDONLY)
+        return OpenFile(
+            fd=fd,
+            size=result.st_size,
+            identity=_identity(result),
+            etag=f'"{result.st_size:x}-{result.st_mtime_ns:x}"',
+            last_modified=datetime.fromtimestamp(result.st_mtime, tz=timezone.utc),
+            content_type=_content_type(path),
+            encodings=tuple(encoding for encoding, suffix in _SUFFIXES.items() if os.path.isfile(path + suffix)),
+            checked_at=now,
+        )
+
+
+def _byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """``(start, end)`` inclusive for a single range; ``None`` to send the whole file.
+
+    Raises ``ValueError`` when the range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip().lower())
+    if match is None:
+        # malformed or several ranges: ignore the header
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def _if_range_matches(header: str, entry: OpenFile) -> bool:
+    header = header.strip()
+    if header.startswith('"') or header.startswith("W/"):
+        # only a strong, exact ETag match keeps the range (RFC 9110 13.1.5)
+        return header == entry.etag
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return since.replace(tzinfo=since.tzinfo or timezone.utc) >= entry.last_modified.replace(microsecond=0)
+
+
+class MediaFiles:
+    """ASGI app serving files under ``directory``."""
+
+    def __init__(self, directory: Path, *, cache: FileCache | None = None, chunk_size: int = 256 * 1024) -> None:
+        self.directory = directory
+        self.cache = cache or FileCache(maxsize=settings.MEDIA_FILE_CACHE_ENTRIES, ttl=settings.MEDIA_FILE_CACHE_TTL_SECONDS)
+        self.chunk_size = chunk_size
+
+    def _resolve(self, scope: Scope) -> str | None:
+        root = os.path.realpath(self.directory)
+        relative = os.path.normpath(get_route_path(scope).lstrip("/"))
+        if relative in ("", ".") or relative.startswith(".."):
+            return None
+        path = os.path.join(root, relative)
+        return path if os.path.commonpath([root, os.path.realpath(path)]) == root else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["method"] not in ("GET", "HEAD"):
+            raise HTTPException(status_code=405, headers={"Allow": "GET, HEAD"})
+        path = self._resolve(scope)
+        entry = self.cache.acquire(path) if path is not None else None
+        if entry is None:
+            raise HTTPException(status_code=404)
+        variant: OpenFile | None = None
+        try:
+            request_headers = Headers(scope=scope)
+            headers = MutableHeaders()
+            headers["Content-Type"] = entry.content_type
+            headers["ETag"] = entry.etag
+            headers["Last-Modified"] = format_datetime(entry.last_modified, usegmt=True)
+            headers["Cache-Control"] = (
+                IMMUTABLE if HASHED_NAME.search(path) else f"public, max-age={settings.MEDIA_CACHE_MAX_AGE_SECONDS}"
+            )
+            headers["Accept-Ranges"] = "bytes"
+            if entry.encodings:
+                compression.add_vary(headers)
+
+            if is_not_modified(Request(scope), Validators(etag=entry.etag, last_modified=entry.last_modified)):
+                del headers["content-type"]
+                del headers["accept-ranges"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+            status, body, start, count = 200, entry, 0, entry.size
+            range_header = request_headers.get("range")
+            if range_header and (
+                "if-range" not in request_headers or _if_range_matches(request_headers["if-range"], entry)
+            ):
+                try:
+                    byte_range = _byte_range(range_header, entry.size)
+                except ValueError:
+                    headers["Content-Range"] = f"bytes */{entry.size}"
+                    headers["Content-Length"] = "0"
+                    await send({"type": "http.response.start", "status": 416, "headers": headers.raw})
+                    await send({"type": "http.response.body", "body": b""})
+                    return
+                if byte_range is not None:
+                    status = 206
+                    start, end = byte_range
+                    count = end - start + 1
+                    headers["Content-Range"] = f"bytes {start}-{end}/{entry.size}"
+            elif entry.encodings:
+                encoding = compression.negotiate(request_headers.get("accept-encoding", ""))
+                if encoding in entry.encodings:
+                    variant = self.cache.acquire(path + _SUFFIXES[encoding])
+                    if variant is not None:
+                        body, count = variant, variant.size
+                        compression.mark_encoded(headers, encoding)
+
+            headers["Content-Length"] = str(count)
+            await send({"type": "http.response.start", "status": status, "headers": headers.raw})
+            if scope["method"] == "HEAD":
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await self._send_body(scope, send, body, start, count)
+        finally:
+            if variant is not None:
+                self.cache.release(variant)
+            self.cache.release(entry)
+
+    async def _send_body(self, scope: Scope, send: Send, entry: OpenFile, offset: int, count: int) -> None:
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            await send({"type": "http.response.zerocopysend", "file": entry, "offset": offset, "count": count})
+            return
+        if count <= self.chunk_size:
+            await send({"type": "http.response.body", "body": os.pread(entry.fd, count, offset)})
+            return
+        end = offset + count
+        while offset < end:
+            size = min(self.chunk_size, end - offset)
+            chunk = await anyio.to_thread.run_sync(os.pread, entry.fd, size, offset)
+            if not chunk:
+                # truncated underneath us; end the response rather than spin
+                break
+            offset += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": offset < end})
+        if offset < end:
+            await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,401 @@
+"""Prometheus metrics in the text exposition format, without the client library.
+
+Metrics are module-level objects declared next to the code they measure:
+
+    REQUESTS = Counter("wc_requests_total", "WooCommerce API calls.", ("outcome",))
+    REQUESTS.labels("ok").inc()
+
+Each labelled child precomputes its storage keys, so recording is a dict lookup and a
+locked add. With ``METRICS_MULTIPROC_DIR`` set, every worker writes its values to its own
+mmap'd file (``<pid>.db``) and a scrape sums all of them. This is the layout
+prometheus_client's multiprocess mode uses. Counters and histograms keep the totals of
+workers that have exited; gauges only count live workers.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.core.config import settings
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+
+_HEADER = struct.Struct("Q")
+_KEY_LEN = struct.Struct("I")
+_VALUE = struct.Struct("d")
+
+
+class LocalStore:
+    """Values for a single process."""
+
+    def __init__(self) -> None:
+        self._values: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def set(self, key: str, value: float) -> None:
+        with self._lock:
+            self._values[key] = value
+
+    def samples(self, *, live_only: bool = False) -> Iterator[tuple[str, float]]:
+        with self._lock:
+            yield from list(self._values.items())
+
+
+class MmapStore:
+    """This worker's values in ``<dir>/<pid>.db``; other workers' files are only read.
+
+    Layout: an 8-byte "bytes used" header, then records of key length, UTF-8 key padded
+    to 8 bytes, and a float64 value that is updated in place.
+    """
+
+    _INITIAL_SIZE = 64 * 1024
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+        self._offsets: dict[str, int] = {}
+        self._map: mmap.mmap | None = None
+        self._used = _HEADER.size
+
+    def _open(self) -> mmap.mmap:
+        # also re-opens after a fork so children never write into the parent's file
+        pid = os.getpid()
+        if self._map is not None and self._pid == pid:
+            return self._map
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.directory / f"{pid}.db", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if os.fstat(fd).st_size < self._INITIAL_SIZE:
+                os.ftruncate(fd, self._INITIAL_SIZE)
+            self._map = mmap.mmap(fd, 0)
+        finally:
+            os.close(fd)
+        self._pid = pid
+        self._offsets = {key: offset for key, offset, _ in _records(self._map)}
+        self._used = max(_HEADER.unpack_from(self._map, 0)[0], _HEADER.size)
+        return self._map
+
+    def _offset(self, key: str) -> int:
+        offset = self._offsets.get(key)
+        if offset is not None:
+            return offset
+        mapped = self._open()
+        encoded = key.encode()
+        padded = len(encoded) + (-(len(encoded) + _KEY_LEN.size) % 8)
+        record = _KEY_LEN.size + padded + _VALUE.size
+        if self._used + record > len(mapped):
+            # grows the file too; the map object (and the offsets into it) stay valid
+            mapped.resize(max(len(mapped) * 2, self._used + record))
+        _KEY_LEN.pack_into(mapped, self._used, len(encoded))
+        mapped[self._used + _KEY_LEN.size : self._used + _KEY_LEN.size + len(encoded)] = encoded
+        offset = self._used + _KEY_LEN.size + padded
+        _VALUE.pack_into(mapped, offset, 0.0)
+        self._used += record
+        _HEADER.pack_into(mapped, 0, self._used)
+        self._offsets[key] = offset
+        return offset
+
+    def add(self, key: str, amount: float) -> None:
+        with self._lock:
+            mapped = self._open()
+            offset = self._offset(key)
+            _VALUE.pack_into(mapped, offset, _VALUE.unpack_from(mapped, offset)[0] + amount)
+
+    def set(self, key: str, value: float) -> None:
+        with self._lock:
+            self._open()
+            _VALUE.pack_into(self._map, self._offset(key), value)
+
+    def samples(self, *, live_only: bool = False) -> Iterator[tuple[str, float]]:
+        for path in sorted(self.directory.glob("*.db")):
+            if live_only and not _alive(int(path.stem)):
+                continue
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            for key, _, value in _records(data):
+                yield key, value
+
+
+def _records(data) -> Iterator[tuple[str, int, float]]:
+    if len(data) < _HEADER.size:
+        return
+    used = min(_HEADER.unpack_from(data, 0)[0], len(data))
+    position = _HEADER.size
+    while position + _KEY_LEN.size <= used:
+        (length,) = _KEY_LEN.unpack_from(data, position)
+        padded = length + (-(length + _KEY_LEN.size) % 8)
+        offset = position + _KEY_LEN.size + padded
+        if offset + _VALUE.size > used:
+            break
+        key = bytes(data[position + _KEY_LEN.size : position + _KEY_LEN.size + length]).decode()
+        yield key, offset, _VALUE.unpack_from(data, offset)[0]
+        position = offset + _VALUE.size
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _key(name: str, labels: Sequence[tuple[str, str]]) -> str:
+    return json.dumps([name, list(labels)], separators=(",", ":"))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), *, registry: Registry | None = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: dict[tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+    def labels(self, *values: object):
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._child(tuple(zip(self.labelnames, key))))
+        return child
+
+    def _child(self, labels: tuple[tuple[str, str], ...]):
+        raise NotImplementedError
+
+
+class _CounterChild:
+    __slots__ = ("_store", "_key")
+
+    def __init__(self, registry: Registry, name: str, labels: tuple[tuple[str, str], ...]) -> None:
+        self._store = registry.store
+        self._key = _key(name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._store.add(self._key, amount)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _child(self, labels):
+        return _CounterChild(self.registry, self.name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class _GaugeChild:
+    __slots__ = ("_store", "_key")
+
+    def __init__(self, registry: Registry, name: str, labels: tuple[tuple[str, str], ...]) -> None:
+        self._store = registry.store
+        self._key = _key(name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._store.add(self._key, amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._store.add(self._key, -amount)
+
+    def set(self, value: float) -> None:
+        self._store.set(self._key, value)
+
+    @contextmanager
+    def track_inprogress(self) -> Iterator[None]:
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class Gauge(_Metric):
+    """Summed over live workers."""
+
+    kind = "gauge"
+
+    def _child(self, labels):
+        return _GaugeChild(self.registry, self.name, labels)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("_store", "_bounds", "_bucket_keys", "_sum_key", "_count_key")
+
+    def __init__(self, registry: Registry, name: str, labels: tuple[tuple[str, str], ...], bounds: tuple[float, ...]):
+        self._store = registry.store
+        self._bounds = bounds
+        # per-bucket (not cumulative) counts; the exposition accumulates them
+        self._bucket_keys = [_key(f"{name}_bucket", (*labels, ("le", _format_bound(bound)))) for bound in bounds]
+        self._sum_key = _key(f"{name}_sum", labels)
+        self._count_key = _key(f"{name}_count", labels)
+
+    def observe(self, value: float) -> None:
+        store = self._store
+        store.add(self._bucket_keys[bisect.bisect_left(self._bounds, value)], 1.0)
+        store.add(self._sum_key, value)
+        store.add(self._count_key, 1.0)
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        *,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: Registry | None = None,
+    ) -> None:
+        self.bounds = tuple(sorted(float(bound) for bound in buckets if bound != math.inf)) + (math.inf,)
+        super().__init__(name, documentation, labelnames, registry=registry)
+
+    def _child(self, labels):
+        return _HistogramChild(self.registry, self.name, labels, self.bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+
+def _format_bound(bound: float) -> str:
+    return "+Inf" if bound == math.inf else repr(bound)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(int(value)) if value.is_integer() else repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _sample(name: str, labels: Sequence[tuple[str, str]], value: float) -> str:
+    if labels:
+        rendered = ",".join(f'{label}="{_escape(text)}"' for label, text in labels)
+        return f"{name}{{{rendered}}} {_format_value(value)}"
+    return f"{name} {_format_value(value)}"
+
+
+class Registry:
+    def __init__(self, store: LocalStore | MmapStore | None = None) -> None:
+        self.store = store or LocalStore()
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> None:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def _totals(self, *, live_only: bool) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for key, value in self.store.samples(live_only=live_only):
+            totals[key] = totals.get(key, 0.0) + value
+        return totals
+
+    def render(self) -> str:
+        """Text exposition format 0.0.4."""
+        samples: dict[str, list[tuple[list[tuple[str, str]], float]]] = {}
+        gauges = {name for name, metric in self._metrics.items() if metric.kind == "gauge"}
+        for live_only in (False, True):
+            for key, value in self._totals(live_only=live_only).items():
+                name, labels = json.loads(key)
+                family = self._family(name)
+                if family is None or (family in gauges) != live_only:
+                    continue
+                samples.setdefault(name, []).append(([tuple(pair) for pair in labels], value))
+
+        lines: list[str] = []
+        for name, metric in self._metrics.items():
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            if metric.kind == "histogram":
+                lines.extend(self._render_histogram(metric, samples))
+            else:
+                for labels, value in sorted(samples.get(name, [])):
+                    lines.append(_sample(name, labels, value))
+        return "\n".join(lines) + "\n"
+
+    def _family(self, sample_name: str) -> str | None:
+        if sample_name in self._metrics:
+            return sample_name
+        for suffix in ("_bucket", "_sum", "_count"):
+            if sample_name.endswith(suffix) and sample_name[: -len(suffix)] in self._metrics:
+                return sample_name[: -len(suffix)]
+        return None
+
+    @staticmethod
+    def _render_histogram(metric: Histogram, samples) -> Iterator[str]:
+        buckets: dict[tuple, dict[str, float]] = {}
+        for labels, value in samples.get(f"{metric.name}_bucket", []):
+            base = tuple(pair for pair in labels if pair[0] != "le")
+            bound = next(text for label, text in labels if label == "le")
+            buckets.setdefault(base, {})[bound] = value
+        sums = {tuple(labels): value for labels, value in samples.get(f"{metric.name}_sum", [])}
+        counts = {tuple(labels): value for labels, value in samples.get(f"{metric.name}_count", [])}
+        for base in sorted(set(buckets) | set(counts)):
+            cumulative = 0.0
+            for bound in metric.bounds:
+                text = _format_bound(bound)
+                cumulative += buckets.get(base, {}).get(text, 0.0)
+                yield _sample(f"{metric.name}_bucket", (*base, ("le", text)), cumulative)
+            yield _sample(f"{metric.name}_sum", base, sums.get(base, 0.0))
+            yield _sample(f"{metric.name}_count", base, counts.get(base, 0.0))
+
+
+def build_store() -> LocalStore | MmapStore:
+    if settings.METRICS_MULTIPROC_DIR:
+        return MmapStore(settings.METRICS_MULTIPROC_DIR)
+    return LocalStore()
+
+
+REGISTRY = Registry(build_store())
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
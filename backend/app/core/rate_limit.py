@@ -1,10 +1,324 @@
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+"""GCRA rate limiting with a store shared by every worker.
+
+Each key keeps a single number, its theoretical arrival time (TAT), so a check is one
+read-modify-write whatever the window size. Stores:
+
+* ``memory``: per process; limits multiply by the worker count.
+* ``file``: a fixed-size slot table in a flock-guarded file, shared by the workers on a host.
+* ``postgres``: an UNLOGGED table, shared by every container that uses the database.
+
+RateLimitMiddleware enforces the limits per API route, as slowapi's ``default_limits`` did:
+``DEFAULT_RATE_LIMIT`` per client IP, unless the route declares its own with
+``dependencies=[limiter.limit("10/minute")]``, keyed by IP or, with ``per="user"``, by the
+authenticated user. Static mounts and paths no route matches are not limited.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import ipaddress
+import math
+import os
+import re
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from pathlib import Path
+from typing import Literal, Protocol
+
+import anyio
+from fastapi import Depends, HTTPException, status
+from fastapi.params import Depends as DependsParam
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from starlette.routing import Match
+from starlette.types import Scope
 
 from app.core.config import settings
+from app.core.security import decode_token
+
+_RATE_PATTERN = re.compile(r"^\s*(\d+)\s*(?:/|per)\s*(\d*)\s*(second|minute|hour|day)s?\s*$", re.IGNORECASE)
+_UNIT_SECONDS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+@dataclass(frozen=True, slots=True)
+class Rate:
+    count: int
+    period: float
+    text: str
+
+    @classmethod
+    def parse(cls, value: str) -> Rate:
+        """Parse ``"60/minute"``, ``"5 per second"`` or ``"100/15minutes"``."""
+        match = _RATE_PATTERN.match(value)
+        if match is None:
+            raise ValueError(f"Invalid rate limit: {value!r}")
+        count, multiple, unit = match.groups()
+        period = int(multiple or 1) * _UNIT_SECONDS[unit.lower()]
+        return cls(count=int(count), period=float(period), text=value.strip())
+
+    @property
+    def interval(self) -> float:
+        # GCRA emission interval: the steady-state spacing between allowed requests
+        return self.period / self.count
+
+
+@dataclass(frozen=True, slots=True)
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+    reset_after: float
+
+
+def gcra(tat: float | None, rate: Rate, now: float) -> tuple[Decision, float | None]:
+    """Return the decision and the TAT to store (``None`` when the request is rejected)."""
+    new_tat = max(tat or now, now) + rate.interval
+    allow_at = new_tat - rate.period
+    if now < allow_at:
+        current = max(tat or now, now)
+        return Decision(False, rate.count, 0, allow_at - now, current - now), None
+    remaining = int(math.floor((now - allow_at) / rate.interval + 1e-9))
+    return Decision(True, rate.count, min(remaining, rate.count - 1), 0.0, new_tat - now), new_tat
+
+
+class RateLimitStore(Protocol):
+    async def hit(self, key: str, rate: Rate, now: float) -> Decision: ...
+
+
+class MemoryStore:
+    """Per-process store; entries whose TAT has passed carry no state and are pruned."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self.max_keys = max_keys
+        self._tats: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    async def hit(self, key: str, rate: Rate, now: float) -> Decision:
+        with self._lock:
+            decision, new_tat = gcra(self._tats.get(key), rate, now)
+            if new_tat is not None:
+                if len(self._tats) >= self.max_keys and key not in self._tats:
+                    self._tats = {k: tat for k, tat in self._tats.items() if tat > now}
+                self._tats[key] = new_tat
+            return decision
+
+
+class FileStore:
+    """Open-addressed slot table in one file, flock-guarded like FileTokenBucket.
+
+    Keys are stored as 64-bit hashes; a lookup reads one short run of slots. When the run
+    is full, the slot closest to expiry is reused, which only ever errs towards allowing.
+
+    The file stays open for the life of the process. A check whose lock is free runs on the
+    event loop; one that would wait for another worker's lock waits in a thread instead.
+    """
+
+    _SLOT = struct.Struct("Qd")
+    _PROBES = 8
+
+    def __init__(self, path: Path, *, slots: int = 65536) -> None:
+        self.path = path
+        self.slots = max(slots, self._PROBES)
+        # flock is per open file, so threads of this process also need a lock of their own
+        self._lock = threading.Lock()
+        self._fd_owner: tuple[int, int] | None = None
+
+    def _fd(self) -> int:
+        # a forked worker opens its own descriptor rather than sharing the parent's lock
+        pid = os.getpid()
+        if self._fd_owner is None or self._fd_owner[1] != pid:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd_owner = (os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600), pid)
+        return self._fd_owner[0]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+
+    def _hit(self, key: str, rate: Rate, now: float, *, blocking: bool) -> Decision | None:
+        """The decision, or ``None`` when ``blocking`` is off and the lock is taken."""
+        if not self._lock.acquire(blocking=blocking):
+            return None
+        try:
+            fd = self._fd()
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return None
+            try:
+                return self._update(fd, key, rate, now)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            self._lock.release()
+
+    def _update(self, fd: int, key: str, rate: Rate, now: float) -> Decision:
+        key_hash = self._hash(key)
+        start = key_hash % (self.slots - self._PROBES + 1)
+        size = self._SLOT.size
+        raw = os.pread(fd, size * self._PROBES, start * size).ljust(size * self._PROBES, b"\0")
+        run = [self._SLOT.unpack_from(raw, i * size) for i in range(self._PROBES)]
+        index = next((i for i, (h, _) in enumerate(run) if h == key_hash), None)
+        tat = run[index][1] if index is not None else None
+        decision, new_tat = gcra(tat, rate, now)
+        if new_tat is not None:
+            if index is None:
+                index = min(range(self._PROBES), key=lambda i: run[i][1] if run[i][0] else -1.0)
+            os.pwrite(fd, self._SLOT.pack(key_hash, new_tat), (start + index) * size)
+        return decision
+
+    async def hit(self, key: str, rate: Rate, now: float) -> Decision:
+        decision = self._hit(key, rate, now, blocking=False)
+        if decision is None:
+            decision = await anyio.to_thread.run_sync(partial(self._hit, key, rate, now, blocking=True))
+        return decision
+
+
+class PostgresStore:
+    """UNLOGGED ``rate_limit_buckets`` table; one upsert per check and no WAL traffic."""
+
+    _UPSERT = (
+        "INSERT INTO rate_limit_buckets AS b (key, tat) VALUES (:key, :now + :interval) "
+        "ON CONFLICT (key) DO UPDATE SET tat = GREATEST(b.tat, :now) + :interval "
+        "WHERE GREATEST(b.tat, :now) + :interval - :now <= :period "
+        "RETURNING tat"
+    )
+    _PRUNE_EVERY_SECONDS = 300.0
+
+    def __init__(self) -> None:
+        self._pruned_at = 0.0
+
+    async def hit(self, key: str, rate: Rate, now: float) -> Decision:
+        from sqlalchemy import text
+
+        from app.db.session import async_engine
+
+        params = {"key": key, "now": now, "interval": rate.interval, "period": rate.period}
+        async with async_engine.begin() as conn:
+            stored = (await conn.execute(text(self._UPSERT), params)).scalar()
+            if stored is None:
+                tat = (await conn.execute(text("SELECT tat FROM rate_limit_buckets WHERE key = :key"), params)).scalar()
+                decision, _ = gcra(tat, rate, now)
+            else:
+                decision, _ = gcra(stored - rate.interval, rate, now)
+            if now - self._pruned_at > self._PRUNE_EVERY_SECONDS:
+                self._pruned_at = now
+                await conn.execute(text("DELETE FROM rate_limit_buckets WHERE tat < :now"), {"now": now})
+        return decision
+
+
+def build_store() -> RateLimitStore:
+    if settings.RATE_LIMIT_BACKEND == "postgres":
+        return PostgresStore()
+    if settings.RATE_LIMIT_BACKEND == "file":
+        return FileStore(settings.RATE_LIMIT_FILE_PATH, slots=settings.RATE_LIMIT_FILE_SLOTS)
+    return MemoryStore()
+
+
+@lru_cache(maxsize=8)
+def _trusted_networks(proxies: tuple[str, ...]) -> tuple[ipaddress.IPv4Network | ipaddress.IPv6Network, ...]:
+    return tuple(ipaddress.ip_network(proxy, strict=False) for proxy in proxies)
+
+
+def _is_trusted(address: str, networks) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in networks)
+
+
+def client_ip(scope: Scope) -> str:
+    """The real client address: the right-most X-Forwarded-For hop not added by a trusted proxy."""
+    client = scope.get("client")
+    peer = client[0] if client else "unknown"
+    networks = _trusted_networks(tuple(settings.TRUSTED_PROXIES))
+    if not _is_trusted(peer, networks):
+        return peer
+    forwarded = ",".join(Headers(scope=scope).getlist("x-forwarded-for"))
+    hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, networks):
+            return hop
+    return hops[0] if hops else peer
+
+
+def _user_key(scope: Scope) -> str | None:
+    authorization = Headers(scope=scope).get("authorization", "")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        payload = decode_token(token)
+    except ValueError:
+        return None
+    subject = payload.get("sub")
+    return f"user:{subject}" if subject is not None and payload.get("type") == "access" else None
+
+
+class RateLimitExceeded(HTTPException):
+    def __init__(self, rate: Rate, decision: Decision) -> None:
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=f"Rate limit exceeded: {rate.text}",
+            headers={"Retry-After": str(math.ceil(decision.retry_after))},
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class RouteLimit:
+    rate: Rate
+    per: Literal["ip", "user"]
+
+    def key(self, scope: Scope, route: APIRoute) -> str:
+        identity = (_user_key(scope) if self.per == "user" else None) or f"ip:{client_ip(scope)}"
+        return f"{scope['method']} {route.path}|{identity}"
+
+
+def matched_route(scope: Scope) -> APIRoute | None:
+    """The API route the app will dispatch ``scope`` to; ``None`` for mounts and unmatched paths."""
+    router = getattr(scope.get("app"), "router", None)
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match is Match.FULL:
+            return route if isinstance(route, APIRoute) else None
+    return None
+
+
+def route_limits(route: APIRoute) -> tuple[RouteLimit, ...]:
+    return tuple(
+        dependency.dependency.route_limit
+        for dependency in route.dependencies
+        if hasattr(dependency.dependency, "route_limit")
+    )
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore, *, default: str | None = None) -> None:
+        self.store = store
+        self.default = Rate.parse(default) if default else None
+
+    async def hit(self, key: str, rate: Rate) -> Decision:
+        return await self.store.hit(key, rate, time.time())
+
+    def limit(self, rate: str, *, per: Literal["ip", "user"] = "ip") -> DependsParam:
+        """Route dependency declaring a limit that replaces the default one for the route.
+
+        ``per="user"`` counts per authenticated user and falls back to the client IP
+        for anonymous requests. RateLimitMiddleware enforces it before the request reaches
+        the response cache, so cached responses count too.
+        """
+
+        async def _declared() -> None:
+            return None
+
+        _declared.route_limit = RouteLimit(Rate.parse(rate), per)  # type: ignore[attr-defined]
+        return Depends(_declared)
+
 
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[settings.DEFAULT_RATE_LIMIT],
-    headers_enabled=True,
-)
+limiter = RateLimiter(build_store(), default=settings.DEFAULT_RATE_LIMIT)
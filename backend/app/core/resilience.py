@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import enum
+import fcntl
+import math
+import os
+import struct
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+
+class CircuitState(str, enum.Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Circuit '{name}' is open")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker; one trial call is let through after ``reset_timeout``."""
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.reset_timeout:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        return self._state
+
+    def before_call(self) -> None:
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return
+            if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+            retry_after = max(self.reset_timeout - (self._clock() - self._opened_at), 0.0)
+            raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = CircuitState.OPEN
+                self._opened_at = self._clock()
+                self._trial_in_flight = False
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            retry_after = None
+            if state == CircuitState.OPEN:
+                retry_after = round(max(self.reset_timeout - (self._clock() - self._opened_at), 0.0), 3)
+            return {"state": state.value, "failures": self._failures, "retry_after": retry_after}
+
+
+class BulkheadFull(RuntimeError):
+    def __init__(self, name: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"Bulkhead '{name}' is full ({reason})")
+        self.name = name
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Bulkhead:
+    """At most ``limit`` concurrent holders; up to ``max_queue`` more wait ``max_wait`` seconds.
+
+    A released slot goes straight to the longest waiter, so late arrivals cannot jump the
+    queue. Holders report how long they held the slot, and that average drives the
+    ``retry_after`` estimate on rejections. Single event loop, like the rest of a worker.
+    """
+
+    def __init__(self, name: str, *, limit: int, max_wait: float, max_queue: int) -> None:
+        self.name = name
+        self.limit = max(limit, 1)
+        self.max_wait = max_wait
+        self.max_queue = max_queue
+        self.in_use = 0
+        self._waiters: deque[asyncio.Future[None]] = deque()
+        self._avg_hold = 0.0
+        self._rejected = {"queue_full": 0, "timeout": 0}
+
+    @property
+    def full(self) -> bool:
+        return self.in_use >= self.limit or bool(self._waiters)
+
+    def _retry_after(self) -> float:
+        # time for everyone ahead to be served, at the observed hold time per slot
+        return max(1.0, min(60.0, math.ceil(self._avg_hold * (len(self._waiters) + 1) / self.limit)))
+
+    def _reject(self, reason: str) -> BulkheadFull:
+        self._rejected[reason] += 1
+        return BulkheadFull(self.name, reason, self._retry_after())
+
+    async def acquire(self) -> None:
+        if not self.full:
+            self.in_use += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            raise self._reject("queue_full")
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            # the slot is handed over already counted in ``in_use``
+            await asyncio.wait_for(waiter, self.max_wait)
+        except asyncio.TimeoutError:
+            raise self._reject("timeout") from None
+        except BaseException:
+            if waiter.done() and not waiter.cancelled():
+                # cancelled just after the slot was handed over: pass it on
+                self._hand_on()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+    def release(self, held: float = 0.0) -> None:
+        self._avg_hold = held if self._avg_hold == 0 else 0.8 * self._avg_hold + 0.2 * held
+        self._hand_on()
+
+    def _hand_on(self) -> None:
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_use -= 1
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "limit": self.limit,
+            "in_use": self.in_use,
+            "queued": len(self._waiters),
+            "saturation": round((self.in_use + len(self._waiters)) / self.limit, 3),
+            "max_queue": self.max_queue,
+            "max_wait_seconds": self.max_wait,
+            "avg_hold_ms": round(self._avg_hold * 1000, 3),
+            "rejected": dict(self._rejected),
+        }
+
+
+class FileTokenBucket:
+    """Token bucket whose state lives in a small flock-guarded file.
+
+    Every process that points at the same path draws from the same bucket, so
+    uvicorn workers sharing a host stay under one quota together.
+    """
+
+    _STATE = struct.Struct("dd")
+
+    def __init__(self, path: Path, *, rate: float, capacity: float) -> None:
+        self.path = path
+        self.rate = rate
+        self.capacity = capacity
+
+    def _take(self) -> float:
+        """Take a token if one is available; otherwise return the seconds until one is."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            raw = os.pread(fd, self._STATE.size, 0)
+            now = time.time()
+            if len(raw) == self._STATE.size:
+                tokens, updated = self._STATE.unpack(raw)
+                tokens = min(self.capacity, tokens + max(now - updated, 0.0) * self.rate)
+            else:
+                tokens = self.capacity
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            os.pwrite(fd, self._STATE.pack(tokens, now), 0)
+            return wait
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def acquire(self, timeout: float) -> bool:
+        if self.rate <= 0:
+            return True
+        deadline = time.monotonic() + timeout
+        while True:
+            wait = self._take()
+            if wait == 0:
+                return True
+            if time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
@@ -1,38 +1,75 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
-import bcrypt
 
+import bcrypt
 from jose import JWTError, jwt
 
 from .config import settings
 
+# bcrypt burns ~250ms of CPU per call at cost 12; a dedicated pool caps how many run at once
+# so a burst of logins queues here instead of occupying the threadpool every sync handler shares
+_hash_executor = ThreadPoolExecutor(max_workers=max(settings.PASSWORD_HASH_WORKERS, 1), thread_name_prefix="bcrypt")
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+
+def _checkpw(plain_password: str, hashed_password: str) -> bool:
     password_bytes = plain_password.encode('utf-8')
     hashed_bytes = hashed_password.encode('utf-8')
     return bcrypt.checkpw(password_bytes, hashed_bytes)
 
 
-def get_password_hash(password: str) -> str:
+def _hashpw(password: str) -> str:
     password_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_BCRYPT_ROUNDS)
     return bcrypt.hashpw(password_bytes, salt).decode('utf-8')
 
 
-def _create_token(subject: str, expires_delta: timedelta, token_type: str) -> str:
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return _hash_executor.submit(_checkpw, plain_password, hashed_password).result()
+
+
+def get_password_hash(password: str) -> str:
+    return _hash_executor.submit(_hashpw, password).result()
+
+
+async def averify_password(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(_hash_executor.submit(_checkpw, plain_password, hashed_password))
+
+
+async def aget_password_hash(password: str) -> str:
+    return await asyncio.wrap_future(_hash_executor.submit(_hashpw, password))
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True when the hash was made with a different cost than ``PASSWORD_BCRYPT_ROUNDS``."""
+    try:
+        rounds = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return rounds != settings.PASSWORD_BCRYPT_ROUNDS
+
+
+def _create_token(
+    subject: str, expires_delta: timedelta, token_type: str, claims: Optional[Dict[str, Any]] = None
+) -> str:
     expire = datetime.now(timezone.utc) + expires_delta
-    to_encode: Dict[str, Any] = {"sub": subject, "exp": expire, "type": token_type}
+    to_encode: Dict[str, Any] = {**(claims or {}), "sub": subject, "exp": expire, "type": token_type}
     return jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
 
 
-def create_access_token(subject: str, expires_minutes: Optional[int] = None) -> str:
+def create_access_token(
+    subject: str, expires_minutes: Optional[int] = None, *, claims: Optional[Dict[str, Any]] = None
+) -> str:
     minutes = expires_minutes or settings.ACCESS_TOKEN_EXPIRE_MINUTES
-    return _create_token(subject, timedelta(minutes=minutes), "access")
+    return _create_token(subject, timedelta(minutes=minutes), "access", claims)
 
 
-def create_refresh_token(subject: str, expires_minutes: Optional[int] = None) -> str:
+def create_refresh_token(
+    subject: str, expires_minutes: Optional[int] = None, *, claims: Optional[Dict[str, Any]] = None
+) -> str:
     minutes = expires_minutes or settings.REFRESH_TOKEN_EXPIRE_MINUTES
-    return _create_token(subject, timedelta(minutes=minutes), "refresh")
+    return _create_token(subject, timedelta(minutes=minutes), "refresh", claims)
 
 
 def decode_token(token: str) -> Dict[str, Any]:
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import hashlib
 import os
 import re
 import shutil
@@ -10,6 +11,7 @@ from uuid import uuid4
 
 from fastapi import UploadFile
 
+from app.core import compression
 from app.core.config import settings
 
 
@@ -113,6 +115,29 @@ def save_upload(file: UploadFile, owner_id: int | None = None) -> StorageResult:
     return backend.save_file(file=file, owner_id=owner_id)
 
 
+def content_hashed(path: Path) -> Path:
+    """Rename a stored file to ``<stem>.<16 hex digits><suffix>`` so its URL can be cached as immutable."""
+    digest = hashlib.blake2b(digest_size=8)
+    with path.open("rb") as fh:
+        for block in iter(lambda: fh.read(1024 * 1024), b""):
+            digest.update(block)
+    target = path.with_name(f"{path.stem}.{digest.hexdigest()}{path.suffix}")
+    counter = 1
+    while target.exists():
+        # the same bytes uploaded again still get their own file, so deleting one keeps the other
+        target = path.with_name(f"{path.stem}-{counter}.{digest.hexdigest()}{path.suffix}")
+        counter += 1
+    os.replace(path, target)
+    return target
+
+
+def precompress_file(path: Path) -> None:
+    """Write ``.br``/``.gz`` siblings of a text asset (e.g. an SVG) for the media server to send as is."""
+    body = path.read_bytes()
+    for encoding, data in compression.precompress(body, {"content-type": "image/svg+xml"}).items():
+        path.with_name(path.name + (".br" if encoding == "br" else ".gz")).write_bytes(data)
+
+
 def _sanitize_filename(filename: str | None) -> str:
     """Keep the original name as much as possible, strip paths and dangerous chars."""
     if not filename:
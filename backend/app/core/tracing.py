@@ -0,0 +1,285 @@
+"""Per-request tracing: phase timings for Server-Timing and OpenTelemetry-shaped spans.
+
+RequestIDMiddleware opens a trace for every request; code on the request path marks its
+phases with ``span``:
+
+    with tracing.span("woocommerce GET", phase="external", **{"http.url": url}):
+        ...
+
+Phase totals (``auth``, ``serialize``, ``external``, ``image``; ``db`` comes from
+query_stats) are sent as ``Server-Timing`` entries when an admin made the request. Sampled
+traces are exported off the request path as OTLP/JSON, the format the OpenTelemetry
+collector's OTLP receiver and its ``otlpjsonfile`` receiver read. Exporters:
+
+* ``none``: spans only feed Server-Timing.
+* ``stdout`` / ``file``: one OTLP/JSON document per trace and line.
+* ``otlp``: POST to an OTLP/HTTP endpoint, e.g. ``http://otel-collector:4318/v1/traces``.
+
+The trace ID is taken from an incoming W3C ``traceparent`` header when there is one, so
+spans join the proxy's or the frontend's trace.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import sys
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.db.query_stats import add_observer, statement_shape
+
+logger = structlog.get_logger(__name__)
+
+PHASES = ("auth", "serialize", "external", "image")
+
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+_SPAN_KIND = {"internal": 1, "server": 2, "client": 3}
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+@dataclass(slots=True)
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: str | None
+    start_ns: int
+    end_ns: int = 0
+    kind: str = "internal"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: str | None = None
+
+    def to_otlp(self) -> dict[str, Any]:
+        span: dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KIND[self.kind],
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 0},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        return span
+
+
+def _attribute(key: str, value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class Trace:
+    """Spans and phase totals of one request; shared by every thread working on it."""
+
+    def __init__(self, trace_id: str, *, parent_span_id: str | None = None, sampled: bool = True) -> None:
+        self.trace_id = trace_id
+        self.sampled = sampled
+        self.root = Span("request", trace_id, _new_id(64), parent_span_id, time.time_ns(), kind="server")
+        self.spans: list[Span] = [self.root]
+        self.phases: dict[str, float] = {}
+        self.reveal_timing = False
+        self._lock = threading.Lock()
+
+    def record(self, span: Span, phase: str | None, duration: float) -> None:
+        with self._lock:
+            self.spans.append(span)
+            if phase is not None:
+                self.phases[phase] = self.phases.get(phase, 0.0) + duration
+
+    def server_timing(self) -> list[str]:
+        return [f"{phase};dur={round(self.phases[phase] * 1000, 3)}" for phase in PHASES if phase in self.phases]
+
+    def to_otlp(self) -> dict[str, Any]:
+        with self._lock:
+            spans = [span.to_otlp() for span in self.spans]
+        return {
+            "resourceSpans": [
+                {
+                    "resource": {"attributes": [_attribute("service.name", settings.TRACING_SERVICE_NAME)]},
+                    "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+                }
+            ]
+        }
+
+
+_trace: ContextVar[Trace | None] = ContextVar("trace", default=None)
+# (span ID, phase) of the innermost open span, so nested spans get their parent and
+# time is not counted twice towards one phase
+_parent: ContextVar[tuple[str, str | None] | None] = ContextVar("trace_parent", default=None)
+
+
+def start_trace(traceparent: str | None = None) -> tuple[Trace, Token]:
+    match = _TRACEPARENT.match(traceparent.strip().lower()) if traceparent else None
+    if match is not None:
+        trace_id, parent_id, flags = match.groups()
+        trace = Trace(trace_id, parent_span_id=parent_id, sampled=bool(int(flags, 16) & 1))
+    else:
+        trace = Trace(_new_id(128), sampled=random.random() < settings.TRACING_SAMPLE_RATE)
+    return trace, _trace.set(trace)
+
+
+def finish_trace(token: Token, *, name: str, attributes: dict[str, Any]) -> Trace | None:
+    trace = _trace.get()
+    _trace.reset(token)
+    if trace is not None:
+        trace.root.name = name
+        trace.root.end_ns = time.time_ns()
+        trace.root.attributes.update(attributes)
+    return trace
+
+
+def current_trace() -> Trace | None:
+    return _trace.get()
+
+
+def reveal_timing() -> None:
+    """Send phase timings to the client of the current request (called once it is known to be an admin)."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.reveal_timing = True
+
+
+@contextmanager
+def span(name: str, *, phase: str | None = None, kind: str = "internal", **attributes: Any) -> Iterator[Span | None]:
+    trace = _trace.get()
+    if trace is None:
+        yield None
+        return
+    parent = _parent.get()
+    current = Span(name, trace.trace_id, _new_id(64), parent[0] if parent else trace.root.span_id, time.time_ns(), kind=kind)
+    current.attributes.update(attributes)
+    token = _parent.set((current.span_id, phase or (parent[1] if parent else None)))
+    started = time.perf_counter()
+    try:
+        yield current
+    except BaseException as exc:
+        current.error = type(exc).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - started
+        _parent.reset(token)
+        current.end_ns = current.start_ns + int(duration * 1e9)
+        counted = phase if phase is not None and (parent is None or parent[1] != phase) else None
+        trace.record(current, counted, duration)
+
+
+def record_span(name: str, duration: float, *, phase: str | None = None, **attributes: Any) -> None:
+    """Record a span that has just finished and took ``duration`` seconds (e.g. from an event hook)."""
+    trace = _trace.get()
+    if trace is None:
+        return
+    parent = _parent.get()
+    end_ns = time.time_ns()
+    current = Span(name, trace.trace_id, _new_id(64), parent[0] if parent else trace.root.span_id, end_ns - int(duration * 1e9), end_ns)
+    current.attributes.update(attributes)
+    counted = phase if phase is not None and (parent is None or parent[1] != phase) else None
+    trace.record(current, counted, duration)
+
+
+class SpanExporter(Protocol):
+    def export(self, batch: Sequence[dict[str, Any]]) -> None: ...
+
+
+class StreamExporter:
+    """OTLP/JSON lines to a text stream; stdout by default."""
+
+    def __init__(self, stream=None) -> None:
+        self.stream = stream
+
+    def export(self, batch: Sequence[dict[str, Any]]) -> None:
+        stream = self.stream or sys.stdout
+        for document in batch:
+            stream.write(json.dumps(document, separators=(",", ":")) + "\n")
+        stream.flush()
+
+
+class FileExporter:
+    """OTLP/JSON lines appended to ``path``, readable by the collector's otlpjsonfile receiver."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def export(self, batch: Sequence[dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(document, separators=(",", ":")) + "\n" for document in batch)
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class OtlpHttpExporter:
+    def __init__(self, endpoint: str, *, timeout: float = 5.0) -> None:
+        self.endpoint = endpoint
+        self.timeout = timeout
+
+    def export(self, batch: Sequence[dict[str, Any]]) -> None:
+        resource_spans = [entry for document in batch for entry in document["resourceSpans"]]
+        response = httpx.post(self.endpoint, json={"resourceSpans": resource_spans}, timeout=self.timeout)
+        response.raise_for_status()
+
+
+def build_exporter() -> SpanExporter | None:
+    if settings.TRACING_EXPORTER == "stdout":
+        return StreamExporter()
+    if settings.TRACING_EXPORTER == "file":
+        return FileExporter(settings.TRACING_FILE_PATH)
+    if settings.TRACING_EXPORTER == "otlp" and settings.TRACING_OTLP_ENDPOINT:
+        return OtlpHttpExporter(settings.TRACING_OTLP_ENDPOINT)
+    return None
+
+
+class SpanProcessor:
+    """Hands finished traces to the exporter on a background thread, like the CDN purger."""
+
+    def __init__(self, exporter: SpanExporter | None) -> None:
+        self.exporter = exporter
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+
+    def on_end(self, trace: Trace) -> None:
+        if self.exporter is not None and trace.sampled:
+            self._executor.submit(self._export, self.exporter, trace)
+
+    @staticmethod
+    def _export(exporter: SpanExporter, trace: Trace) -> None:
+        try:
+            exporter.export([trace.to_otlp()])
+        except Exception as exc:  # noqa: BLE001 - tracing must never fail a request
+            logger.warning("trace_export_failed", trace_id=trace.trace_id, error=str(exc))
+
+    def flush(self, timeout: float | None = None) -> None:
+        wait([self._executor.submit(lambda: None)], timeout=timeout)
+
+
+processor = SpanProcessor(build_exporter())
+
+
+def _trace_query(conn, statement, parameters, context, executemany, duration) -> None:
+    # db time already reaches Server-Timing through query_stats; this adds the spans
+    record_span("db.query", duration, **{"db.statement": statement_shape(statement)[:1000]})
+
+
+add_observer(_trace_query)
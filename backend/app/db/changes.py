@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import TypeVar
+
+import structlog
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import ORMExecuteState, Session
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+CommitListener = Callable[[frozenset[str]], None]
+ChangedRow = tuple[str, object | None]
+WriteListener = Callable[[frozenset[ChangedRow]], None]
+C = TypeVar("C", bound=TTLCache)
+
+_CHANGED_KEY = "changed_tables"
+_ROWS_KEY = "changed_rows"
+_ANNOUNCED_KEY = "announced_tables"
+_listeners: list[CommitListener] = []
+_write_listeners: list[WriteListener] = []
+
+
+def on_commit(listener: CommitListener) -> CommitListener:
+    """Call ``listener(tables)`` after any session commits writes to those tables.
+
+    Listeners also fire for commits made by other workers and containers when the
+    LISTEN side (app.db.invalidation) is running.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+    return listener
+
+
+def on_write(listener: WriteListener) -> WriteListener:
+    """Call ``listener(rows)`` after a commit made by *this* process.
+
+    ``rows`` holds ``(table, primary_key)`` pairs; bulk statements report a ``None``
+    key because the affected rows are unknown. Unlike :func:`on_commit` these are
+    never replayed from other processes, so side effects such as CDN purges happen
+    exactly once per write.
+    """
+    if listener not in _write_listeners:
+        _write_listeners.append(listener)
+    return listener
+
+
+def bind_cache(cache: C, *tables: str) -> C:
+    """Invalidate ``cache`` entries tagged with any of ``tables`` whenever those tables change."""
+    watched = frozenset(tables)
+
+    def _invalidate(changed: frozenset[str]) -> None:
+        hit = changed & watched
+        if hit:
+            cache.invalidate_tags(*hit)
+
+    on_commit(_invalidate)
+    return cache
+
+
+def _notify(listeners: list, payload: frozenset) -> None:
+    for listener in listeners:
+        try:
+            listener(payload)
+        except Exception as exc:  # noqa: BLE001 - a broken listener must not fail the write
+            logger.warning("db_commit_listener_failed", listener=getattr(listener, "__name__", repr(listener)), error=str(exc))
+
+
+def dispatch(tables: frozenset[str]) -> None:
+    _notify(_listeners, tables)
+
+
+def _identity(obj) -> object | None:
+    # the identity key of pending objects is only assigned after after_flush, so read the columns
+    identity = tuple(inspect(obj).mapper.primary_key_from_instance(obj))
+    if any(part is None for part in identity):
+        return None
+    return identity[0] if len(identity) == 1 else identity
+
+
+def _mark(session: Session, rows: set[ChangedRow], bind_mapper=None) -> None:
+    if not rows:
+        return
+    tables = {table for table, _ in rows}
+    session.info.setdefault(_ROWS_KEY, set()).update(rows)
+    session.info.setdefault(_CHANGED_KEY, set()).update(tables)
+    if not settings.CACHE_INVALIDATION_NOTIFY:
+        return
+    announced = session.info.setdefault(_ANNOUNCED_KEY, set())
+    pending = tables - announced
+    if not pending or session.get_bind(mapper=bind_mapper).dialect.name != "postgresql":
+        return
+    # NOTIFY is transactional: Postgres delivers it on commit and drops it on rollback.
+    connection = session.connection(bind_arguments={"mapper": bind_mapper} if bind_mapper is not None else None)
+    for table in sorted(pending):
+        connection.exec_driver_sql(
+            "SELECT pg_notify(%(channel)s, %(table)s)",
+            {"channel": settings.CACHE_INVALIDATION_CHANNEL, "table": table},
+        )
+    announced.update(pending)
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    objects = (*session.new, *session.dirty, *session.deleted)
+    _mark(session, {(obj.__tablename__, _identity(obj)) for obj in objects if getattr(obj, "__tablename__", None)})
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(state: ORMExecuteState) -> None:
+    # bulk UPDATE/DELETE/INSERT statements bypass the flush
+    if (state.is_update or state.is_delete or state.is_insert) and state.bind_mapper is not None:
+        _mark(state.session, {(state.bind_mapper.persist_selectable.name, None)}, state.bind_mapper)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session) -> None:
+    session.info.pop(_ANNOUNCED_KEY, None)
+    tables = session.info.pop(_CHANGED_KEY, None)
+    rows = session.info.pop(_ROWS_KEY, None)
+    if tables:
+        dispatch(frozenset(tables))
+    if rows:
+        _notify(_write_listeners, frozenset(rows))
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session) -> None:
+    session.info.pop(_CHANGED_KEY, None)
+    session.info.pop(_ROWS_KEY, None)
+    session.info.pop(_ANNOUNCED_KEY, None)
@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import select
+import threading
+from collections.abc import Callable
+
+import psycopg
+import structlog
+from psycopg import sql
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.db import changes
+
+logger = structlog.get_logger(__name__)
+
+
+def _all_tables() -> frozenset[str]:
+    from app.db.base import Base
+
+    return frozenset(Base.metadata.tables)
+
+
+def _libpq_dsn(url: str) -> str:
+    return make_url(url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class InvalidationListener:
+    """Background thread that LISTENs for table-change notifications from other processes.
+
+    Every commit publishes the tables it wrote with ``pg_notify`` (see app.db.changes);
+    this side replays them into the local commit listeners so in-process caches drop
+    stale entries. While disconnected nothing can be trusted, so every reconnect
+    invalidates all tables.
+
+    Other modules can share the connection for their own channels with ``subscribe``.
+    """
+
+    def __init__(self, url: str, channel: str, *, poll_seconds: float = 1.0, retry_seconds: float = 5.0) -> None:
+        self.dsn = _libpq_dsn(url)
+        self.channel = channel
+        self.poll_seconds = poll_seconds
+        self.retry_seconds = retry_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._channels: dict[str, tuple[Callable[[str], None], Callable[[], None] | None]] = {}
+
+    def subscribe(
+        self,
+        channel: str,
+        on_payload: Callable[[str], None],
+        *,
+        on_connect: Callable[[], None] | None = None,
+    ) -> None:
+        """Call ``on_payload(payload)`` for notifications on ``channel``.
+
+        ``on_connect`` runs after every (re)connect, once LISTEN is in place, to catch up
+        on whatever was published while the listener was away.
+        """
+        self._channels[channel] = (on_payload, on_connect)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="cache-invalidation", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _on_notify(self, notify: psycopg.Notify) -> None:
+        if not notify.payload:
+            return
+        if notify.channel in self._channels:
+            self._channels[notify.channel][0](notify.payload)
+        else:
+            changes.dispatch(frozenset({notify.payload}))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                with psycopg.connect(self.dsn, autocommit=True) as conn:
+                    conn.add_notify_handler(self._on_notify)
+                    for channel in (self.channel, *self._channels):
+                        conn.execute(sql.SQL("LISTEN {}").format(sql.Identifier(channel)))
+                    changes.dispatch(_all_tables())
+                    for _, on_connect in self._channels.values():
+                        if on_connect is not None:
+                            on_connect()
+                    logger.info("cache_invalidation_listening", channel=self.channel)
+                    while not self._stop.is_set():
+                        readable, _, _ = select.select([conn.fileno()], [], [], self.poll_seconds)
+                        if readable:
+                            # any round trip makes psycopg read the socket and run the notify handler
+                            conn.execute("SELECT 1")
+            except psycopg.Error as exc:
+                logger.warning("cache_invalidation_disconnected", error=str(exc), retry_in=self.retry_seconds)
+                self._stop.wait(self.retry_seconds)
+
+
+listener = InvalidationListener(
+    settings.CACHE_INVALIDATION_LISTEN_URL or settings.DATABASE_URL,
+    settings.CACHE_INVALIDATION_CHANNEL,
+)
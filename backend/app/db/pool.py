@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any
+
+import structlog
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from app.core.config import settings
+from app.core.metrics import Counter, Gauge, Histogram
+
+logger = structlog.get_logger(__name__)
+
+CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled connection.",
+    ("pool",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+CHECKOUT_TIMEOUTS = Counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after pool_timeout.", ("pool",))
+IN_USE = Gauge("db_pool_connections_in_use", "Connections currently checked out.", ("pool",))
+
+
+class PoolStats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, wait: float, *, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_seconds_total += wait
+            self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _CheckoutTimingMixin:
+    """Times ``_do_get``: queueing for a free slot plus opening an overflow connection."""
+
+    stats: PoolStats
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+        kind = "async" if isinstance(self, AsyncAdaptedQueuePool) else "sync"
+        self._wait_metric = CHECKOUT_WAIT.labels(kind)
+        self._timeout_metric = CHECKOUT_TIMEOUTS.labels(kind)
+        self._in_use_metric = IN_USE.labels(kind)
+
+    def _do_get(self):  # type: ignore[no-untyped-def]
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()  # type: ignore[misc]
+        except exc.TimeoutError:
+            waited = time.perf_counter() - started
+            self.stats.record(waited, timed_out=True)
+            self._timeout_metric.inc()
+            logger.warning("db_pool_checkout_timeout", waited=round(waited, 3), **pool_status(self))
+            raise
+        waited = time.perf_counter() - started
+        self.stats.record(waited)
+        self._wait_metric.observe(waited)
+        self._in_use_metric.inc()
+        return connection
+
+    def _do_return_conn(self, record):  # type: ignore[no-untyped-def]
+        self._in_use_metric.dec()
+        super()._do_return_conn(record)  # type: ignore[misc]
+
+
+class InstrumentedQueuePool(_CheckoutTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_CheckoutTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_status(pool: Any) -> dict[str, Any]:
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "in_use": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+    }
+
+
+def pool_snapshot(pool: Any) -> dict[str, Any]:
+    snapshot = pool_status(pool)
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        snapshot.update(stats.snapshot())
+    return snapshot
+
+
+def engine_options(*, is_async: bool = False) -> dict[str, Any]:
+    connect_args: dict[str, Any] = {}
+    if settings.DB_PGBOUNCER_TRANSACTION_MODE:
+        # Server-side prepared statements do not survive pgbouncer handing the
+        # backend to another client between transactions. Startup "options" are
+        # rejected by pgbouncer too, so statement_timeout belongs on the role there.
+        connect_args["prepare_threshold"] = None
+    elif settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    return {
+        "poolclass": InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "connect_args": connect_args,
+    }
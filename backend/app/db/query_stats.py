@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.engine import Connection, Engine
+
+from app.core.config import settings
+
+logger = structlog.get_logger(__name__)
+
+_IN_LIST = re.compile(r"\bIN\s*\(\s*(?:%\([^)]+\)s|\?|\$\d+)(?:\s*,\s*(?:%\([^)]+\)s|\?|\$\d+))*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Collapse expanded IN lists and whitespace so one query shape maps to one key."""
+    shape = _IN_LIST.sub("IN (...)", statement)
+    return _WHITESPACE.sub(" ", shape).strip()
+
+
+class QueryStats:
+    def __init__(self, route: str | None = None) -> None:
+        self.route = route
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+        self._warned: set[str] = set()
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, duration: float) -> None:
+        shape = statement_shape(statement)
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            self.shapes[shape] += 1
+            repeats = self.shapes[shape]
+            warn = repeats >= settings.DB_REPEATED_QUERY_THRESHOLD and shape not in self._warned
+            if warn:
+                self._warned.add(shape)
+        if warn:
+            logger.warning("db_repeated_query", route=self.route, repeats=repeats, statement=shape[:500])
+
+    @property
+    def duration_ms(self) -> float:
+        return round(self.duration * 1000, 3)
+
+
+QueryObserver = Callable[[Connection, str, Any, Any, bool, float], None]
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+_captures: list[QueryStats] = []
+_observers: list[QueryObserver] = []
+
+
+def start_request(route: str | None = None) -> tuple[QueryStats, Token]:
+    stats = QueryStats(route)
+    return stats, _current.set(stats)
+
+
+def finish_request(token: Token) -> None:
+    _current.reset(token)
+
+
+def current_stats() -> QueryStats | None:
+    return _current.get()
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Record every statement executed on any engine or thread while the block runs."""
+    stats = QueryStats("capture")
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+def add_observer(observer: QueryObserver) -> None:
+    """Call ``observer(conn, statement, parameters, context, executemany, duration)`` after every statement."""
+    if observer not in _observers:
+        _observers.append(observer)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.get("query_started")
+    if not started:
+        return
+    duration = time.perf_counter() - started.pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.record(statement, duration)
+    for capture in _captures:
+        capture.record(statement, duration)
+    for observer in _observers:
+        observer(conn, statement, parameters, context, executemany, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context) -> None:
+    connection = context.connection
+    if connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+
+def add_query_stats(logger: Any, method_name: str, event_dict: dict[str, Any]) -> dict[str, Any]:
+    """structlog processor adding the running totals of the current request."""
+    stats = _current.get()
+    if stats is not None:
+        event_dict.setdefault("db_queries", stats.count)
+        event_dict.setdefault("db_time_ms", stats.duration_ms)
+    return event_dict
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import itertools
+import os
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+import structlog
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.core.config import settings
+from app.core.resilience import CircuitBreaker, CircuitOpenError, CircuitState
+from app.db import changes
+from app.db.pool import engine_options
+from app.db.session import get_async_db, get_db
+
+logger = structlog.get_logger(__name__)
+
+READ_PRIMARY_COOKIE = "read_primary_until"
+_READ_METHODS = {"GET", "HEAD"}
+# Sign-ins, sessions, contact forms and store webhooks write these; no public read shows them,
+# so they never pin the host to the primary.
+_PRIVATE_TABLES = frozenset({"users", "auth_sessions", "submissions", "wc_links", "sync_watermarks"})
+
+
+@dataclass(slots=True)
+class Replica:
+    url: str
+    engine: Engine
+    async_engine: AsyncEngine
+    session_factory: sessionmaker
+    async_session_factory: async_sessionmaker
+    breaker: CircuitBreaker
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping any whose breaker is open."""
+
+    def __init__(self, urls: list[str]) -> None:
+        self.replicas: list[Replica] = []
+        for url in urls:
+            engine = create_engine(url, future=True, **engine_options())
+            async_engine = create_async_engine(url, **engine_options(is_async=True))
+            self.replicas.append(
+                Replica(
+                    url=url,
+                    engine=engine,
+                    async_engine=async_engine,
+                    session_factory=sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True),
+                    async_session_factory=async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False),
+                    breaker=CircuitBreaker(
+                        "db-replica",
+                        failure_threshold=1,
+                        reset_timeout=settings.DB_REPLICA_RETRY_SECONDS,
+                    ),
+                )
+            )
+        self._cursor = itertools.count()
+
+    def candidates(self) -> list[Replica]:
+        if not self.replicas:
+            return []
+        start = next(self._cursor) % len(self.replicas)
+        ordered = self.replicas[start:] + self.replicas[:start]
+        return [replica for replica in ordered if replica.breaker.state != CircuitState.OPEN]
+
+
+replicas = ReplicaSet(settings.DATABASE_READ_URLS)
+
+
+def mark_write() -> None:
+    """Touch the shared marker so every worker on this host reads from the primary for a while."""
+    try:
+        settings.DB_WRITE_MARKER_PATH.touch()
+    except OSError:
+        pass
+
+
+@changes.on_write
+def _mark_content_write(rows: frozenset[changes.ChangedRow]) -> None:
+    if any(table not in _PRIVATE_TABLES for table, _ in rows):
+        mark_write()
+
+
+def _wrote_recently(now: float) -> bool:
+    try:
+        return now - os.stat(settings.DB_WRITE_MARKER_PATH).st_mtime < settings.DB_READ_YOUR_WRITES_SECONDS
+    except OSError:
+        return False
+
+
+def read_primary_until() -> float:
+    return time.time() + settings.DB_READ_YOUR_WRITES_SECONDS
+
+
+def wants_primary(request: Request) -> bool:
+    if not replicas.replicas or request.method not in _READ_METHODS:
+        return True
+    if request.headers.get("authorization"):
+        return True
+    now = time.time()
+    if _wrote_recently(now):
+        return True
+    try:
+        return float(request.cookies.get(READ_PRIMARY_COOKIE, 0)) > now
+    except ValueError:
+        return False
+
+
+def _failed(replica: Replica, exc: Exception) -> None:
+    replica.breaker.record_failure()
+    logger.warning("db_replica_unavailable", replica=replica.engine.url.host, error=str(exc))
+
+
+def get_read_db(request: Request):
+    if not wants_primary(request):
+        for replica in replicas.candidates():
+            try:
+                replica.breaker.before_call()
+            except CircuitOpenError:
+                continue
+            db = replica.session_factory()
+            try:
+                db.connection()
+            except OperationalError as exc:
+                db.close()
+                _failed(replica, exc)
+                continue
+            replica.breaker.record_success()
+            try:
+                yield db
+            finally:
+                db.close()
+            return
+    yield from get_db()
+
+
+async def get_async_read_db(request: Request):
+    if not wants_primary(request):
+        for replica in replicas.candidates():
+            try:
+                replica.breaker.before_call()
+            except CircuitOpenError:
+                continue
+            async with replica.async_session_factory() as db:
+                try:
+                    await db.connection()
+                except OperationalError as exc:
+                    _failed(replica, exc)
+                    continue
+                replica.breaker.record_success()
+                yield db
+            return
+    async for db in get_async_db():
+        yield db
+
+
+@asynccontextmanager
+async def async_read_session(request: Request) -> AsyncIterator[AsyncSession]:
+    """``get_async_read_db`` as a context manager, for handlers that only sometimes need the database."""
+    sessions = get_async_read_db(request)
+    db = await anext(sessions)
+    try:
+        yield db
+    finally:
+        await sessions.aclose()
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+import structlog
+from sqlalchemy.engine import Connection
+
+from app.core.config import settings
+from app.db.query_stats import add_observer, current_stats, statement_shape
+
+logger = structlog.get_logger(__name__)
+
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|\$\d+|\?")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_EXPLAINABLE = re.compile(r"^\s*(?:select|with)\b", re.IGNORECASE)
+_NUMERIC_TYPES = (bool, int, float)
+
+
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so every execution of the same query maps to one fingerprint."""
+    normalized = statement_shape(statement)
+    normalized = _STRING_LITERAL.sub("?", normalized)
+    normalized = _PLACEHOLDER.sub("?", normalized)
+    return _NUMBER_LITERAL.sub("?", normalized)
+
+
+def fingerprint_id(normalized: str) -> str:
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _redact_value(value: Any) -> Any:
+    if value is None or isinstance(value, _NUMERIC_TYPES):
+        return value
+    if isinstance(value, (Decimal, date)):
+        return str(value)
+    if isinstance(value, (str, bytes)):
+        return f"<{type(value).__name__} len={len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return [_redact_value(item) for item in value]
+    return f"<{type(value).__name__}>"
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Keep numbers, dates and shapes; never store text, which may hold emails, hashes or tokens."""
+    if isinstance(parameters, dict):
+        return {key: _redact_value(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_redact_value(value) for value in parameters]
+    return _redact_value(parameters)
+
+
+@dataclass(slots=True)
+class SlowQueryEntry:
+    id: str
+    fingerprint: str
+    calls: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    last_route: str | None = None
+    last_parameters: Any = None
+    explain: list[str] | None = None
+    explain_ms: float | None = None
+    explained_at: float = 0.0
+    explain_pending: bool = False
+    routes: dict[str, int] = field(default_factory=dict)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "fingerprint": self.fingerprint,
+            "calls": self.calls,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.calls, 3) if self.calls else 0.0,
+            "max_ms": round(self.max_ms, 3),
+            "last_seen": datetime.fromtimestamp(self.last_seen).astimezone().isoformat() if self.last_seen else None,
+            "routes": dict(sorted(self.routes.items(), key=lambda item: item[1], reverse=True)[:5]),
+            "last_parameters": self.last_parameters,
+            "explain_ms": self.explain_ms,
+            "explain": self.explain,
+        }
+
+
+class SlowQueryLog:
+    """Per-process aggregate of statements slower than DB_SLOW_QUERY_THRESHOLD_MS, keyed by fingerprint."""
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: dict[str, SlowQueryEntry] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        normalized: str,
+        duration_ms: float,
+        *,
+        route: str | None,
+        parameters: Any,
+        now: float,
+    ) -> SlowQueryEntry:
+        key = fingerprint_id(normalized)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                if len(self._entries) >= self.maxsize:
+                    # Drop the cheapest fingerprint so the expensive ones stay ranked.
+                    cheapest = min(self._entries.values(), key=lambda item: item.total_ms)
+                    del self._entries[cheapest.id]
+                entry = self._entries[key] = SlowQueryEntry(id=key, fingerprint=normalized)
+            entry.calls += 1
+            entry.total_ms += duration_ms
+            entry.max_ms = max(entry.max_ms, duration_ms)
+            entry.last_seen = now
+            entry.last_route = route
+            entry.last_parameters = redact_parameters(parameters)
+            if route:
+                entry.routes[route] = entry.routes.get(route, 0) + 1
+            return entry
+
+    def claim_explain(self, entry: SlowQueryEntry, duration_ms: float, now: float) -> bool:
+        """Reserve the EXPLAIN sample for this fingerprint if it is due."""
+        if not settings.DB_SLOW_QUERY_EXPLAIN_MS or duration_ms < settings.DB_SLOW_QUERY_EXPLAIN_MS:
+            return False
+        with self._lock:
+            if entry.explain_pending or now - entry.explained_at < settings.DB_SLOW_QUERY_EXPLAIN_INTERVAL_SECONDS:
+                return False
+            entry.explain_pending = True
+            return True
+
+    def ranking(self, *, order_by: str = "total_ms", limit: int = 20) -> list[dict[str, Any]]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda item: getattr(item, order_by), reverse=True)
+            return [entry.snapshot() for entry in entries[:limit]]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+slow_query_log = SlowQueryLog(settings.DB_SLOW_QUERY_MAX_FINGERPRINTS)
+_explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+
+
+def _explain(entry: SlowQueryEntry, statement: str, parameters: Any) -> None:
+    # Runs on the primary with the original parameters, inside a transaction that is
+    # always rolled back; only SELECTs are sampled because ANALYZE executes the query.
+    from app.db.session import engine
+
+    try:
+        with engine.connect().execution_options(slow_query_log=False) as conn:
+            with conn.begin() as transaction:
+                if settings.DB_STATEMENT_TIMEOUT_MS:
+                    conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.DB_STATEMENT_TIMEOUT_MS)}")
+                started = time.perf_counter()
+                plan = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS) {statement}", parameters).scalars().all()
+                entry.explain_ms = round((time.perf_counter() - started) * 1000, 3)
+                transaction.rollback()
+        entry.explain = list(plan)
+    except Exception as exc:  # noqa: BLE001 - sampling must never surface to callers
+        logger.warning("db_slow_query_explain_failed", fingerprint_id=entry.id, error=str(exc))
+    finally:
+        entry.explained_at = time.time()
+        entry.explain_pending = False
+
+
+def _observe(
+    conn: Connection,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+    duration: float,
+) -> None:
+    if not settings.DB_SLOW_QUERY_LOG_ENABLED:
+        return
+    duration_ms = duration * 1000
+    if duration_ms < settings.DB_SLOW_QUERY_THRESHOLD_MS:
+        return
+    if context is not None and context.execution_options.get("slow_query_log") is False:
+        return
+
+    stats = current_stats()
+    route = stats.route if stats is not None else None
+    now = time.time()
+    normalized = fingerprint(statement)
+    entry = slow_query_log.record(normalized, duration_ms, route=route, parameters=parameters, now=now)
+    logger.warning(
+        "db_slow_query",
+        fingerprint_id=entry.id,
+        duration_ms=round(duration_ms, 3),
+        route=route,
+        statement=normalized[:500],
+        parameters=entry.last_parameters,
+    )
+
+    if (
+        conn.dialect.name == "postgresql"
+        and not executemany
+        and _EXPLAINABLE.match(statement)
+        and slow_query_log.claim_explain(entry, duration_ms, now)
+    ):
+        _explainer.submit(_explain, entry, statement, parameters)
+
+
+add_observer(_observe)
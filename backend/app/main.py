@@ -1,20 +1,30 @@
+from contextlib import asynccontextmanager
+
+import anyio
+
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.middleware import SlowAPIMiddleware
 
+from app.api.responses import ORJSONResponse
 from app.api.routers import auth, health, users, media
 from app.api.routers import biography, blog_categories, blogs, hero_slides, philosophy, paintings, site_settings, home_sections
-from app.api.routers import pages, submissions, analytics
+from app.api.routers import pages, submissions, analytics, metrics, home
 from app.api.routers.commerce import products as commerce_products
 from app.api.routers.integrations import woocommerce
 from app.api.routers.museum import artifacts, rooms
+from app.core import tracing
+from app.core.media_files import MediaFiles
 from app.core.config import settings
 from app.core.logging import configure_logging
-from app.core.rate_limit import limiter
+from app.db.invalidation import listener as invalidation_listener
+from app.middleware.cache_headers import CacheHeadersMiddleware
+from app.middleware.compression import CompressionMiddleware
+from app.middleware.metrics import MetricsMiddleware, track_in_flight
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.read_your_writes import ReadYourWritesMiddleware
 from app.middleware.request_id import RequestIDMiddleware
+from app.middleware.response_cache import ResponseCacheMiddleware
+from app.services import cdn, sessions
 
 
 configure_logging()
@@ -30,20 +40,39 @@ tags_metadata = [
     {"name": "site-settings", "description": "Global site configuration and social links."},
     {"name": "blogs", "description": "Blog publishing workflows."},
     {"name": "blog-categories", "description": "Blog categories for magazine taxonomy."},
+    {"name": "home", "description": "Homepage payload assembled in a single request."},
     {"name": "home-sections", "description": "Homepage configurable sections (ads, categories)."},
     {"name": "paintings", "description": "Paintings catalog and metadata."},
     {"name": "museum-rooms", "description": "Virtual museum room management."},
     {"name": "museum-artifacts", "description": "Virtual museum artifacts."},
     {"name": "commerce", "description": "Commerce catalog and product syncs."},
     {"name": "integrations:woocommerce", "description": "WooCommerce integration and webhooks."},
+    {"name": "metrics", "description": "Operational metrics for the API process."},
 ]
 
-app = FastAPI(title="Memshaheb Magazine API", version="0.1.0", openapi_tags=tags_metadata)
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    # the listener reloads on connect too, but it may be switched off or not reach the database
+    await anyio.to_thread.run_sync(sessions.load_revoked)
+    if settings.CACHE_INVALIDATION_LISTEN:
+        invalidation_listener.start()
+    yield
+    invalidation_listener.stop()
+    cdn.purger.flush(timeout=settings.CDN_PURGE_TIMEOUT_SECONDS)
+    tracing.processor.flush(timeout=5)
+
+
+app = FastAPI(title="Memshaheb Magazine API", version="0.1.0", openapi_tags=tags_metadata, lifespan=lifespan, default_response_class=ORJSONResponse)
+
+app.add_middleware(CacheHeadersMiddleware)
+app.add_middleware(ResponseCacheMiddleware)
+# outside the cache, so cached entries are stored once, uncompressed, with encoded copies
+app.add_middleware(CompressionMiddleware)
 app.add_middleware(RequestIDMiddleware)
-app.state.limiter = limiter
-app.add_middleware(SlowAPIMiddleware)
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+if settings.DATABASE_READ_URLS:
+    app.add_middleware(ReadYourWritesMiddleware)
+app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -53,6 +82,7 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
     allow_credentials=settings.CORS_ALLOW_CREDENTIALS,
 )
+app.add_middleware(MetricsMiddleware)
 
 app.include_router(health.router)
 app.include_router(auth.router)
@@ -63,6 +93,7 @@ app.include_router(biography.router)
 app.include_router(philosophy.router)
 app.include_router(site_settings.router)
 app.include_router(blog_categories.router)
+app.include_router(home.router)
 app.include_router(home_sections.router)
 app.include_router(blogs.router)
 app.include_router(pages.router)
@@ -73,9 +104,12 @@ app.include_router(rooms.router)
 app.include_router(artifacts.router)
 app.include_router(commerce_products.router)
 app.include_router(woocommerce.router)
+app.include_router(metrics.router)
 
 app.mount(
     "/media",
-    StaticFiles(directory=settings.MEDIA_LOCAL_ROOT, check_dir=False),
+    MediaFiles(settings.MEDIA_LOCAL_ROOT),
     name="media",
 )
+
+track_in_flight(app.routes)
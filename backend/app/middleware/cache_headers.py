@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.cache_policy import POLICY_STATE_KEY, PRIVATE, SURROGATE_STATE_KEY, CachePolicy
+
+_CACHEABLE_METHODS = {"GET", "HEAD"}
+
+
+class CacheHeadersMiddleware:
+    """Write the Cache-Control and Surrogate-Key headers declared through app.api.cache_policy."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in _CACHEABLE_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        authenticated = "authorization" in Headers(scope=scope)
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                state = scope.get("state") or {}
+                policy: CachePolicy | None = state.get(POLICY_STATE_KEY)
+                if policy is not None:
+                    if authenticated:
+                        policy = PRIVATE
+                    headers = MutableHeaders(scope=message)
+                    if "cache-control" not in headers:
+                        headers["Cache-Control"] = policy.header()
+                    keys = state.get(SURROGATE_STATE_KEY)
+                    if keys and policy.public:
+                        headers["Surrogate-Key"] = " ".join(sorted(keys))
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import compression
+from app.core.config import settings
+
+# no body, or a byte range of the identity body
+_UNENCODED_STATUSES = {204, 206, 304}
+
+
+class CompressionMiddleware:
+    """Compress responses with the best encoding the client accepts (br, then gzip).
+
+    Bodies are encoded chunk by chunk as the app sends them, never buffered whole; a body
+    sent in a single message keeps a Content-Length for its encoded size. Small
+    bodies, excluded media types and responses that already carry a Content-Encoding
+    (e.g. precompressed entries replayed by the response cache) pass through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, *, minimum_size: int | None = None) -> None:
+        self.app = app
+        self.minimum_size = settings.COMPRESSION_MIN_SIZE if minimum_size is None else minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = compression.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        start: Message | None = None
+        encoder: compression.StreamEncoder | None = None
+        passthrough = False
+
+        async def _send(message: Message) -> None:
+            nonlocal start, encoder, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message.get("headers", []))
+                if (
+                    message["status"] in _UNENCODED_STATUSES
+                    or "content-encoding" in headers
+                    or not compression.is_compressible(headers.get("content-type"))
+                ):
+                    passthrough = True
+                    await send(message)
+                    return
+                compression.add_vary(MutableHeaders(scope=message))
+                length = headers.get("content-length")
+                if encoding is None or (length is not None and int(length) < self.minimum_size):
+                    passthrough = True
+                    await send(message)
+                    return
+                # wait for the first chunk: a single small one goes out as it is
+                start = message
+                return
+
+            if message["type"] != "http.response.body" or passthrough:
+                if start is not None:
+                    # e.g. a zerocopysend body: nothing to encode, but the start must go first
+                    passthrough = True
+                    await send(start)
+                    start = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    start = None
+                    return
+                encoder = compression.StreamEncoder(encoding)
+                if not more_body:
+                    # the whole body in one message: its encoded length is known
+                    encoded = encoder.chunk(body, final=True)
+                    compression.mark_encoded(MutableHeaders(scope=start), encoding, len(encoded))
+                    await send(start)
+                    start = None
+                    await send({"type": "http.response.body", "body": encoded, "more_body": False})
+                    return
+                compression.mark_encoded(MutableHeaders(scope=start), encoding)
+                await send(start)
+                start = None
+            await send({"type": "http.response.body", "body": encoder.chunk(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, _send)
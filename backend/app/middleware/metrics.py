@@ -0,0 +1,78 @@
+import time
+
+from starlette.datastructures import Headers
+from starlette.routing import Mount, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import Counter, Gauge, Histogram
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route"))
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently inside a route handler.", ("route",))
+
+_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+def _route_label(scope: Scope, response_headers: list[tuple[bytes, bytes]]) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # answered before routing: keep raw paths out of the label set
+    if "x-cache" in Headers(raw=response_headers):
+        return "response_cache"
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Count and time every request by route template (``/blogs/{identifier}``, not the raw path)."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+        response_headers: list[tuple[bytes, bytes]] = []
+
+        async def _send(message: Message) -> None:
+            nonlocal status, response_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                response_headers = message.get("headers", [])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            method = scope["method"] if scope["method"] in _METHODS else "OTHER"
+            route = _route_label(scope, response_headers)
+            REQUESTS.labels(method, route, status).inc()
+            LATENCY.labels(method, route).observe(time.perf_counter() - started)
+
+
+def _track_in_flight(template: str, app: ASGIApp) -> ASGIApp:
+    gauge = IN_FLIGHT.labels(template)
+
+    async def tracked(scope: Scope, receive: Receive, send: Send) -> None:
+        gauge.inc()
+        try:
+            await app(scope, receive, send)
+        finally:
+            gauge.dec()
+
+    return tracked
+
+
+def track_in_flight(routes: list) -> None:
+    """Wrap each route's ASGI app so the in-flight gauge is labelled by its template.
+
+    The template is only known once the router has matched, after the middleware
+    stack has run, so this hooks in at the route itself. Call once all routers are included.
+    """
+    for route in routes:
+        if isinstance(route, (Route, Mount)):
+            route.app = _track_in_flight(route.path, route.app)
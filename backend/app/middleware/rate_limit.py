@@ -0,0 +1,59 @@
+import math
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.rate_limit import Rate, RateLimiter, client_ip, matched_route, route_limits
+from app.core.rate_limit import limiter as default_limiter
+
+
+class RateLimitMiddleware:
+    """Enforce each API route's limits, or the limiter's default rate per client IP.
+
+    The route is looked up before the app runs, so responses served from the response
+    cache are charged like any other. Static mounts and unmatched paths go straight through.
+    """
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter | None = None) -> None:
+        self.app = app
+        self.limiter = limiter or default_limiter
+
+    def _checks(self, scope: Scope) -> list[tuple[str, Rate]]:
+        route = matched_route(scope)
+        if route is None:
+            return []
+        limits = route_limits(route)
+        if limits:
+            return [(limit.key(scope, route), limit.rate) for limit in limits]
+        if self.limiter.default is None:
+            return []
+        return [(f"global|ip:{client_ip(scope)}", self.limiter.default)]
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        checks = self._checks(scope) if scope["type"] == "http" and settings.RATE_LIMIT_ENABLED else []
+        if not checks:
+            await self.app(scope, receive, send)
+            return
+
+        decisions = [(await self.limiter.hit(key, rate), rate) for key, rate in checks]
+        # the tightest limit decides, and its numbers go in the headers
+        decision, rate = min(decisions, key=lambda item: (item[0].allowed, item[0].remaining))
+        headers = {
+            "X-RateLimit-Limit": str(decision.limit),
+            "X-RateLimit-Remaining": str(decision.remaining),
+            "X-RateLimit-Reset": str(math.ceil(decision.reset_after)),
+        }
+        if not decision.allowed:
+            headers["Retry-After"] = str(math.ceil(decision.retry_after))
+            response = JSONResponse({"detail": f"Rate limit exceeded: {rate.text}"}, status_code=429, headers=headers)
+            await response(scope, receive, send)
+            return
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).update(headers)
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -0,0 +1,45 @@
+import math
+from http.cookies import SimpleCookie
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.routing import READ_PRIMARY_COOKIE, read_primary_until
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+def _read_primary_cookie() -> str:
+    cookie: SimpleCookie = SimpleCookie()
+    cookie[READ_PRIMARY_COOKIE] = f"{read_primary_until():.3f}"
+    morsel = cookie[READ_PRIMARY_COOKIE]
+    morsel["max-age"] = math.ceil(settings.DB_READ_YOUR_WRITES_SECONDS)
+    morsel["path"] = "/"
+    morsel["httponly"] = True
+    morsel["samesite"] = "lax"
+    return morsel.OutputString()
+
+
+class ReadYourWritesMiddleware:
+    """Pin a signed-in client to the primary for a while after it writes, so it reads its own changes.
+
+    Only requests carrying credentials get the cookie: anonymous writes (sign-ins, contact
+    forms, webhooks) have nothing to read back. Commits that change public content also touch
+    the host-wide marker, from ``app.db.routing``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] in _SAFE_METHODS or "authorization" not in Headers(scope=scope):
+            await self.app(scope, receive, send)
+            return
+
+        async def _send(message: Message) -> None:
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                MutableHeaders(scope=message).append("set-cookie", _read_primary_cookie())
+            await send(message)
+
+        await self.app(scope, receive, _send)
@@ -1,25 +1,72 @@
+import time
 import uuid
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.core import tracing
 from app.core.config import settings
 from app.core.logging import bind_request_context
+from app.db import query_stats
 
 
-class RequestIDMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        request_id = request.headers.get(settings.REQUEST_ID_HEADER)
-        if not request_id:
-            request_id = uuid.uuid4().hex
+class RequestIDMiddleware:
+    """Tag each request with an ID, bind it to the log context, trace it and report timings.
 
-        request.state.request_id = request_id
-        bind_request_context(request_id=request_id, path=str(request.url.path))
+    Written as plain ASGI rather than ``BaseHTTPMiddleware`` so the response is streamed
+    straight through instead of being relayed through a memory channel and an extra task.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+        self.header = settings.REQUEST_ID_HEADER
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = Headers(scope=scope)
+        request_id = request_headers.get(self.header) or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+        path = scope["path"]
+        bind_request_context(request_id=request_id, path=path)
+        stats, token = query_stats.start_request(f"{scope['method']} {path}")
+        trace, trace_token = tracing.start_trace(request_headers.get("traceparent"))
+        started = time.perf_counter()
+        status = 500
+
+        async def _send(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers[self.header] = request_id
+                if settings.SERVER_TIMING_ENABLED or trace.reveal_timing:
+                    elapsed_ms = round((time.perf_counter() - started) * 1000, 3)
+                    headers.append("Server-Timing", f'db;dur={stats.duration_ms};desc="{stats.count} queries"')
+                    if trace.reveal_timing:
+                        # phase detail names internals (auth, external calls), so admins only
+                        for entry in trace.server_timing():
+                            headers.append("Server-Timing", entry)
+                    headers.append("Server-Timing", f"app;dur={elapsed_ms}")
+            await send(message)
 
         try:
-            response: Response = await call_next(request)
+            await self.app(scope, receive, _send)
         finally:
+            query_stats.finish_request(token)
             bind_request_context()
-
-        response.headers[settings.REQUEST_ID_HEADER] = request_id
-        return response
+            route = scope.get("route")
+            template = getattr(route, "path", None)
+            attributes = {
+                "http.request.method": scope["method"],
+                "url.path": path,
+                "http.response.status_code": status,
+                "request.id": request_id,
+                "db.query_count": stats.count,
+            }
+            if template:
+                attributes["http.route"] = template
+            name = f"{scope['method']} {template}" if template else scope["method"]
+            tracing.processor.on_end(tracing.finish_trace(trace_token, name=name, attributes=attributes))
@@ -0,0 +1,434 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections.abc import Iterable
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Protocol
+from urllib.parse import parse_qsl, urlencode
+
+import anyio
+import structlog
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.api.conditional import Validators, is_not_modified
+from app.core import compression
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.metrics import Counter
+from app.db import changes
+from app.db.routing import READ_PRIMARY_COOKIE
+
+logger = structlog.get_logger(__name__)
+
+REQUESTS = Counter("response_cache_requests_total", "Cacheable requests by outcome.", ("state",))
+
+# Anonymous GETs under these prefixes are cacheable; the tables are the surrogate keys
+# that drop an entry when a commit writes them. Longest prefix wins.
+CACHEABLE_ROUTES: dict[str, tuple[str, ...]] = {
+    "/blogs": ("blogs", "blog_categories"),
+    "/blog-categories": ("blog_categories",),
+    "/paintings": ("paintings",),
+    "/pages": ("pages", "page_sections"),
+    "/site/settings": ("site_settings",),
+    "/biography": ("biography",),
+    "/philosophy": ("philosophy",),
+    "/hero-slides": ("hero_slides",),
+    "/home": ("site_settings", "hero_slides", "home_sections", "blogs", "blog_categories", "paintings", "philosophy"),
+    "/home/sections": ("home_sections",),
+    "/museum/rooms": ("museum_rooms", "museum_artifacts", "paintings"),
+    "/museum/artifacts": ("museum_artifacts", "paintings"),
+}
+
+_CONDITIONAL_HEADERS = {b"if-none-match", b"if-modified-since"}
+_UNCACHEABLE_DIRECTIVES = ("private", "no-store")
+
+
+@dataclass(slots=True)
+class CachedResponse:
+    status: int
+    headers: list[tuple[str, str]]
+    body: bytes
+    stored_at: float
+    fresh_until: float
+    stale_until: float
+    surrogate_keys: tuple[str, ...]
+    # precompressed copies of ``body`` by Content-Encoding
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+    def is_fresh(self, now: float) -> bool:
+        return now < self.fresh_until
+
+
+# a captured response and whether it went into the cache
+Fetched = tuple[CachedResponse, bool]
+
+
+class ResponseCacheBackend(Protocol):
+    def get(self, key: str) -> CachedResponse | None: ...
+
+    def set(self, key: str, entry: CachedResponse) -> None: ...
+
+    def invalidate(self, surrogate_keys: Iterable[str]) -> int: ...
+
+    def clear(self) -> None: ...
+
+
+class MemoryBackend:
+    """Per-worker LRU; cross-worker invalidation arrives through app.db.changes."""
+
+    def __init__(self, *, maxsize: int) -> None:
+        self._cache: TTLCache[CachedResponse] = TTLCache(ttl=float("inf"), maxsize=maxsize)
+
+    def get(self, key: str) -> CachedResponse | None:
+        entry = self._cache.get(key)
+        if entry is not None and entry.stale_until <= time.time():
+            return None
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        self._cache.set(key, entry, tags=entry.surrogate_keys)
+
+    def invalidate(self, surrogate_keys: Iterable[str]) -> int:
+        return self._cache.invalidate_tags(*surrogate_keys)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+class FileBackend:
+    """Directory store shared by every worker that can see it (a tmpfs or a shared volume).
+
+    ``entries/<hash>`` holds one JSON line of metadata followed by the body and then its
+    precompressed variants; ``keys/<surrogate>/<hash>`` marks which entries a surrogate
+    key covers.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self._entries = root / "entries"
+        self._keys = root / "keys"
+
+    @staticmethod
+    def _name(value: str) -> str:
+        return hashlib.sha1(value.encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        path = self._entries / self._name(key)
+        try:
+            with path.open("rb") as fh:
+                meta = json.loads(fh.readline())
+                data = fh.read()
+        except (OSError, ValueError):
+            return None
+        sizes = meta.pop("variant_sizes", ())
+        variants: dict[str, bytes] = {}
+        end = offset = len(data) - sum(size for _, size in sizes)
+        for encoding, size in sizes:
+            variants[encoding] = data[offset : offset + size]
+            offset += size
+        entry = CachedResponse(
+            body=data[:end],
+            variants=variants,
+            headers=[(name, value) for name, value in meta.pop("headers")],
+            surrogate_keys=tuple(meta.pop("surrogate_keys")),
+            **meta,
+        )
+        if entry.stale_until <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry
+
+    def set(self, key: str, entry: CachedResponse) -> None:
+        name = self._name(key)
+        meta = asdict(entry)
+        body = meta.pop("body")
+        variants = meta.pop("variants")
+        meta["variant_sizes"] = [[encoding, len(data)] for encoding, data in variants.items()]
+        try:
+            self._entries.mkdir(parents=True, exist_ok=True)
+            tmp = self._entries / f".{name}.{os.getpid()}"
+            with tmp.open("wb") as fh:
+                fh.write(json.dumps(meta).encode() + b"\n")
+                fh.write(body)
+                for data in variants.values():
+                    fh.write(data)
+            os.replace(tmp, self._entries / name)
+            for surrogate in entry.surrogate_keys:
+                marker_dir = self._keys / self._name(surrogate)
+                marker_dir.mkdir(parents=True, exist_ok=True)
+                (marker_dir / name).touch()
+        except OSError as exc:
+            logger.warning("response_cache_write_failed", error=str(exc))
+
+    def invalidate(self, surrogate_keys: Iterable[str]) -> int:
+        removed = 0
+        for surrogate in surrogate_keys:
+            marker_dir = self._keys / self._name(surrogate)
+            try:
+                markers = list(marker_dir.iterdir())
+            except OSError:
+                continue
+            for marker in markers:
+                try:
+                    (self._entries / marker.name).unlink()
+                    removed += 1
+                except OSError:
+                    pass
+                marker.unlink(missing_ok=True)
+        return removed
+
+    def clear(self) -> None:
+        for directory in (self._entries, self._keys):
+            for path in sorted(directory.glob("**/*"), reverse=True) if directory.exists() else ():
+                if path.is_dir():
+                    path.rmdir()
+                else:
+                    path.unlink(missing_ok=True)
+
+
+def build_backend() -> ResponseCacheBackend:
+    if settings.RESPONSE_CACHE_BACKEND == "file":
+        return FileBackend(settings.RESPONSE_CACHE_DIR)
+    return MemoryBackend(maxsize=settings.RESPONSE_CACHE_MAX_ENTRIES)
+
+
+backend: ResponseCacheBackend = build_backend()
+
+
+@changes.on_commit
+def _invalidate_responses(tables: frozenset[str]) -> None:
+    backend.invalidate(tables)
+
+
+def surrogate_tables(path: str) -> tuple[str, ...] | None:
+    for prefix in sorted(CACHEABLE_ROUTES, key=len, reverse=True):
+        if path == prefix or path.startswith(prefix + "/"):
+            return CACHEABLE_ROUTES[prefix]
+    return None
+
+
+def cache_key(scope: Scope) -> str:
+    query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+    normalized = urlencode(sorted(query))
+    return f"{scope['path']}?{normalized}" if normalized else scope["path"]
+
+
+def _is_anonymous(scope: Scope) -> bool:
+    headers = Headers(scope=scope)
+    if "authorization" in headers:
+        return False
+    # writers read their own changes from the primary for a while; never serve them a cached copy
+    return READ_PRIMARY_COOKIE not in headers.get("cookie", "")
+
+
+def _shareable(headers: list[tuple[str, str]]) -> bool:
+    """Whether a response may go to clients other than the one it was made for."""
+    for name, value in headers:
+        lowered = name.lower()
+        if lowered == "set-cookie":
+            return False
+        if lowered == "cache-control" and any(directive in value.lower() for directive in _UNCACHEABLE_DIRECTIVES):
+            return False
+    return True
+
+
+def _storable(status: int, headers: list[tuple[str, str]], body: bytes) -> bool:
+    return status == 200 and len(body) <= settings.RESPONSE_CACHE_MAX_BODY_BYTES and _shareable(headers)
+
+
+class ResponseCacheMiddleware:
+    """Serve anonymous GETs from a shared cache, refreshing stale entries in the background.
+
+    Concurrent misses for one key within a worker are coalesced onto a single downstream call.
+    A miss runs the route once: a response that cannot be stored (an error, a Set-Cookie,
+    ``private``/``no-store``, an oversized body) is replayed from what was captured. Waiters
+    only share a successful response without a cookie; otherwise each runs the route itself.
+    Rate limits are checked by RateLimitMiddleware further out, so hits are charged too.
+    """
+
+    def __init__(self, app: ASGIApp, cache: ResponseCacheBackend | None = None) -> None:
+        self.app = app
+        self.cache = cache
+        if cache is not None:
+            changes.on_commit(lambda tables: cache.invalidate(tables))
+        self._inflight: dict[str, asyncio.Future[Fetched | None]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def _backend(self) -> ResponseCacheBackend:
+        return self.cache if self.cache is not None else backend
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not settings.RESPONSE_CACHE_ENABLED
+            or scope["method"] not in {"GET", "HEAD"}
+            or not _is_anonymous(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        tables = surrogate_tables(scope["path"])
+        if tables is None:
+            await self.app(scope, receive, send)
+            return
+
+        key = cache_key(scope)
+        now = time.time()
+        entry = self._backend.get(key)
+        if entry is not None:
+            state = "HIT" if entry.is_fresh(now) else "STALE"
+            if state == "STALE":
+                future = self._claim(key)
+                if future is not None:
+                    task = asyncio.create_task(self._refresh(key, future, scope, tables))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+            await self._replay(entry, scope, send, state, now)
+            return
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                fetched = await asyncio.shield(pending)
+            except Exception:
+                fetched = None
+            if fetched is None:
+                # the fill failed, or its response was meant for that one client
+                REQUESTS.labels("BYPASS").inc()
+                await self.app(scope, receive, send)
+                return
+        else:
+            fetched = await self._fill(key, self._claim(key), scope, tables)
+        entry, stored = fetched
+        await self._replay(entry, scope, send, "MISS" if stored else "BYPASS", time.time())
+
+    def _claim(self, key: str) -> asyncio.Future[Fetched | None] | None:
+        """Register this worker as the one fetching ``key``; ``None`` if someone already is."""
+        if key in self._inflight:
+            return None
+        future: asyncio.Future[Fetched | None] = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    async def _fill(
+        self,
+        key: str,
+        future: asyncio.Future[Fetched | None],
+        scope: Scope,
+        tables: tuple[str, ...],
+    ) -> Fetched:
+        try:
+            entry, stored = await self._fetch(scope, tables)
+            if stored:
+                self._backend.set(key, entry)
+            # waiters may share an oversized 2xx body, but not an error (a 429 or 403 can be about
+            # the one client that ran the fill) and not another client's cookie
+            shared = stored or (200 <= entry.status < 300 and _shareable(entry.headers))
+            future.set_result((entry, stored) if shared else None)
+            return entry, stored
+        except BaseException as exc:
+            future.set_exception(exc)
+            # nobody may be waiting on the future; mark the exception retrieved
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _refresh(
+        self,
+        key: str,
+        future: asyncio.Future[Fetched | None],
+        scope: Scope,
+        tables: tuple[str, ...],
+    ) -> None:
+        try:
+            await self._fill(key, future, scope, tables)
+        except Exception as exc:  # noqa: BLE001 - the stale copy was already served
+            logger.warning("response_cache_refresh_failed", key=key, error=str(exc))
+
+    async def _fetch(self, scope: Scope, tables: tuple[str, ...]) -> Fetched:
+        """Run the route once and capture its response, with whether it may be stored."""
+        # always fetch the full GET body; conditional headers are answered from the entry
+        downstream = dict(scope)
+        downstream["method"] = "GET"
+        downstream["headers"] = [(name, value) for name, value in scope["headers"] if name not in _CONDITIONAL_HEADERS]
+
+        status = 500
+        raw_headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+
+        async def _receive() -> Message:
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def _send(message: Message) -> None:
+            nonlocal status, raw_headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                raw_headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+        await self.app(downstream, _receive, _send)
+        if "route" in downstream:
+            # lets outer middleware label a MISS by its route template
+            scope["route"] = downstream["route"]
+        headers = [(name.decode("latin-1"), value.decode("latin-1")) for name, value in raw_headers]
+        body = b"".join(chunks)
+        storable = _storable(status, headers, body)
+        now = time.time()
+        entry = CachedResponse(
+            status=status,
+            headers=headers,
+            body=body,
+            stored_at=now,
+            fresh_until=now + settings.RESPONSE_CACHE_TTL_SECONDS,
+            stale_until=now + settings.RESPONSE_CACHE_TTL_SECONDS + settings.RESPONSE_CACHE_STALE_SECONDS,
+            surrogate_keys=tables,
+        )
+        if storable:
+            # stored levels are slow on large bodies; keep them off the event loop
+            entry.variants = await anyio.to_thread.run_sync(
+                compression.precompress, body, {name.lower(): value for name, value in headers}
+            )
+        return entry, storable
+
+    async def _replay(self, entry: CachedResponse, scope: Scope, send: Send, state: str, now: float) -> None:
+        headers = MutableHeaders(raw=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in entry.headers])
+        headers["Age"] = str(max(0, int(now - entry.stored_at)))
+        headers["X-Cache"] = state
+        REQUESTS.labels(state).inc()
+
+        body = entry.body
+        if entry.variants:
+            compression.add_vary(headers)
+            encoding = self._encoding(scope, entry)
+            if encoding is not None:
+                body = entry.variants[encoding]
+                compression.mark_encoded(headers, encoding, len(body))
+
+        etag = headers.get("etag")
+        if etag and entry.status == 200 and is_not_modified(Request(scope), Validators(etag=etag)):
+            del headers["content-length"]
+            del headers["content-encoding"]
+            await send({"type": "http.response.start", "status": 304, "headers": headers.raw})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if scope["method"] == "HEAD":
+            body = b""
+        await send({"type": "http.response.start", "status": entry.status, "headers": headers.raw})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    def _encoding(scope: Scope, entry: CachedResponse) -> str | None:
+        if scope["method"] == "HEAD" or not settings.COMPRESSION_ENABLED:
+            return None
+        encoding = compression.negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        return encoding if encoding in entry.variants else None
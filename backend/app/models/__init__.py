@@ -1,3 +1,4 @@
+from app.models.auth_session import AuthSession  # noqa: F401
 from app.models.biography import Biography  # noqa: F401
 from app.models.blog import BlogPost  # noqa: F401
 from app.models.blog_category import BlogCategory  # noqa: F401
@@ -11,5 +12,6 @@ from app.models.philosophy import Philosophy  # noqa: F401
 from app.models.page import Page, PageSection  # noqa: F401
 from app.models.submission import Submission  # noqa: F401
 from app.models.site_settings import SiteSettings  # noqa: F401
+from app.models.sync_watermark import SyncWatermark  # noqa: F401
 from app.models.user import User, UserRole  # noqa: F401
 from app.models.wc_link import WCLink, WCProductKind, WCSyncState  # noqa: F401
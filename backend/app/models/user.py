@@ -24,6 +24,8 @@ class User(Base):
     role: Mapped[UserRole] = mapped_column(Enum(UserRole, name="user_role"), nullable=False, default=UserRole.READER)
     display_name: Mapped[str | None] = mapped_column(String(255))
     bio: Mapped[str | None] = mapped_column(nullable=True)
+    # bumped to invalidate every access token issued so far (password or role change)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
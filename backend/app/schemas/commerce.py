@@ -20,3 +20,4 @@ class CommerceProduct(BaseModel):
 
 class CommerceProductList(BaseModel):
     items: list[CommerceProduct]
+    next_cursor: Optional[str] = None
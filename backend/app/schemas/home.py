@@ -0,0 +1,20 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+from app.schemas.blog import BlogRead
+from app.schemas.hero_slide import HeroSlideRead
+from app.schemas.home_section import HomeSectionRead
+from app.schemas.painting import PaintingRead
+from app.schemas.philosophy import PhilosophyRead
+from app.schemas.site_settings import SiteSettingsRead
+
+
+class HomeResponse(BaseModel):
+    settings: SiteSettingsRead
+    hero_slides: list[HeroSlideRead]
+    sections: list[HomeSectionRead]
+    latest_blogs: list[BlogRead]
+    featured_blog: Optional[BlogRead] = None
+    paintings: list[PaintingRead]
+    philosophy: Optional[PhilosophyRead] = None
@@ -1,24 +1,58 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
 
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.rate_limit import Rate, RateLimitExceeded, limiter
 from app.core.security import (
+    aget_password_hash,
+    averify_password,
     create_access_token,
     create_refresh_token,
-    get_password_hash,
-    verify_password,
+    password_needs_rehash,
 )
+from app.db import changes
 from app.models.user import User, UserRole
 
+# Keyed by (user ID, token version). Any write to users drops every entry, here and, through
+# NOTIFY, in the other workers; the TTL bounds how long a missed notification can matter.
+user_cache: TTLCache[User] = changes.bind_cache(
+    TTLCache(ttl=settings.USER_CACHE_TTL_SECONDS, maxsize=settings.USER_CACHE_MAX_ENTRIES, name="users"), "users"
+)
+
+
+_login_ip_rate = Rate.parse(settings.LOGIN_RATE_PER_IP)
+_login_account_rate = Rate.parse(settings.LOGIN_RATE_PER_ACCOUNT)
+
+
+async def throttle_login(email: str, ip: str) -> None:
+    """Count a login attempt against the client IP and the account; raise 429 past either limit.
+
+    Runs before the password check, so throttled attempts cost no bcrypt work.
+    """
+    if not settings.RATE_LIMIT_ENABLED:
+        return
+    for key, rate in ((f"login|ip:{ip}", _login_ip_rate), (f"login|account:{email.strip().lower()}", _login_account_rate)):
+        decision = await limiter.hit(key, rate)
+        if not decision.allowed:
+            raise RateLimitExceeded(rate, decision)
 
-def authenticate_user(db: Session, *, email: str, password: str) -> User | None:
-    user = db.query(User).filter(User.email == email).first()
+
+async def authenticate_user(db: AsyncSession, *, email: str, password: str) -> User | None:
+    user = (await db.execute(select(User).where(User.email == email))).scalars().first()
     if not user:
         return None
-    if not verify_password(password, user.password_hash):
+    if not await averify_password(password, user.password_hash):
         return None
+    if password_needs_rehash(user.password_hash):
+        # the plain password is only ever at hand here, so cost changes are applied on login
+        user.password_hash = await aget_password_hash(password)
+        await db.commit()
     return user
 
 
-def create_user(
+async def create_user(
     db: Session,
     *,
     email: str,
@@ -27,17 +61,63 @@ def create_user(
     display_name: str | None = None,
     bio: str | None = None,
 ) -> User:
-    user = User(email=email, password_hash=get_password_hash(password), role=role, display_name=display_name, bio=bio)
+    user = User(email=email, password_hash=await aget_password_hash(password), role=role, display_name=display_name, bio=bio)
     db.add(user)
     db.commit()
     db.refresh(user)
     return user
 
 
-def issue_tokens_for_user(user: User) -> dict[str, str]:
+def revoke_access_tokens(user: User) -> None:
+    """Invalidate every access token issued to ``user`` once the change is committed."""
+    user.token_version = (user.token_version or 0) + 1
+
+
+def access_claims(user: User) -> dict:
+    claims: dict = {"ver": user.token_version or 0}
+    if settings.ACCESS_TOKEN_ROLE_CLAIMS:
+        claims["role"] = user.role.value
+    return claims
+
+
+def issue_tokens_for_user(user: User, *, session_id: str, refresh_jti: str) -> dict[str, str]:
     subject = str(user.id)
+    claims = access_claims(user)
     return {
-        "access_token": create_access_token(subject),
-        "refresh_token": create_refresh_token(subject),
+        "access_token": create_access_token(subject, claims={**claims, "sid": session_id}),
+        "refresh_token": create_refresh_token(subject, claims={"ver": claims["ver"], "sid": session_id, "jti": refresh_jti}),
         "token_type": "bearer",
     }
+
+
+def _snapshot(user: User) -> User:
+    # a detached copy of the columns: no session, so it is safe to share between requests
+    copy = User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+    make_transient_to_detached(copy)
+    return copy
+
+
+def load_user(db: Session, user_id: int, version: int) -> User | None:
+    """The user behind an access token, attached to ``db``; ``None`` if gone or the token is revoked."""
+    cached = user_cache.get((user_id, version))
+    if cached is not None:
+        # load=False attaches a copy without a SELECT; the handler may still modify and commit it
+        return db.merge(cached, load=False)
+    generation = user_cache.generation
+    user = db.get(User, user_id)
+    if user is None or (user.token_version or 0) != version:
+        return None
+    user_cache.set((user_id, version), _snapshot(user), tags=("users",), generation=generation)
+    return user
+
+
+async def aload_user(db: AsyncSession, user_id: int, version: int) -> User | None:
+    cached = user_cache.get((user_id, version))
+    if cached is not None:
+        return await db.merge(cached, load=False)
+    generation = user_cache.generation
+    user = await db.get(User, user_id)
+    if user is None or (user.token_version or 0) != version:
+        return None
+    user_cache.set((user_id, version), _snapshot(user), tags=("users",), generation=generation)
+    return user
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Protocol
+
+import httpx
+import structlog
+
+from app.core.config import settings
+from app.db import changes
+
+logger = structlog.get_logger(__name__)
+
+# Surrogate keys carried by the responses that render each table (see app.api.cache_policy.tag_response)
+TABLE_KEYS: dict[str, tuple[str, ...]] = {
+    "blogs": ("blogs", "home"),
+    "blog_categories": ("blogs", "blog_categories", "home_sections", "home"),
+    "paintings": ("paintings", "museum", "home"),
+    "pages": ("pages",),
+    "page_sections": ("page_sections",),
+    "home_sections": ("home_sections", "home"),
+    "hero_slides": ("hero_slides", "home"),
+    "site_settings": ("site_settings", "home"),
+    "philosophy": ("philosophy", "home"),
+    "biography": ("biography",),
+    "museum_rooms": ("museum",),
+    "museum_artifacts": ("museum",),
+}
+# Per-row keys, e.g. ``blog:12`` on the detail response of blog 12
+ROW_PREFIX: dict[str, str] = {
+    "blogs": "blog",
+    "blog_categories": "category",
+    "paintings": "painting",
+    "pages": "page",
+}
+
+
+class PurgeBackend(Protocol):
+    def purge(self, keys: Sequence[str]) -> None: ...
+
+
+class NullPurgeBackend:
+    def purge(self, keys: Sequence[str]) -> None:
+        return None
+
+
+class HttpPurgeBackend:
+    """Purge by surrogate key with one POST carrying a space separated ``Surrogate-Key`` header.
+
+    This is the shape Fastly's purge-by-key API and most self-hosted Varnish setups accept;
+    point ``url`` at the service's purge endpoint.
+    """
+
+    def __init__(self, url: str, *, token: str | None = None, timeout: float = 5.0) -> None:
+        self.url = url
+        self.token = token
+        self.timeout = timeout
+
+    def purge(self, keys: Sequence[str]) -> None:
+        headers = {"Surrogate-Key": " ".join(keys)}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        response = httpx.post(self.url, headers=headers, timeout=self.timeout)
+        response.raise_for_status()
+
+
+def build_backend() -> PurgeBackend:
+    if settings.CDN_PURGE_BACKEND == "http" and settings.CDN_PURGE_URL:
+        return HttpPurgeBackend(
+            settings.CDN_PURGE_URL,
+            token=settings.CDN_PURGE_TOKEN,
+            timeout=settings.CDN_PURGE_TIMEOUT_SECONDS,
+        )
+    return NullPurgeBackend()
+
+
+def surrogate_keys(rows: Iterable[changes.ChangedRow]) -> set[str]:
+    keys: set[str] = set()
+    for table, pk in rows:
+        keys.update(TABLE_KEYS.get(table, ()))
+        prefix = ROW_PREFIX.get(table)
+        if prefix and pk is not None:
+            keys.add(f"{prefix}:{pk}")
+    return keys
+
+
+class Purger:
+    """Sends purges for committed writes off the request path, one at a time and in commit order."""
+
+    def __init__(self, backend: PurgeBackend) -> None:
+        self.backend = backend
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdn-purge")
+
+    def __call__(self, rows: frozenset[changes.ChangedRow]) -> None:
+        if isinstance(self.backend, NullPurgeBackend):
+            return
+        keys = sorted(surrogate_keys(rows))
+        if keys:
+            self._executor.submit(self._purge, self.backend, keys)
+
+    @staticmethod
+    def _purge(backend: PurgeBackend, keys: list[str]) -> None:
+        try:
+            backend.purge(keys)
+        except Exception as exc:  # noqa: BLE001 - the CDN falls back to its TTLs
+            logger.warning("cdn_purge_failed", keys=keys, error=str(exc))
+        else:
+            logger.info("cdn_purged", keys=keys)
+
+    def flush(self, timeout: float | None = None) -> None:
+        """Wait for purges queued so far, e.g. on shutdown."""
+        wait([self._executor.submit(lambda: None)], timeout=timeout)
+
+
+purger = Purger(build_backend())
+changes.on_write(purger)
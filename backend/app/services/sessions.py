@@ -0,0 +1,176 @@
+"""Sessions behind rotating refresh tokens, and the revoked-session set checked on every request.
+
+Login starts a session; its refresh token carries the session ID (``sid``) and a ``jti``
+that changes on every refresh, so each refresh token works once. Presenting an already
+rotated token ends the session, as it means a copy is in someone else's hands; the one
+exception is a retry inside ``REFRESH_REUSE_GRACE_SECONDS``, e.g. two tabs refreshing at once.
+
+Access tokens carry the ``sid`` too. Revoking a session adds it to ``revoked``, an
+in-memory map every worker checks without a database round trip; other workers learn of
+it through NOTIFY on ``AUTH_REVOCATION_CHANNEL``. Recent revocations are loaded at
+startup and again whenever the LISTEN connection (re)connects, merged into what the
+worker already holds. An entry can go once every access token issued before the
+revocation has expired.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import structlog
+from sqlalchemy import delete, or_, select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.invalidation import listener
+from app.models.auth_session import AuthSession
+from app.models.user import User
+from app.services.auth import issue_tokens_for_user
+
+logger = structlog.get_logger(__name__)
+
+
+def _access_ttl() -> float:
+    return settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60.0
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite hands timestamps back without a zone
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+class RevokedSessions:
+    """Session IDs mapped to when their last access token expires."""
+
+    _PRUNE_EVERY = 1024
+
+    def __init__(self) -> None:
+        self._until: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, session_id: str, until: float | None = None) -> None:
+        with self._lock:
+            self._until[session_id] = until if until is not None else time.time() + _access_ttl()
+            if len(self._until) % self._PRUNE_EVERY == 0:
+                now = time.time()
+                self._until = {key: expiry for key, expiry in self._until.items() if expiry > now}
+
+    def merge(self, entries: dict[str, float]) -> None:
+        # merged, not swapped: a revocation added while the caller was querying must stay
+        with self._lock:
+            now = time.time()
+            merged = {key: expiry for key, expiry in self._until.items() if expiry > now}
+            for session_id, until in entries.items():
+                if until > merged.get(session_id, 0.0):
+                    merged[session_id] = until
+            self._until = merged
+
+    def __contains__(self, session_id: object) -> bool:
+        until = self._until.get(session_id)  # type: ignore[arg-type]
+        return until is not None and until > time.time()
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+
+revoked = RevokedSessions()
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex
+
+
+async def start_session(db: AsyncSession, user: User) -> dict[str, str]:
+    now = datetime.now(timezone.utc)
+    session = AuthSession(
+        id=_new_id(),
+        user_id=user.id,
+        refresh_jti=_new_id(),
+        expires_at=now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+    )
+    tokens = issue_tokens_for_user(user, session_id=session.id, refresh_jti=session.refresh_jti)
+    db.add(session)
+    # sweep this user's finished sessions while we are here; nothing else deletes them
+    await db.execute(
+        delete(AuthSession).where(
+            AuthSession.user_id == user.id,
+            or_(AuthSession.expires_at < now, AuthSession.revoked_at < now - timedelta(seconds=_access_ttl())),
+        )
+    )
+    await db.commit()
+    return tokens
+
+
+def rotate_session(db: Session, user: User, session_id: str, jti: str) -> dict[str, str] | None:
+    """Swap a refresh token for a new pair; ``None`` when the token may not be used."""
+    now = datetime.now(timezone.utc)
+    new_jti = _new_id()
+    tokens = issue_tokens_for_user(user, session_id=session_id, refresh_jti=new_jti)
+    # one conditional UPDATE: of two concurrent refreshes with the same token only one matches
+    rotated = db.execute(
+        update(AuthSession)
+        .where(
+            AuthSession.id == session_id,
+            AuthSession.user_id == user.id,
+            AuthSession.refresh_jti == jti,
+            AuthSession.revoked_at.is_(None),
+            AuthSession.expires_at > now,
+        )
+        .values(
+            refresh_jti=new_jti,
+            previous_jti=jti,
+            rotated_at=now,
+            expires_at=now + timedelta(minutes=settings.REFRESH_TOKEN_EXPIRE_MINUTES),
+        )
+        .returning(AuthSession.id)
+    ).first()
+    if rotated is not None:
+        db.commit()
+        return tokens
+    db.rollback()
+
+    session = db.get(AuthSession, session_id)
+    if session is None or session.user_id != user.id or session.revoked_at is not None or _aware(session.expires_at) <= now:
+        return None
+    grace = timedelta(seconds=settings.REFRESH_REUSE_GRACE_SECONDS)
+    if jti == session.previous_jti and session.rotated_at is not None and now - _aware(session.rotated_at) <= grace:
+        return issue_tokens_for_user(user, session_id=session.id, refresh_jti=session.refresh_jti)
+    logger.warning("refresh_token_reused", session_id=session.id, user_id=user.id)
+    revoke_session(db, session)
+    return None
+
+
+def revoke_session(db: Session, session: AuthSession) -> None:
+    session.revoked_at = datetime.now(timezone.utc)
+    if db.get_bind().dialect.name == "postgresql":
+        # delivered on commit, to every worker's listener
+        db.execute(
+            text("SELECT pg_notify(:channel, :session_id)"),
+            {"channel": settings.AUTH_REVOCATION_CHANNEL, "session_id": session.id},
+        )
+    session_id = session.id
+    db.commit()
+    revoked.add(session_id)
+
+
+def load_revoked() -> None:
+    """Pull revocations whose access tokens may still be live into ``revoked``."""
+    from app.db.session import SessionLocal
+
+    ttl = _access_ttl()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=ttl)
+    try:
+        with SessionLocal() as db:
+            rows = db.execute(select(AuthSession.id, AuthSession.revoked_at).where(AuthSession.revoked_at > cutoff)).all()
+    except Exception as exc:  # noqa: BLE001 - startup goes on; the next (re)connect retries
+        logger.warning("revoked_sessions_reload_failed", error=str(exc))
+        return
+    revoked.merge({session_id: _aware(revoked_at).timestamp() + ttl for session_id, revoked_at in rows})
+    logger.info("revoked_sessions_loaded", count=len(rows))
+
+
+listener.subscribe(settings.AUTH_REVOCATION_CHANNEL, revoked.add, on_connect=load_revoked)
@@ -2,15 +2,30 @@ import base64
 import hashlib
 import hmac
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
 
 import httpx
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
 
+from app.core import tracing
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import Counter, Histogram
+from app.core.resilience import CircuitBreaker, CircuitOpenError, CircuitState, FileTokenBucket
+from app.db import changes
 from app.models.painting import Painting
-from app.models.wc_link import WCLink, WCProductKind, WCSyncState
+from app.models.sync_watermark import SyncWatermark
+from app.models.wc_link import WCLink, WCSyncState
+
+RECONCILE_WATERMARK = "wc_products"
+_RECONCILE_FIELDS = "id,price,stock_status,stock_quantity,date_modified_gmt"
+# product IDs per SELECT/UPDATE batch, well under the driver's bind-parameter limit
+_RECONCILE_BATCH = 1000
 
 
 class WooCommerceConfigurationError(RuntimeError):
@@ -24,6 +39,37 @@ class WooCommerceAPIError(RuntimeError):
         self.detail = detail
 
 
+class WooCommerceUnavailableError(RuntimeError):
+    def __init__(self, detail: str, retry_after: float) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.retry_after = retry_after
+
+
+breaker = CircuitBreaker(
+    "woocommerce",
+    failure_threshold=settings.WC_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.WC_BREAKER_RESET_SECONDS,
+)
+REQUEST_DURATION = Histogram(
+    "woocommerce_request_duration_seconds",
+    "WooCommerce API call latency per attempt.",
+    ("method", "outcome"),
+    buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+ERRORS = Counter("woocommerce_errors_total", "Failed WooCommerce API attempts by kind.", ("kind",))
+LISTING_TABLES = ("wc_links", "paintings")
+# Webhooks, syncs and the reconcile job all commit to wc_links; NOTIFY drops listings in every worker.
+listing_cache: TTLCache[Any] = changes.bind_cache(
+    TTLCache(ttl=settings.WC_PRODUCT_CACHE_TTL_SECONDS, name="wc_listing"), *LISTING_TABLES
+)
+rate_governor = FileTokenBucket(
+    settings.WC_RATE_LIMIT_STATE_PATH,
+    rate=settings.WC_RATE_LIMIT_PER_SECOND,
+    capacity=settings.WC_RATE_LIMIT_BURST,
+)
+
+
 @dataclass(slots=True)
 class SyncResult:
     wc_product_id: Optional[int]
@@ -31,18 +77,36 @@ class SyncResult:
     payload: Dict[str, Any]
 
 
+@dataclass(slots=True)
+class ReconcileResult:
+    fetched: int
+    updated: int
+    watermark: datetime
+
+
 def _ensure_configured() -> None:
     if not (settings.WC_STORE_URL and settings.WC_CONSUMER_KEY and settings.WC_CONSUMER_SECRET):
         raise WooCommerceConfigurationError("WooCommerce integration is not configured.")
 
 
-def _request(
+def _guard() -> None:
+    if breaker.state == CircuitState.OPEN:
+        raise WooCommerceUnavailableError("WooCommerce store is unavailable", breaker.snapshot()["retry_after"] or 0)
+    if not rate_governor.acquire(settings.WC_RATE_LIMIT_MAX_WAIT_SECONDS):
+        raise WooCommerceUnavailableError("WooCommerce API quota exhausted", 1 / max(settings.WC_RATE_LIMIT_PER_SECOND, 1e-3))
+    try:
+        breaker.before_call()
+    except CircuitOpenError as exc:
+        raise WooCommerceUnavailableError("WooCommerce store is unavailable", exc.retry_after) from exc
+
+
+def _send(
     method: str,
     path: str,
     *,
     params: Optional[dict[str, Any]] = None,
     json: Optional[dict[str, Any]] = None,
-) -> dict[str, Any]:
+) -> httpx.Response:
     _ensure_configured()
     base_url = settings.WC_STORE_URL.rstrip("/") + "/wp-json/wc/" + settings.WC_API_VERSION.strip("/")
     url = urljoin(base_url + "/", path.lstrip("/"))
@@ -54,24 +118,46 @@ def _request(
 
     for attempt in range(1, max_attempts + 1):
         try:
-            response = httpx.request(method, url, params=params, json=json, auth=auth, timeout=20)
+            _guard()
+        except WooCommerceUnavailableError:
+            ERRORS.labels("unavailable").inc()
+            raise
+        started = time.perf_counter()
+        try:
+            with tracing.span(
+                f"woocommerce {method}", phase="external", kind="client", **{"url.path": path, "retry.attempt": attempt}
+            ) as call:
+                response = httpx.request(
+                    method, url, params=params, json=json, auth=auth, timeout=settings.WC_REQUEST_TIMEOUT_SECONDS
+                )
+                if call is not None:
+                    call.attributes["http.response.status_code"] = response.status_code
         except httpx.HTTPError as exc:
+            REQUEST_DURATION.labels(method, "network_error").observe(time.perf_counter() - started)
+            ERRORS.labels("network").inc()
+            breaker.record_failure()
             if attempt == max_attempts:
                 raise WooCommerceAPIError(-1, str(exc)) from exc
             time.sleep(backoff * attempt)
             continue
 
+        outcome = f"{response.status_code // 100}xx"
+        REQUEST_DURATION.labels(method, outcome).observe(time.perf_counter() - started)
         if response.status_code >= 500:
+            ERRORS.labels("server").inc()
+            breaker.record_failure()
             last_error = response
             if attempt == max_attempts:
                 raise WooCommerceAPIError(response.status_code, response.text)
             time.sleep(backoff * attempt)
             continue
 
+        breaker.record_success()
         if response.status_code >= 400:
+            ERRORS.labels("client").inc()
             raise WooCommerceAPIError(response.status_code, response.text)
 
-        return response.json()
+        return response
 
     # Should never reach here
     if last_error is not None:
@@ -79,6 +165,16 @@ def _request(
     raise WooCommerceAPIError(-1, "Unknown error")
 
 
+def _request(
+    method: str,
+    path: str,
+    *,
+    params: Optional[dict[str, Any]] = None,
+    json: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    return _send(method, path, params=params, json=json).json()
+
+
 def _build_payload_for_painting(painting: Painting) -> dict[str, Any]:
     status = "publish" if painting.published_at else "draft"
     description = painting.description or ""
@@ -116,6 +212,122 @@ def sync_painting(painting: Painting, link: WCLink | None = None) -> SyncResult:
     return SyncResult(wc_product_id=wc_product_id, sync_state=WCSyncState.SYNCED, payload=payload)
 
 
+def _fetch_products_page(modified_after: datetime, page: int) -> tuple[list[dict[str, Any]], int]:
+    params = {
+        "modified_after": modified_after.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+        "dates_are_gmt": "true",
+        # id ordering keeps offset pages stable while products keep changing mid-run
+        "orderby": "id",
+        "order": "asc",
+        "per_page": settings.WC_RECONCILE_PAGE_SIZE,
+        "page": page,
+        "_fields": _RECONCILE_FIELDS,
+    }
+    response = _send("GET", "products", params=params)
+    try:
+        total_pages = int(response.headers.get("x-wp-totalpages", 1))
+    except ValueError:
+        total_pages = 1
+    return response.json(), total_pages
+
+
+def fetch_modified_products(modified_after: datetime) -> list[dict[str, Any]]:
+    products, total_pages = _fetch_products_page(modified_after, 1)
+    if total_pages <= 1:
+        return products
+
+    workers = max(1, min(settings.WC_RECONCILE_CONCURRENCY, total_pages - 1))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pages = executor.map(lambda page: _fetch_products_page(modified_after, page)[0], range(2, total_pages + 1))
+        for items in pages:
+            products.extend(items)
+    return products
+
+
+def reconcile_products(db: Session) -> ReconcileResult:
+    """Pull products modified since the stored watermark and refresh the WCLink rows they changed.
+
+    Only existing links are touched: products the site does not sell yet have no local row to
+    attach a link to. ``sync_state`` belongs to the push side and is left as it is.
+    """
+    watermark = db.get(SyncWatermark, RECONCILE_WATERMARK)
+    if watermark is None:
+        watermark = SyncWatermark(name=RECONCILE_WATERMARK)
+        db.add(watermark)
+
+    now = datetime.now(timezone.utc)
+    since = watermark.value or now - timedelta(hours=settings.WC_RECONCILE_INITIAL_LOOKBACK_HOURS)
+    # Re-read a small overlap so edits racing the previous run are not lost.
+    products = fetch_modified_products(since - timedelta(seconds=settings.WC_RECONCILE_OVERLAP_SECONDS))
+
+    latest = since
+    store: dict[int, tuple[Optional[float], Optional[str], Optional[int]]] = {}
+    for product in products:
+        product_id = product.get("id")
+        if not product_id:
+            continue
+        stock_quantity = product.get("stock_quantity")
+        store[product_id] = (
+            _to_float(product.get("price")),
+            product.get("stock_status"),
+            int(stock_quantity) if stock_quantity is not None else None,
+        )
+        modified = _parse_gmt(product.get("date_modified_gmt"))
+        if modified and modified > latest:
+            latest = modified
+
+    updates: list[dict[str, Any]] = []
+    product_ids = list(store)
+    for start in range(0, len(product_ids), _RECONCILE_BATCH):
+        links = db.execute(
+            select(WCLink.id, WCLink.wc_product_id, WCLink.price, WCLink.stock_status, WCLink.stock_quantity).where(
+                WCLink.wc_product_id.in_(product_ids[start : start + _RECONCILE_BATCH])
+            )
+        )
+        for link_id, product_id, link_price, link_status, link_quantity in links:
+            price, stock_status, stock_quantity = store[product_id]
+            if (_to_float(link_price), link_status, link_quantity) == (price, stock_status, stock_quantity):
+                continue
+            updates.append(
+                {
+                    "id": link_id,
+                    "price": price,
+                    "stock_status": stock_status,
+                    "stock_quantity": stock_quantity,
+                    "last_synced_at": now,
+                    "notes": "Reconciled from store",
+                }
+            )
+    for start in range(0, len(updates), _RECONCILE_BATCH):
+        # executemany UPDATE ... WHERE id = ?, one statement per batch
+        db.execute(update(WCLink), updates[start : start + _RECONCILE_BATCH])
+
+    watermark.value = latest
+    db.commit()
+    return ReconcileResult(fetched=len(products), updated=len(updates), watermark=latest)
+
+
+def _parse_gmt(value: Any) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
 def verify_webhook_signature(raw_body: bytes, signature: str | None) -> bool:
     if not settings.WC_WEBHOOK_SECRET:
         return False
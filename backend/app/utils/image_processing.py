@@ -0,0 +1,49 @@
+"""Bounded worker pool for CPU-heavy image work (resizing uploads, LQIP placeholders).
+
+Running Pillow on the event loop stalls every request on the worker, and running it on
+the shared threadpool lets a burst of uploads starve ordinary sync handlers. Jobs here
+queue for ``IMAGE_PROCESSING_WORKERS`` threads instead, and report queue depth and
+durations to /metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.metrics import Gauge, Histogram
+
+T = TypeVar("T")
+
+QUEUE_DEPTH = Gauge("image_processing_queue_depth", "Image jobs waiting for a worker thread.")
+DURATION = Histogram(
+    "image_processing_seconds",
+    "Image job run time, excluding time spent queued.",
+    ("operation",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+_executor = ThreadPoolExecutor(max_workers=max(settings.IMAGE_PROCESSING_WORKERS, 1), thread_name_prefix="image")
+
+
+def submit(operation: str, fn: Callable[..., T], *args: Any) -> Future[T]:
+    timer = DURATION.labels(operation)
+    QUEUE_DEPTH.inc()
+
+    def _run() -> T:
+        QUEUE_DEPTH.dec()
+        with timer.time(), tracing.span(f"image {operation}", phase="image"):
+            return fn(*args)
+
+    # carry the request's trace into the worker thread
+    return _executor.submit(contextvars.copy_context().run, _run)
+
+
+async def run(operation: str, fn: Callable[..., T], *args: Any) -> T:
+    """Await ``fn(*args)`` on the image pool without blocking the event loop."""
+    return await asyncio.wrap_future(submit(operation, fn, *args))
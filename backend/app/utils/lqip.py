@@ -5,10 +5,13 @@ from typing import Optional
 import httpx
 from PIL import Image, ImageFilter
 
+from app.core import tracing
+
 
 def _fetch_image_bytes(url: str) -> Optional[bytes]:
     try:
-        response = httpx.get(url, timeout=10)
+        with tracing.span("lqip fetch", phase="external", kind="client", **{"url.full": url}):
+            response = httpx.get(url, timeout=10)
         response.raise_for_status()
         return response.content
     except httpx.HTTPError:
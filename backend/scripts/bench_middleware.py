@@ -0,0 +1,210 @@
+"""Compare requests/sec through the BaseHTTPMiddleware stack and the pure ASGI one.
+
+Runs in-process (httpx.ASGITransport, no sockets), so the numbers isolate middleware
+overhead from networking and the database:
+
+    python backend/scripts/bench_middleware.py --requests 5000 --concurrency 50
+
+``/health`` measures the bare stack. ``/blogs/1`` runs the real ``get_blog`` handler
+(probe, load, validation, serialization) against an in-memory session that returns a fixed
+post. Both stacks keep the same order: request ID, read-your-writes, rate limiting and CORS.
+They share the rate limit middleware, which is disabled so that every request counts.
+
+``--metrics`` also runs the ASGI stack with MetricsMiddleware and the in-flight route hooks,
+as app.main installs them, and prints what they add per request in microseconds. Everything
+runs on one event loop, so the difference in time per request is their CPU cost.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import math
+import sys
+import time
+import uuid
+from collections import namedtuple
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi import FastAPI, Request, Response  # noqa: E402
+from fastapi.middleware.cors import CORSMiddleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.api.deps import get_async_read_db_session, get_current_user_optional_async  # noqa: E402
+from app.api.routers import blogs, health  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.logging import bind_request_context  # noqa: E402
+from app.db import query_stats  # noqa: E402
+from app.db.routing import READ_PRIMARY_COOKIE, mark_write, read_primary_until  # noqa: E402
+from app.middleware.metrics import MetricsMiddleware, track_in_flight  # noqa: E402
+from app.middleware.rate_limit import RateLimitMiddleware  # noqa: E402
+from app.middleware.read_your_writes import ReadYourWritesMiddleware  # noqa: E402
+from app.middleware.request_id import RequestIDMiddleware  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+
+_SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class BaseHTTPRequestIDMiddleware(BaseHTTPMiddleware):
+    """The previous RequestIDMiddleware, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next):
+        request_id = request.headers.get(settings.REQUEST_ID_HEADER) or uuid.uuid4().hex
+        request.state.request_id = request_id
+        path = str(request.url.path)
+        bind_request_context(request_id=request_id, path=path)
+        stats, token = query_stats.start_request(f"{request.method} {path}")
+        try:
+            response: Response = await call_next(request)
+        finally:
+            query_stats.finish_request(token)
+            bind_request_context()
+        response.headers[settings.REQUEST_ID_HEADER] = request_id
+        if settings.SERVER_TIMING_ENABLED:
+            response.headers.append("Server-Timing", f'db;dur={stats.duration_ms};desc="{stats.count} queries"')
+        return response
+
+
+class BaseHTTPReadYourWritesMiddleware(BaseHTTPMiddleware):
+    """The previous ReadYourWritesMiddleware, kept here as the baseline."""
+
+    async def dispatch(self, request: Request, call_next):
+        response: Response = await call_next(request)
+        if request.method not in _SAFE_METHODS and response.status_code < 400:
+            mark_write()
+            response.set_cookie(
+                READ_PRIMARY_COOKIE,
+                f"{read_primary_until():.3f}",
+                max_age=math.ceil(settings.DB_READ_YOUR_WRITES_SECONDS),
+                httponly=True,
+                samesite="lax",
+            )
+        return response
+
+
+STACKS = {
+    "basehttp": (BaseHTTPRequestIDMiddleware, BaseHTTPReadYourWritesMiddleware),
+    "asgi": (RequestIDMiddleware, ReadYourWritesMiddleware),
+}
+
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+_Probe = namedtuple("_Probe", "id updated_at category_id category_updated_at")
+
+
+class _Scalars:
+    def __init__(self, blog: BlogPost) -> None:
+        self.blog = blog
+
+    def first(self) -> BlogPost:
+        return self.blog
+
+
+class _Result:
+    def __init__(self, blog: BlogPost) -> None:
+        self.blog = blog
+
+    def first(self) -> _Probe:
+        return _Probe(self.blog.id, self.blog.updated_at, None, None)
+
+    def scalars(self) -> _Scalars:
+        return _Scalars(self.blog)
+
+
+class _Session:
+    """Answers both get_blog queries with one post, so the handler does its full work without a database."""
+
+    def __init__(self) -> None:
+        self.blog = BlogPost(
+            id=1,
+            title="Benchmark",
+            slug="benchmark",
+            content_md="word " * 400,
+            tags=["bench"],
+            created_at=_NOW,
+            updated_at=_NOW,
+            published_at=_NOW,
+        )
+
+    async def execute(self, _statement):
+        return _Result(self.blog)
+
+
+def build_app(stack: str, *, metrics: bool = False) -> FastAPI:
+    request_id, read_your_writes = STACKS[stack]
+    app = FastAPI()
+    app.include_router(health.router)
+    app.include_router(blogs.router)
+    session = _Session()
+
+    async def _db():
+        yield session
+
+    app.dependency_overrides[get_async_read_db_session] = _db
+    app.dependency_overrides[get_current_user_optional_async] = lambda: None
+    # same order as app.main: request ID innermost, CORS outermost
+    app.add_middleware(request_id)
+    app.add_middleware(read_your_writes)
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(CORSMiddleware, allow_origins=settings.CORS_ALLOW_ORIGINS)
+    if metrics:
+        app.add_middleware(MetricsMiddleware)
+        track_in_flight(app.routes)
+    return app
+
+
+async def measure(app: FastAPI, path: str, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(min(200, total)):
+            (await client.get(path)).raise_for_status()
+        remaining = [total]
+
+        async def _worker() -> None:
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                (await client.get(path)).raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(_worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+async def run(paths: list[str], total: int, concurrency: int, rounds: int, metrics: bool) -> None:
+    settings.RATE_LIMIT_ENABLED = False
+    apps = {stack: build_app(stack) for stack in STACKS}
+    if metrics:
+        apps["metrics"] = build_app("asgi", metrics=True)
+    for path in paths:
+        best = {stack: 0.0 for stack in apps}
+        # interleave the stacks so drift (thermal, GC) hits both equally; keep the best round
+        for _ in range(rounds):
+            for stack, app in apps.items():
+                best[stack] = max(best[stack], await measure(app, path, total, concurrency))
+        before, after = best["basehttp"], best["asgi"]
+        print(f"[bench] {path:<10} basehttp {before:8.0f} req/s   asgi {after:8.0f} req/s   {after / before - 1:+.0%}")
+        if metrics:
+            overhead = 1e6 / best["metrics"] - 1e6 / after
+            print(f"[bench] {path:<10} asgi+metrics {best['metrics']:8.0f} req/s   {overhead:+.1f} µs/request")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--path", action="append", dest="paths", help="Repeatable; defaults to /health and /blogs/1.")
+    parser.add_argument("--metrics", action="store_true", help="Also measure what MetricsMiddleware adds per request.")
+    args = parser.parse_args()
+    asyncio.run(run(args.paths or ["/health", "/blogs/1"], args.requests, args.concurrency, args.rounds, args.metrics))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,170 @@
+"""Compare the CPU cost of turning ORM rows into a JSON body on the three response paths.
+
+    python backend/scripts/bench_serialization.py --items 50 --iterations 2000
+
+Each path starts from the same detached ORM objects and ends with the response body:
+
+* ``stdlib``: ``model_validate``, FastAPI's second validation against ``response_model``
+  and its serialization to plain Python, then Starlette's ``JSONResponse`` (``json.dumps``).
+  This is what every route did before.
+* ``orjson``: the same, rendered by ``ORJSONResponse``, the app's default response class.
+* ``trusted``: ``model_validate``, then ``serialized()`` writes the JSON straight from the
+  models with pydantic-core.
+
+``list_blogs`` posts carry a category and ~2 KB of markdown; ``list_artifacts`` rows embed
+their painting. Times are process CPU per response, best of ``--rounds``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+from starlette.responses import JSONResponse  # noqa: E402
+
+from app.api.responses import ORJSONResponse, serialized  # noqa: E402
+from app.api.routers import blogs  # noqa: E402
+from app.api.routers.museum import artifacts  # noqa: E402
+from app.models.blog import BlogPost  # noqa: E402
+from app.models.blog_category import BlogCategory  # noqa: E402
+from app.models.museum_artifact import MuseumArtifact  # noqa: E402
+from app.models.painting import Painting  # noqa: E402
+from app.schemas.blog import BlogListResponse, BlogRead  # noqa: E402
+from app.schemas.museum import MuseumArtifactRead  # noqa: E402
+
+_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _blogs(count: int) -> list[BlogPost]:
+    category = BlogCategory(id=1, name="Essays", slug="essays", description="Long reads", created_at=_NOW, updated_at=_NOW)
+    return [
+        BlogPost(
+            id=index,
+            title=f"Post {index}",
+            slug=f"post-{index}",
+            content_md="word " * 400,
+            excerpt="word " * 40,
+            tags=["art", "essay"],
+            cover_url=f"https://cdn.example.com/media/{index}.jpg",
+            category_id=1,
+            category=category,
+            created_at=_NOW,
+            updated_at=_NOW,
+            published_at=_NOW,
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def _artifacts(count: int) -> list[MuseumArtifact]:
+    return [
+        MuseumArtifact(
+            id=index,
+            room_id=1,
+            painting_id=index,
+            sort=index,
+            hotspot={"x": 0.5, "y": 0.25},
+            created_at=_NOW,
+            updated_at=_NOW,
+            painting=Painting(
+                id=index,
+                title=f"Painting {index}",
+                slug=f"painting-{index}",
+                description="oil on canvas " * 20,
+                year=2020,
+                medium="oil",
+                image_url=f"https://cdn.example.com/media/p{index}.jpg",
+                tags=["oil"],
+                is_featured=False,
+                published_at=_NOW,
+                created_at=_NOW,
+                updated_at=_NOW,
+            ),
+        )
+        for index in range(1, count + 1)
+    ]
+
+
+def _route(router, name: str) -> APIRoute:
+    return next(route for route in router.routes if isinstance(route, APIRoute) and route.name == name)
+
+
+def _cases(count: int):
+    blog_rows, artifact_rows = _blogs(count), _artifacts(count)
+
+    def build_blogs():
+        return BlogListResponse(items=[BlogRead.model_validate(row) for row in blog_rows], next_cursor=None)
+
+    def build_artifacts():
+        return [MuseumArtifactRead.model_validate(row) for row in artifact_rows]
+
+    return {
+        "list_blogs": (build_blogs, _route(blogs.router, "list_blogs"), None),
+        "list_artifacts": (build_artifacts, _route(artifacts.router, "list_artifacts"), list[MuseumArtifactRead]),
+    }
+
+
+async def _fastapi_body(route: APIRoute, value, response_class) -> bytes:
+    content = await serialize_response(field=route.response_field, response_content=value)
+    return response_class(content).body
+
+
+def _paths(build, route, schema):
+    async def stdlib() -> bytes:
+        return await _fastapi_body(route, build(), JSONResponse)
+
+    async def orjson() -> bytes:
+        return await _fastapi_body(route, build(), ORJSONResponse)
+
+    async def trusted() -> bytes:
+        return serialized(build(), schema).body
+
+    return {"stdlib": stdlib, "orjson": orjson, "trusted": trusted}
+
+
+async def measure(path, iterations: int) -> float:
+    for _ in range(min(50, iterations)):
+        await path()
+    started = time.process_time()
+    for _ in range(iterations):
+        await path()
+    return (time.process_time() - started) / iterations
+
+
+async def run(count: int, iterations: int, rounds: int) -> None:
+    for name, (build, route, schema) in _cases(count).items():
+        paths = _paths(build, route, schema)
+        bodies = {label: await path() for label, path in paths.items()}
+        size = len(bodies["trusted"])
+        # the same document on every path, so ETags and cached bodies do not change
+        assert len({body for body in bodies.values()}) == 1, f"{name}: bodies differ"
+        best = {label: float("inf") for label in paths}
+        for _ in range(rounds):
+            for label, path in paths.items():
+                best[label] = min(best[label], await measure(path, iterations))
+        before = best["stdlib"]
+        summary = "   ".join(f"{label} {best[label] * 1e6:7.0f} µs ({before / best[label]:.1f}x)" for label in paths)
+        print(f"[bench] {name:<14} {count} items, {size / 1024:5.0f} KiB   {summary}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.iterations, args.rounds))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
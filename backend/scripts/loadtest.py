@@ -0,0 +1,94 @@
+"""Hammer the public read endpoints and report throughput and latency percentiles.
+
+Run it against a deployed API, once per build you want to compare:
+
+    python backend/scripts/loadtest.py --base-url http://localhost:8100 --concurrency 500 --requests 20000
+
+All requests come from one client IP, so start the API with a DEFAULT_RATE_LIMIT
+high enough (e.g. "1000000/minute") or every run ends up measuring 429s.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import httpx
+
+DEFAULT_PATHS = [
+    "/blogs?limit=20",
+    "/paintings?limit=20",
+    "/site/settings",
+    "/home/sections",
+]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    paths: list[str],
+    counter: list[int],
+    total: int,
+    latencies: list[float],
+    errors: list[int],
+) -> None:
+    while counter[0] < total:
+        index = counter[0]
+        counter[0] += 1
+        path = paths[index % len(paths)]
+        started = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+        except httpx.HTTPError:
+            errors.append(-1)
+        latencies.append(time.perf_counter() - started)
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run(base_url: str, paths: list[str], concurrency: int, total: int) -> int:
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    latencies: list[float] = []
+    errors: list[int] = []
+    counter = [0]
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(_worker(client, paths, counter, total, latencies, errors) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"[loadtest] {len(latencies)} requests, concurrency {concurrency}, {elapsed:.2f}s")
+    print(f"[loadtest] throughput {len(latencies) / elapsed:.1f} req/s, errors {len(errors)}")
+    print(
+        "[loadtest] latency ms "
+        f"mean={statistics.fmean(latencies) * 1000:.1f} "
+        f"p50={_percentile(latencies, 50) * 1000:.1f} "
+        f"p95={_percentile(latencies, 95) * 1000:.1f} "
+        f"p99={_percentile(latencies, 99) * 1000:.1f}"
+    )
+    return 1 if errors else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=10000)
+    parser.add_argument("--path", action="append", dest="paths", help="Repeatable; defaults to the hot public reads.")
+    args = parser.parse_args()
+    return asyncio.run(run(args.base_url, args.paths or DEFAULT_PATHS, args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.session import SessionLocal  # noqa: E402
+from app.services.woocommerce import reconcile_products  # noqa: E402
+
+
+def reconcile_wc() -> int:
+    session: Session = SessionLocal()
+    try:
+        result = reconcile_products(session)
+        print(
+            f"[reconcile-wc] fetched {result.fetched} products, updated {result.updated} links, "
+            f"watermark {result.watermark.isoformat()}"
+        )
+        return 0
+    except Exception as exc:  # pragma: no cover
+        session.rollback()
+        print(f"[reconcile-wc] error: {exc}", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(reconcile_wc())
@@ -1,4 +1,5 @@
 from collections.abc import Generator
+from datetime import datetime, timezone
 
 import pytest
 from fastapi.testclient import TestClient
@@ -6,6 +7,13 @@ from fastapi.testclient import TestClient
 from app.core.config import settings
 from app.main import app
 
+# The cache invalidation LISTEN thread would keep retrying a database the suite does not have.
+settings.CACHE_INVALIDATION_LISTEN = False
+# Tests swap dependencies between requests; a shared response cache would replay earlier results.
+settings.RESPONSE_CACHE_ENABLED = False
+# Every test request comes from the same client; per-test stores keep limits from leaking across tests.
+settings.RATE_LIMIT_ENABLED = False
+
 
 @pytest.fixture(scope="session")
 def client() -> Generator[TestClient, None, None]:
@@ -15,10 +23,14 @@ def client() -> Generator[TestClient, None, None]:
 
 @pytest.fixture(autouse=True)
 def reset_dependencies():
+    from app.services.auth import user_cache
+
     # Ensure dependency overrides are cleared after each test.
     original_overrides = app.dependency_overrides.copy()
     yield
     app.dependency_overrides = original_overrides
+    # users cached from one test's fake session must not answer the next test
+    user_cache.clear()
 
 
 @pytest.fixture
@@ -37,7 +49,15 @@ def fake_site_settings_session():
 
     class _Session:
         def __init__(self):
-            self._settings = SiteSettings(id=1, social_links={"twitter": "https://twitter.com/example"}, theme={"mode": "dark"})
+            now = datetime.now(timezone.utc)
+            self._settings = SiteSettings(
+                id=1,
+                social_links={"twitter": "https://twitter.com/example"},
+                theme={"mode": "dark"},
+                manual_total_views=0,
+                created_at=now,
+                updated_at=now,
+            )
 
         def query(self, model):
             assert model is SiteSettings
@@ -52,7 +72,42 @@ def fake_site_settings_session():
         def refresh(self, instance):
             return None
 
-    def _override():
+        async def run_sync(self, fn, *args, **kwargs):
+            return fn(self, *args, **kwargs)
+
+    async def _override():
         yield _Session()
 
     return _override
+
+
+@pytest.fixture
+def sqlite_session_factory():
+    """Session factory on in-memory SQLite for routes touching only portable tables."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    from app.models.wc_link import WCLink
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    WCLink.__table__.create(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Fail the test if the block runs more SQL statements than ``limit``."""
+    from contextlib import contextmanager
+
+    from app.db.query_stats import capture_queries
+
+    @contextmanager
+    def _assert(limit: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, f"expected at most {limit} queries, ran {stats.count}: {list(stats.shapes)}"
+
+    return _assert
@@ -15,9 +15,13 @@ def test_health_endpoint_returns_ok(client: TestClient):
 
 
 def test_site_settings_get_uses_override(client: TestClient, fake_site_settings_session):
-    from app.api.deps import get_db_session
+    from contextlib import asynccontextmanager
+
+    from app.api.deps import get_async_read_session_opener
+    from app.api.routers.site_settings import public_settings_cache
 
-    app.dependency_overrides[get_db_session] = fake_site_settings_session
+    public_settings_cache.clear()
+    app.dependency_overrides[get_async_read_session_opener] = lambda: asynccontextmanager(fake_site_settings_session)
     response = client.get("/site/settings")
     assert response.status_code == 200
     data = response.json()
@@ -106,3 +110,1700 @@ def test_wc_order_webhook_requires_secret(client: TestClient):
         headers={"Content-Type": "application/json"},
     )
     assert response.status_code == 503
+
+
+def _signed_wc_request(payload: dict, secret: str) -> tuple[bytes, str]:
+    import base64
+    import hashlib
+    import hmac
+
+    body = json.dumps(payload).encode("utf-8")
+    signature = base64.b64encode(hmac.new(secret.encode("utf-8"), body, hashlib.sha256).digest()).decode("utf-8")
+    return body, signature
+
+
+def test_wc_order_webhook_batches_stock_updates(client: TestClient, monkeypatch, sqlite_session_factory, assert_max_queries):
+    from app.api.deps import get_db_session
+    from app.models.wc_link import WCLink, WCProductKind, WCSyncState
+
+    monkeypatch.setattr(settings, "WC_WEBHOOK_SECRET", "whsec")
+    with sqlite_session_factory() as db:
+        for product_id, quantity in ((1, 5), (2, 1), (3, None)):
+            db.add(
+                WCLink(
+                    wc_product_id=product_id,
+                    kind=WCProductKind.PAINTING,
+                    sync_state=WCSyncState.SYNCED,
+                    stock_status="instock",
+                    stock_quantity=quantity,
+                )
+            )
+        db.commit()
+
+    def _override():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = _override
+    line_items = [{"product_id": product_id % 3 + 1, "quantity": 1} for product_id in range(30)]
+    line_items.append({"product_id": 99, "quantity": 4})
+    body, signature = _signed_wc_request({"id": 789, "line_items": line_items}, "whsec")
+
+    with assert_max_queries(1):
+        response = client.post(
+            "/integrations/wc/webhooks/order",
+            content=body,
+            headers={"Content-Type": "application/json", "x-wc-webhook-signature": signature},
+        )
+    assert response.status_code == 202
+
+    with sqlite_session_factory() as db:
+        links = {link.wc_product_id: link for link in db.query(WCLink).all()}
+    assert links[1].stock_quantity == 0
+    assert links[1].stock_status == "outofstock"
+    assert links[2].stock_quantity == 0
+    assert links[3].stock_quantity is None
+    assert links[3].stock_status == "instock"
+    assert all(link.notes == "Updated by order #789" for link in links.values())
+
+
+def test_wc_fetch_modified_products_reads_every_page(monkeypatch):
+    from datetime import datetime, timezone
+
+    import httpx
+
+    from app.services import woocommerce
+
+    calls: list[dict] = []
+
+    def _fake_send(method, path, *, params=None, json=None):
+        calls.append(params)
+        page = params["page"]
+        return httpx.Response(200, json=[{"id": page}], headers={"X-WP-TotalPages": "3"})
+
+    monkeypatch.setattr(woocommerce, "_send", _fake_send)
+    products = woocommerce.fetch_modified_products(datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc))
+
+    assert sorted(product["id"] for product in products) == [1, 2, 3]
+    assert {params["modified_after"] for params in calls} == {"2026-01-02T03:04:05"}
+    assert all(params["per_page"] == settings.WC_RECONCILE_PAGE_SIZE for params in calls)
+
+
+def test_wc_reconcile_updates_only_changed_existing_links(monkeypatch, sqlite_session_factory):
+    from datetime import datetime, timedelta, timezone
+
+    from app.models.sync_watermark import SyncWatermark
+    from app.models.wc_link import WCLink, WCProductKind, WCSyncState
+    from app.services import woocommerce
+
+    SyncWatermark.__table__.create(sqlite_session_factory.kw["bind"])
+    with sqlite_session_factory() as db:
+        db.add_all(
+            [
+                WCLink(wc_product_id=1, kind=WCProductKind.BOOK, local_fk=7, sync_state=WCSyncState.PENDING, price=10, stock_status="instock", stock_quantity=3, notes="edited locally"),
+                WCLink(wc_product_id=2, kind=WCProductKind.PAINTING, local_fk=8, sync_state=WCSyncState.ERROR, price=20, stock_status="instock", stock_quantity=1, notes="push failed"),
+            ]
+        )
+        db.commit()
+
+    newest = datetime.now(timezone.utc).replace(microsecond=0) + timedelta(minutes=1)
+    products = [
+        {"id": 1, "price": "12.50", "stock_status": "instock", "stock_quantity": 2, "date_modified_gmt": (newest - timedelta(minutes=5)).isoformat()},
+        {"id": 2, "price": "20", "stock_status": "instock", "stock_quantity": 1, "date_modified_gmt": newest.isoformat()},
+        # merch sold only through the store: no local row, no link
+        {"id": 3, "price": "5", "stock_status": "instock", "stock_quantity": 9, "date_modified_gmt": (newest - timedelta(minutes=9)).isoformat()},
+    ]
+    monkeypatch.setattr(woocommerce, "fetch_modified_products", lambda since: products)
+    monkeypatch.setattr(woocommerce, "_RECONCILE_BATCH", 1)
+    with sqlite_session_factory() as db:
+        result = woocommerce.reconcile_products(db)
+
+    assert (result.fetched, result.updated) == (3, 1)
+    assert result.watermark == newest
+    with sqlite_session_factory() as db:
+        links = {link.wc_product_id: link for link in db.query(WCLink).all()}
+        assert db.get(SyncWatermark, woocommerce.RECONCILE_WATERMARK).value.replace(tzinfo=timezone.utc) == result.watermark
+    assert set(links) == {1, 2}
+    assert (float(links[1].price), links[1].stock_quantity, links[1].kind) == (12.5, 2, WCProductKind.BOOK)
+    assert links[1].sync_state == WCSyncState.PENDING and links[1].notes == "Reconciled from store"
+    # unchanged in the store: left exactly as it was
+    assert links[2].sync_state == WCSyncState.ERROR and links[2].notes == "push failed" and links[2].last_synced_at is None
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    from app.core.resilience import CircuitBreaker, CircuitOpenError, CircuitState
+
+    now = [0.0]
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_timeout=10, clock=lambda: now[0])
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+    try:
+        breaker.before_call()
+    except CircuitOpenError as exc:
+        assert exc.retry_after == 10
+    else:
+        raise AssertionError("open breaker must reject calls")
+
+    now[0] = 10.0
+    assert breaker.state == CircuitState.HALF_OPEN
+    breaker.before_call()
+    try:
+        breaker.before_call()
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("half-open breaker allows a single trial call")
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+
+
+def test_wc_requests_fail_fast_while_circuit_open(client: TestClient, monkeypatch):
+    import httpx
+
+    from app.services import woocommerce
+
+    def _unreachable(*args, **kwargs):
+        raise httpx.ConnectError("store down")
+
+    monkeypatch.setattr(settings, "WC_STORE_URL", "http://store.invalid")
+    monkeypatch.setattr(settings, "WC_CONSUMER_KEY", "ck")
+    monkeypatch.setattr(settings, "WC_CONSUMER_SECRET", "cs")
+    monkeypatch.setattr(settings, "WC_RETRY_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(woocommerce.httpx, "request", _unreachable)
+    breaker = woocommerce.CircuitBreaker("woocommerce", failure_threshold=2, reset_timeout=60)
+    monkeypatch.setattr(woocommerce, "breaker", breaker)
+
+    try:
+        woocommerce._request("GET", "products")
+    except woocommerce.WooCommerceUnavailableError as exc:
+        assert exc.retry_after > 0
+    else:
+        raise AssertionError("expected the breaker to open during retries")
+    assert breaker.snapshot()["failures"] == 2
+
+    monkeypatch.setattr("app.api.routers.health.wc_breaker", breaker)
+    assert client.get("/health").json()["integrations"]["woocommerce"]["state"] == "open"
+
+
+def test_commerce_listing_cache_invalidated_by_webhook(client: TestClient, monkeypatch, sqlite_session_factory):
+    from app.api.deps import get_current_user, get_db_session
+    from app.models.user import User, UserRole
+    from app.models.wc_link import WCSyncState
+    from app.schemas.commerce import CommerceProduct, CommerceProductList
+    from app.services.woocommerce import LISTING_TABLES, listing_cache
+
+    cached = CommerceProductList(
+        items=[
+            CommerceProduct(
+                wc_product_id=7,
+                kind="PAINTING",
+                local_id=None,
+                title="Cached",
+                price=10.0,
+                stock_status="instock",
+                stock_quantity=1,
+                sync_state=WCSyncState.SYNCED,
+                last_synced_at=None,
+            )
+        ]
+    )
+    listing_cache.clear()
+    listing_cache.set((None, None, "instock", None, None, 100), cached, tags=LISTING_TABLES)
+
+    def _override():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = _override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="r@example.com", role=UserRole.READER)
+    response = client.get("/commerce/products", params={"stock_status": "instock"})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["title"] == "Cached"
+
+    monkeypatch.setattr(settings, "WC_WEBHOOK_SECRET", "whsec")
+    body, signature = _signed_wc_request({"id": 7, "price": "12.5", "stock_status": "outofstock"}, "whsec")
+    response = client.post(
+        "/integrations/wc/webhooks/product",
+        content=body,
+        headers={"Content-Type": "application/json", "x-wc-webhook-signature": signature},
+    )
+    assert response.status_code == 202
+    # dropped by the wc_links commit itself, as NOTIFY does in the other workers
+    assert len(listing_cache) == 0
+
+
+def test_commerce_listing_cursor_survives_rows_updated_mid_walk(client: TestClient, sqlite_session_factory):
+    from sqlalchemy import text, update
+
+    from app.api.deps import get_current_user, get_db_session
+    from app.models.user import User, UserRole
+    from app.models.wc_link import WCLink, WCProductKind
+
+    with sqlite_session_factory() as db:
+        # only the joined columns; the real table uses Postgres-only types
+        db.execute(text("CREATE TABLE paintings (id INTEGER PRIMARY KEY, title VARCHAR)"))
+        db.commit()
+    with sqlite_session_factory() as db:
+        db.add_all([WCLink(wc_product_id=product_id, kind=WCProductKind.BOOK) for product_id in range(1, 6)])
+        db.commit()
+
+    def _override():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = _override
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="r@example.com", role=UserRole.READER)
+    first = client.get("/commerce/products", params={"limit": 2}).json()
+    # a webhook touches rows on both sides of the cursor between pages
+    with sqlite_session_factory() as db:
+        db.execute(update(WCLink).where(WCLink.wc_product_id.in_([1, 5])).values(stock_status="outofstock"))
+        db.commit()
+    seen = [item["wc_product_id"] for item in first["items"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        page = client.get("/commerce/products", params={"limit": 2, "cursor": cursor}).json()
+        seen += [item["wc_product_id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+    assert seen == [5, 4, 3, 2, 1]
+    assert client.get("/commerce/products", params={"cursor": "x"}).status_code == 400
+
+
+def test_instrumented_pool_records_checkouts(tmp_path):
+    from sqlalchemy import create_engine, text
+
+    from app.db.pool import InstrumentedQueuePool, pool_snapshot
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", poolclass=InstrumentedQueuePool, pool_size=1, max_overflow=1)
+    with engine.connect() as first, engine.connect() as second:
+        first.execute(text("select 1"))
+        second.execute(text("select 1"))
+        busy = pool_snapshot(engine.pool)
+    assert busy["in_use"] == 2
+    assert busy["overflow"] == 1
+    assert pool_snapshot(engine.pool)["checkouts"] == 2
+    engine.dispose()
+
+
+def test_pgbouncer_mode_disables_prepared_statements(monkeypatch):
+    from app.db.pool import engine_options
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_TRANSACTION_MODE", True)
+    assert engine_options()["connect_args"] == {"prepare_threshold": None}
+
+    monkeypatch.setattr(settings, "DB_PGBOUNCER_TRANSACTION_MODE", False)
+    monkeypatch.setattr(settings, "DB_STATEMENT_TIMEOUT_MS", 5000)
+    assert engine_options()["connect_args"] == {"options": "-c statement_timeout=5000"}
+
+
+def test_db_pool_metrics_endpoint(client: TestClient):
+    from app.api.deps import get_current_user
+    from app.models.user import User, UserRole
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="a@example.com", role=UserRole.ADMIN)
+    response = client.get("/metrics/db-pool")
+    assert response.status_code == 200
+    assert {"size", "in_use", "overflow", "checkouts", "wait_seconds_max"} <= response.json()["sync"].keys()
+
+
+def test_read_routing_fails_over_and_respects_recent_writes(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from starlette.requests import Request
+
+    from app.core.resilience import CircuitBreaker, CircuitState
+    from app.db import routing
+    from app.db.session import engine as primary_engine
+
+    def _replica(path):
+        engine = create_engine(f"sqlite:///{path}")
+        return routing.Replica(
+            url=str(engine.url),
+            engine=engine,
+            async_engine=None,
+            session_factory=sessionmaker(bind=engine),
+            async_session_factory=None,
+            breaker=CircuitBreaker("db-replica", failure_threshold=1, reset_timeout=60),
+        )
+
+    down = _replica(tmp_path / "missing" / "down.db")
+    up = _replica(tmp_path / "up.db")
+    monkeypatch.setattr(routing.replicas, "replicas", [down, up])
+    monkeypatch.setattr(settings, "DB_WRITE_MARKER_PATH", tmp_path / "last-write")
+
+    def _bind_for(headers=()):
+        request = Request({"type": "http", "method": "GET", "path": "/blogs", "headers": list(headers)})
+        dependency = routing.get_read_db(request)
+        db = next(dependency)
+        bind = db.get_bind()
+        dependency.close()
+        return bind
+
+    assert _bind_for() is up.engine
+    assert down.breaker.state == CircuitState.OPEN
+    assert _bind_for([(b"authorization", b"Bearer token")]) is primary_engine
+
+    routing.mark_write()
+    assert _bind_for() is primary_engine
+
+
+def test_query_stats_reports_server_timing_and_repeats(client: TestClient, monkeypatch, sqlite_session_factory):
+    from sqlalchemy import select
+
+    from app.db import query_stats
+    from app.models.wc_link import WCLink
+
+    warnings: list[dict] = []
+    monkeypatch.setattr(query_stats.logger, "warning", lambda event, **kw: warnings.append(kw))
+    monkeypatch.setattr(settings, "DB_REPEATED_QUERY_THRESHOLD", 3)
+
+    stats, token = query_stats.start_request("GET /test")
+    try:
+        with sqlite_session_factory() as db:
+            db.execute(select(WCLink).where(WCLink.id.in_([1, 2])))
+            db.execute(select(WCLink).where(WCLink.id.in_([1, 2, 3])))
+            db.execute(select(WCLink).where(WCLink.id.in_([4])))
+    finally:
+        query_stats.finish_request(token)
+
+    assert stats.count == 3
+    assert len(warnings) == 1
+    assert warnings[0]["route"] == "GET /test"
+
+    response = client.get("/health")
+    assert response.headers["Server-Timing"].startswith("db;dur=")
+
+
+def test_slow_query_log_ranks_fingerprints(client: TestClient, monkeypatch, sqlite_session_factory):
+    from sqlalchemy import select
+
+    from app.api.deps import get_current_user
+    from app.db.slow_queries import fingerprint, slow_query_log
+    from app.models.user import User, UserRole
+    from app.models.wc_link import WCLink
+
+    assert fingerprint("SELECT * FROM t WHERE a = 'x' AND b IN ($1, $2) LIMIT 20") == fingerprint(
+        "SELECT * FROM t WHERE a = 'it''s'  AND b IN ($1) LIMIT 5"
+    )
+
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_LOG_ENABLED", True)
+    monkeypatch.setattr(settings, "DB_SLOW_QUERY_THRESHOLD_MS", 0)
+    slow_query_log.reset()
+    with sqlite_session_factory() as db:
+        db.execute(select(WCLink).where(WCLink.notes == "secret@example.com"))
+        db.execute(select(WCLink).where(WCLink.notes == "other"))
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="a@example.com", role=UserRole.ADMIN)
+    response = client.get("/metrics/slow-queries", params={"order_by": "calls"})
+    assert response.status_code == 200
+    top = response.json()["items"][0]
+    assert top["calls"] == 2
+    assert "secret@example.com" not in str(top)
+    assert top["last_parameters"] == ["<str len=5>"]
+
+    assert client.delete("/metrics/slow-queries").status_code == 204
+    assert len(slow_query_log) == 0
+
+
+def test_home_payload_is_cached_with_etag_and_dropped_on_writes(
+    client: TestClient, monkeypatch, fake_site_settings_session, sqlite_session_factory
+):
+    from contextlib import asynccontextmanager
+
+    from app.api.routers import home
+    from app.models.hero_slide import HeroSlide
+
+    loads: list[int] = []
+    opened: list[int] = []
+
+    def _open(request):
+        opened.append(1)
+        return asynccontextmanager(fake_site_settings_session)()
+
+    async def _blogs(db, limit):
+        loads.append(limit)
+        return []
+
+    async def _featured(db, blog_id):
+        return None
+
+    async def _empty(db, *args):
+        return []
+
+    async def _nothing(db):
+        return None
+
+    monkeypatch.setattr(home, "async_read_session", _open)
+    monkeypatch.setattr(home, "read_latest_blogs", _blogs)
+    monkeypatch.setattr(home, "read_published_blog", _featured)
+    monkeypatch.setattr(home, "read_hero_slides", _empty)
+    monkeypatch.setattr(home, "read_enabled_sections", _empty)
+    monkeypatch.setattr(home, "read_published_paintings", _empty)
+    monkeypatch.setattr(home, "read_philosophy", _nothing)
+    home.home_cache.clear()
+
+    first = client.get("/home", params={"blogs_limit": 6})
+    assert first.status_code == 200
+    assert first.json()["settings"]["theme"]["mode"] == "dark"
+    assert first.json()["featured_blog"] is None
+    # every part is read on one session, so a miss holds a single pool connection
+    assert len(opened) == 1
+    etag = first.headers["ETag"]
+
+    revalidated = client.get("/home", params={"blogs_limit": 6}, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert loads == [6]
+
+    engine = sqlite_session_factory.kw["bind"]
+    HeroSlide.__table__.create(engine)
+    with sqlite_session_factory() as db:
+        db.add(HeroSlide(image_url="/media/a.jpg", sort=0))
+        db.commit()
+
+    client.get("/home", params={"blogs_limit": 6})
+    assert loads == [6, 6]
+
+
+def test_singleton_cache_serves_hits_and_drops_on_remote_notify(client: TestClient):
+    from datetime import datetime, timezone
+
+    import psycopg
+
+    from app.api.routers.cms.philosophy import philosophy_cache
+    from app.db.invalidation import listener
+    from app.schemas.philosophy import PhilosophyRead
+
+    now = datetime.now(timezone.utc)
+    philosophy_cache.set(
+        "philosophy", PhilosophyRead(id=1, title="Night", created_at=now, updated_at=now), tags=("philosophy",)
+    )
+    response = client.get("/philosophy")
+    assert response.status_code == 200
+    assert response.json()["title"] == "Night"
+
+    generation = philosophy_cache.generation
+    listener._on_notify(psycopg.Notify("memshaheb_cache", "philosophy", 4242))
+    assert len(philosophy_cache) == 0
+
+    # a load that started before the invalidation must not repopulate the cache
+    philosophy_cache.set("philosophy", PhilosophyRead(id=1, title="Stale", created_at=now, updated_at=now), generation=generation)
+    assert philosophy_cache.get("philosophy") is None
+
+
+def test_ttl_cache_tag_index_forgets_evicted_expired_and_replaced_entries():
+    from app.core.cache import TTLCache
+
+    now = [0.0]
+    cache: TTLCache[int] = TTLCache(ttl=10, maxsize=4, clock=lambda: now[0])
+    # e.g. listings keyed by free-text search: every key is new
+    for index in range(1000):
+        cache.set(("search", index), index, tags=("blogs", f"query-{index}"))
+    assert len(cache) == 4
+    assert cache._tags["blogs"] == {("search", index) for index in range(996, 1000)}
+    assert len(cache._tags) == 5
+
+    cache.set(("search", 999), 0, tags=("paintings",))
+    assert "query-999" not in cache._tags and cache._tags["paintings"] == {("search", 999)}
+    assert cache.invalidate_tags("paintings") == 1 and "paintings" not in cache._tags
+
+    now[0] = 11
+    assert all(cache.get(("search", index)) is None for index in range(996, 999))
+    assert cache._tags == {}
+
+
+def test_site_settings_answers_conditional_requests(client: TestClient, fake_site_settings_session):
+    from contextlib import asynccontextmanager
+
+    from app.api.deps import get_async_read_session_opener
+    from app.api.routers.site_settings import public_settings_cache
+
+    public_settings_cache.clear()
+    app.dependency_overrides[get_async_read_session_opener] = lambda: asynccontextmanager(fake_site_settings_session)
+    first = client.get("/site/settings")
+    etag, last_modified = first.headers["ETag"], first.headers["Last-Modified"]
+    assert etag.startswith('W/"')
+
+    assert client.get("/site/settings", headers={"If-None-Match": etag.removeprefix("W/")}).status_code == 304
+    assert client.get("/site/settings", headers={"If-Modified-Since": last_modified}).status_code == 304
+    # If-None-Match takes precedence over a still-valid If-Modified-Since
+    stale = client.get("/site/settings", headers={"If-None-Match": 'W/"other"', "If-Modified-Since": last_modified})
+    assert stale.status_code == 200
+    assert stale.json()["theme"]["mode"] == "dark"
+
+
+def test_response_cache_coalesces_serves_stale_and_invalidates(tmp_path, monkeypatch):
+    import asyncio
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    from app.middleware.response_cache import FileBackend, ResponseCacheMiddleware
+    from app.models.blog_category import BlogCategory
+
+    calls: list[str] = []
+
+    async def list_blogs(request):
+        calls.append(request.url.query)
+        await asyncio.sleep(0.05)
+        return JSONResponse({"n": len(calls)}, headers={"ETag": f'"v{len(calls)}"'})
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = FileBackend(tmp_path)
+    inner = Starlette(routes=[Route("/blogs", list_blogs)])
+    middleware = ResponseCacheMiddleware(inner, cache=cache)
+
+    async def _get(query: bytes, headers: list[tuple[bytes, bytes]] | None = None):
+        messages = []
+
+        async def _send(message):
+            messages.append(message)
+
+        async def _receive():
+            return {"type": "http.request", "body": b""}
+
+        scope = {
+            "type": "http",
+            "method": "GET",
+            "path": "/blogs",
+            "query_string": query,
+            "headers": headers or [],
+        }
+        await middleware(scope, _receive, _send)
+        start = messages[0]
+        return start["status"], dict(start["headers"]), messages[1]["body"]
+
+    async def _scenario():
+        # a stampede of identical requests (query order differs) reaches the route once
+        results = await asyncio.gather(*(_get(b"limit=5&tags=a" if i % 2 else b"tags=a&limit=5") for i in range(10)))
+        assert len(calls) == 1
+        assert {body for _, _, body in results} == {b'{"n":1}'}
+
+        status, headers, _ = await _get(b"limit=5&tags=a", [(b"if-none-match", b'"v1"')])
+        assert status == 304 and headers[b"x-cache"] == b"HIT"
+        assert (await _get(b"limit=5&tags=a", [(b"authorization", b"Bearer x")]))[2] == b'{"n":2}'
+
+        # expired but within the stale window: serve the old body, refresh in the background
+        monkeypatch.setattr(settings, "RESPONSE_CACHE_TTL_SECONDS", 0)
+        await _get(b"limit=1")
+        status, headers, body = await _get(b"limit=1")
+        assert headers[b"x-cache"] == b"STALE" and body == b'{"n":3}'
+        await asyncio.sleep(0.1)
+        assert len(calls) == 4
+
+    asyncio.run(_scenario())
+
+    # a commit touching blog_categories drops every /blogs entry
+    engine = create_engine("sqlite://")
+    BlogCategory.__table__.create(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(BlogCategory(name="Culture", slug="culture"))
+        db.commit()
+    assert cache.get("/blogs?limit=5&tags=a") is None
+
+
+def test_response_cache_runs_uncacheable_misses_once(monkeypatch):
+    import asyncio
+
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse
+    from starlette.routing import Route
+
+    from app.middleware.response_cache import MemoryBackend, ResponseCacheMiddleware
+
+    calls: list[str] = []
+
+    async def read_blog(request):
+        calls.append(request.path_params["blog_id"])
+        visitor = len(calls)
+        await asyncio.sleep(0.05)
+        if request.path_params["blog_id"] == "999":
+            return JSONResponse({"detail": "Blog not found"}, status_code=404)
+        if request.path_params["blog_id"] == "throttled":
+            # e.g. a per-client limit inside the route: only the first caller is over it
+            if visitor == 1:
+                return JSONResponse({"detail": "Rate limit exceeded"}, status_code=429)
+            return JSONResponse({"id": "throttled"})
+        response = JSONResponse({"id": request.path_params["blog_id"]})
+        response.set_cookie("visitor", str(visitor))
+        return response
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = MemoryBackend(maxsize=16)
+    middleware = ResponseCacheMiddleware(Starlette(routes=[Route("/blogs/{blog_id}", read_blog)]), cache=cache)
+
+    async def _get(path: str, method: str = "GET"):
+        messages = []
+
+        async def _send(message):
+            messages.append(message)
+
+        async def _receive():
+            return {"type": "http.request", "body": b""}
+
+        await middleware({"type": "http", "method": method, "path": path, "query_string": b"", "headers": []}, _receive, _send)
+        return messages[0]["status"], dict(messages[0]["headers"]), messages[1]["body"]
+
+    async def _scenario():
+        # errors are not stored and not shared: each waiter of a burst of 404s runs the route
+        missing = await asyncio.gather(*(_get("/blogs/999") for _ in range(5)))
+        assert calls == ["999"] * 5
+        assert {(status, body) for status, _, body in missing} == {(404, b'{"detail":"Blog not found"}')}
+        assert missing[0][1][b"x-cache"] == b"BYPASS"
+        assert cache.get("/blogs/999") is None
+        status, headers, body = await _get("/blogs/999", "HEAD")
+        assert (status, body, len(calls)) == (404, b"", 6)
+
+        # one client's 429 does not reach the clients coalesced behind it
+        calls.clear()
+        throttled = await asyncio.gather(*(_get("/blogs/throttled") for _ in range(3)))
+        assert sorted(status for status, _, _ in throttled) == [200, 200, 429]
+
+        # a cookie is for its own client only: replayed to it, run again for each waiter
+        calls.clear()
+        cookies = await asyncio.gather(*(_get("/blogs/1") for _ in range(3)))
+        assert len(calls) == 3
+        assert sorted(headers[b"set-cookie"] for _, headers, _ in cookies) == [f"visitor={n}; Path=/; SameSite=lax".encode() for n in (1, 2, 3)]
+        assert cache.get("/blogs/1") is None
+
+    asyncio.run(_scenario())
+
+
+def test_cache_headers_and_cdn_purge_by_surrogate_key(client: TestClient, fake_site_settings_session, monkeypatch):
+    import threading
+    from contextlib import asynccontextmanager
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app.api.deps import get_async_read_session_opener
+    from app.api.routers.site_settings import public_settings_cache
+    from app.models.blog_category import BlogCategory
+    from app.services import cdn
+
+    public_settings_cache.clear()
+    app.dependency_overrides[get_async_read_session_opener] = lambda: asynccontextmanager(fake_site_settings_session)
+    public = client.get("/site/settings")
+    assert public.headers["Cache-Control"] == (
+        f"public, max-age={settings.CACHE_PUBLIC_MAX_AGE_SECONDS}, s-maxage={settings.CACHE_PUBLIC_S_MAXAGE_SECONDS}, "
+        f"stale-while-revalidate={settings.CACHE_PUBLIC_STALE_WHILE_REVALIDATE_SECONDS}"
+    )
+    assert public.headers["Surrogate-Key"] == "site_settings"
+    # the 304 carries the same policy so the CDN keeps revalidating with it
+    revalidated = client.get("/site/settings", headers={"If-None-Match": public.headers["ETag"]})
+    assert revalidated.status_code == 304 and revalidated.headers["Cache-Control"].startswith("public")
+    signed_in = client.get("/site/settings", headers={"Authorization": "Bearer token"})
+    assert signed_in.headers["Cache-Control"] == "private, no-store"
+    assert "Surrogate-Key" not in signed_in.headers
+
+    purges: list[tuple[str | None, str | None]] = []
+
+    class FakeCDN(BaseHTTPRequestHandler):
+        def do_POST(self):
+            purges.append((self.headers.get("Surrogate-Key"), self.headers.get("Authorization")))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), FakeCDN)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(
+        cdn.purger, "backend", cdn.HttpPurgeBackend(f"http://127.0.0.1:{server.server_port}/purge", token="secret")
+    )
+    try:
+        engine = create_engine("sqlite://")
+        BlogCategory.__table__.create(engine)
+        with sessionmaker(bind=engine)() as db:
+            db.add(BlogCategory(name="Culture", slug="culture"))
+            db.commit()
+        cdn.purger.flush(timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert purges == [("blog_categories blogs category:1 home home_sections", "Bearer secret")]
+
+
+def test_asgi_middlewares_tag_requests_and_pin_writers(tmp_path, monkeypatch):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from starlette.applications import Starlette
+    from starlette.responses import PlainTextResponse, StreamingResponse
+    from starlette.routing import Route
+
+    from app.db.routing import READ_PRIMARY_COOKIE
+    from app.middleware.read_your_writes import ReadYourWritesMiddleware
+    from app.middleware.request_id import RequestIDMiddleware
+    from app.models.blog_category import BlogCategory
+    from app.models.wc_link import WCLink, WCProductKind
+
+    monkeypatch.setattr(settings, "DB_WRITE_MARKER_PATH", tmp_path / "last-write")
+
+    async def stream(request):
+        async def _chunks():
+            yield request.state.request_id.encode()
+            yield b"|done"
+
+        return StreamingResponse(_chunks())
+
+    async def write(request):
+        return PlainTextResponse("ok")
+
+    inner = Starlette(routes=[Route("/stream", stream), Route("/write", write, methods=["POST"])])
+    with TestClient(RequestIDMiddleware(ReadYourWritesMiddleware(inner))) as raw:
+        streamed = raw.get("/stream", headers={settings.REQUEST_ID_HEADER: "abc123"})
+        assert streamed.text == "abc123|done"
+        assert streamed.headers[settings.REQUEST_ID_HEADER] == "abc123"
+        assert "app;dur=" in streamed.headers["Server-Timing"]
+        assert READ_PRIMARY_COOKIE not in streamed.cookies
+
+        # sign-ins, contact forms and webhooks have nothing to read back
+        anonymous = raw.post("/write")
+        assert len(anonymous.headers[settings.REQUEST_ID_HEADER]) == 32
+        assert READ_PRIMARY_COOKIE not in anonymous.cookies
+
+        written = raw.post("/write", headers={"Authorization": "Bearer token"})
+        assert float(written.cookies[READ_PRIMARY_COOKIE]) > 0
+        assert "httponly" in written.headers["set-cookie"].lower()
+        assert not (tmp_path / "last-write").exists()
+
+    # only commits that change public content pin the whole host
+    engine = create_engine("sqlite://")
+    WCLink.__table__.create(engine)
+    BlogCategory.__table__.create(engine)
+    with sessionmaker(bind=engine)() as db:
+        db.add(WCLink(wc_product_id=1, kind=WCProductKind.BOOK))
+        db.commit()
+        assert not (tmp_path / "last-write").exists()
+        db.add(BlogCategory(name="Culture", slug="culture"))
+        db.commit()
+    assert (tmp_path / "last-write").exists()
+
+
+def test_gcra_limits_are_shared_and_keyed_by_real_client(tmp_path, monkeypatch):
+    import asyncio
+
+    from fastapi import FastAPI
+
+    from app.core import rate_limit
+    from app.core.security import create_access_token
+    from app.middleware.rate_limit import RateLimitMiddleware
+
+    rate = rate_limit.Rate.parse("3/minute")
+    # two workers on one host open the same file independently
+    worker_a = rate_limit.FileStore(tmp_path / "limits.bin", slots=64)
+    worker_b = rate_limit.FileStore(tmp_path / "limits.bin", slots=64)
+
+    async def _hits():
+        return [await (worker_a if i % 2 else worker_b).hit("ip:1.2.3.4", rate, 1000.0) for i in range(4)]
+
+    decisions = asyncio.run(_hits())
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert decisions[3].retry_after == 20.0
+    # one emission interval later a single request fits again
+    assert asyncio.run(worker_a.hit("ip:1.2.3.4", rate, 1020.0)).allowed
+
+    async def _contended():
+        import fcntl
+
+        # another worker holds the lock: the check waits off the loop, which keeps ticking
+        with open(tmp_path / "limits.bin", "rb") as other:
+            fcntl.flock(other, fcntl.LOCK_EX)
+            check = asyncio.create_task(worker_b.hit("ip:5.6.7.8", rate, 1000.0))
+            ticks = 0
+            for _ in range(5):
+                await asyncio.sleep(0.01)
+                ticks += 1
+            assert ticks == 5 and not check.done()
+            fcntl.flock(other, fcntl.LOCK_UN)
+        return await asyncio.wait_for(check, 5)
+
+    assert asyncio.run(_contended()).allowed
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "TRUSTED_PROXIES", ["10.0.0.0/8"])
+    limiter = rate_limit.RateLimiter(rate_limit.MemoryStore(), default="5/minute")
+    inner = FastAPI()
+
+    @inner.get("/login", dependencies=[limiter.limit("2/minute")])
+    def login():
+        return {"ok": True}
+
+    @inner.get("/upload", dependencies=[limiter.limit("1/minute", per="user")])
+    def upload():
+        return {"ok": True}
+
+    @inner.get("/plain")
+    def plain():
+        return {"ok": True}
+
+    inner.add_middleware(RateLimitMiddleware, limiter=limiter)
+
+    async def behind_proxy(scope, receive, send):
+        await inner({**scope, "client": ("10.0.0.2", 5000)}, receive, send)
+
+    with TestClient(behind_proxy) as raw:
+        def _get(path, forwarded, **headers):
+            return raw.get(path, headers={"X-Forwarded-For": forwarded, **headers})
+
+        # the proxy is trusted, so the spoofed left-most hop is ignored and 203.0.113.9 is the client
+        first = _get("/login", "6.6.6.6, 203.0.113.9")
+        assert first.headers["X-RateLimit-Limit"] == "2" and first.headers["X-RateLimit-Remaining"] == "1"
+        assert _get("/login", "203.0.113.9").status_code == 200
+        blocked = _get("/login", "7.7.7.7, 203.0.113.9")
+        assert blocked.status_code == 429 and blocked.headers["Retry-After"] == "30"
+        assert _get("/login", "198.51.100.1").status_code == 200
+
+        token = create_access_token("42")
+        assert _get("/upload", "198.51.100.2", Authorization=f"Bearer {token}").status_code == 200
+        # same user from another address shares the per-user budget
+        assert _get("/upload", "198.51.100.3", Authorization=f"Bearer {token}").status_code == 429
+        # routes without a limit of their own get the default per client IP
+        burst = [_get("/plain", "198.51.100.4") for _ in range(6)]
+        assert [response.status_code for response in burst][-1] == 429
+        assert burst[0].headers["X-RateLimit-Limit"] == "5"
+        # a route's own limit replaces the default, and unmatched paths are not limited
+        assert _get("/upload", "198.51.100.4").status_code == 200
+        assert [_get("/missing", "198.51.100.4").status_code for _ in range(3)] == [404, 404, 404]
+
+
+def test_default_rate_limit_covers_api_routes_only(client: TestClient, tmp_path, monkeypatch):
+    from starlette.routing import Mount
+
+    from app.core import rate_limit
+    from app.core.media_files import MediaFiles
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(rate_limit.limiter, "store", rate_limit.MemoryStore())
+    monkeypatch.setattr(rate_limit.limiter, "default", rate_limit.Rate.parse("60/minute"))
+    media = next(route for route in app.routes if isinstance(route, Mount) and route.path == "/media")
+    monkeypatch.setattr(media, "app", MediaFiles(tmp_path))
+    (tmp_path / "Ambient.mp3").write_bytes(bytes(4096))
+
+    # a gallery page with ranged audio: static media never spends the API budget
+    statuses = [
+        client.get("/media/Ambient.mp3", headers={"Range": f"bytes={i}-{i + 9}"} if i % 2 else {}).status_code
+        for i in range(70)
+    ]
+    assert set(statuses) == {200, 206}
+    assert all(client.get("/no-such-route").status_code == 404 for _ in range(5))
+
+    # /health is held to its own 30/minute, not charged the default on top
+    health = [client.get("/health") for _ in range(31)]
+    assert health[0].headers["X-RateLimit-Limit"] == "30"
+    assert [response.status_code for response in health][-2:] == [200, 429]
+
+
+def test_metrics_aggregate_workers_and_expose_route_templates(client: TestClient, tmp_path, monkeypatch):
+    import os
+    import time
+
+    from app.core import metrics
+
+    registry = metrics.Registry(metrics.MmapStore(tmp_path))
+    requests = metrics.Counter("demo_requests_total", "Requests.", ("route",), registry=registry)
+    in_flight = metrics.Gauge("demo_in_flight", "In flight.", registry=registry)
+    latency = metrics.Histogram("demo_seconds", "Latency.", ("route",), buckets=(0.1, 1.0), registry=registry)
+
+    requests.labels("/a").inc()
+    in_flight.inc()
+    latency.labels("/a").observe(0.05)
+    pid = os.fork()
+    if pid == 0:
+        # another worker: its counters outlive it, its gauges do not
+        requests.labels("/a").inc(2)
+        in_flight.inc(5)
+        latency.labels("/a").observe(0.5)
+        os._exit(0)
+    os.waitpid(pid, 0)
+
+    text = registry.render()
+    assert 'demo_requests_total{route="/a"} 3' in text
+    assert "demo_in_flight 1" in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 2' in text
+    assert 'demo_seconds_count{route="/a"} 2' in text
+
+    # the per-request recording path stays well under 50µs
+    from app.middleware import metrics as middleware
+
+    rounds = 5000
+    started = time.perf_counter()
+    for _ in range(rounds):
+        middleware.REQUESTS.labels("GET", "/blogs/{identifier}", 200).inc()
+        middleware.LATENCY.labels("GET", "/blogs/{identifier}").observe(0.003)
+        child = middleware.IN_FLIGHT.labels("/blogs/{identifier}")
+        child.inc()
+        child.dec()
+    assert (time.perf_counter() - started) / rounds < 50e-6
+
+    assert client.get("/metrics").status_code == 404
+    monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    client.get("/health")
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert 'http_requests_in_flight{route="/metrics"} 1' in response.text
+
+
+def test_tracing_reports_phases_to_admins_and_exports_otlp_spans(tmp_path, monkeypatch):
+    import json
+    import time
+
+    from fastapi import Depends, FastAPI
+
+    from app.api.deps import get_current_user_optional, get_db_session
+    from app.core import tracing
+    from app.core.security import create_access_token
+    from app.middleware.request_id import RequestIDMiddleware
+    from app.models.user import User, UserRole
+    from app.utils import image_processing
+
+    users = {1: User(id=1, email="admin@example.com", role=UserRole.ADMIN), 2: User(id=2, email="ed@example.com", role=UserRole.EDITOR)}
+
+    class _Session:
+        def get(self, _model, user_id):
+            return users.get(user_id)
+
+    def _fetch_and_resize():
+        with tracing.span("lqip fetch", phase="external", kind="client"):
+            time.sleep(0.02)
+        time.sleep(0.01)
+        return "done"
+
+    inner = FastAPI()
+    inner.dependency_overrides[get_db_session] = lambda: _Session()
+
+    @inner.post("/paintings")
+    def create(user=Depends(get_current_user_optional)):
+        result = image_processing.submit("lqip", _fetch_and_resize).result()
+        with tracing.span("serialize", phase="serialize"):
+            return {"result": result}
+
+    spans_path = tmp_path / "spans.jsonl"
+    monkeypatch.setattr(tracing, "processor", tracing.SpanProcessor(tracing.FileExporter(spans_path)))
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", False)
+    parent = "4bf92f3577b34da6a3ce929d0e0e4736"
+    with TestClient(RequestIDMiddleware(inner)) as raw:
+        admin = raw.post(
+            "/paintings",
+            headers={
+                "Authorization": f"Bearer {create_access_token('1')}",
+                "traceparent": f"00-{parent}-00f067aa0ba902b7-01",
+            },
+        )
+        editor = raw.post("/paintings", headers={"Authorization": f"Bearer {create_access_token('2')}"})
+        anonymous = raw.post("/paintings")
+
+    timing = {entry.split(";")[0]: entry for entry in admin.headers["Server-Timing"].split(", ")}
+    assert {"db", "auth", "image", "external", "serialize", "app"} <= set(timing)
+    assert float(timing["image"].split("dur=")[1]) >= 30
+    assert float(timing["external"].split("dur=")[1]) >= 20
+    # phase detail is for admins only, and the global switch is off
+    assert "Server-Timing" not in editor.headers and "Server-Timing" not in anonymous.headers
+
+    tracing.processor.flush()
+    documents = [json.loads(line) for line in spans_path.read_text().splitlines()]
+    assert len(documents) == 3
+    spans = documents[0]["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    by_name = {span["name"]: span for span in spans}
+    root = by_name["POST /paintings"]
+    assert {span["traceId"] for span in spans} == {parent}
+    assert root["parentSpanId"] == "00f067aa0ba902b7" and root["kind"] == 2
+    # spans opened on the image pool thread still hang off the request
+    assert by_name["image lqip"]["parentSpanId"] == root["spanId"]
+    assert by_name["lqip fetch"]["parentSpanId"] == by_name["image lqip"]["spanId"]
+    assert {"key": "http.route", "value": {"stringValue": "/paintings"}} in root["attributes"]
+
+
+def test_current_user_is_cached_by_token_version(client: TestClient, monkeypatch, sqlite_session_factory, assert_max_queries):
+    import asyncio
+
+    import bcrypt
+
+    from app.api.deps import get_db_session
+    from app.models.user import User, UserRole
+    from app.services.auth import issue_tokens_for_user
+
+    engine = sqlite_session_factory.kw["bind"]
+    User.__table__.create(engine)
+    password_hash = bcrypt.hashpw(b"old-password", bcrypt.gensalt(4)).decode()
+    with sqlite_session_factory() as db:
+        db.add_all(
+            [
+                User(id=1, email="admin@example.com", password_hash=password_hash, role=UserRole.ADMIN),
+                User(id=2, email="editor@example.com", password_hash=password_hash, role=UserRole.EDITOR),
+            ]
+        )
+        db.commit()
+        admin_token = issue_tokens_for_user(db.get(User, 1), session_id="s1", refresh_jti="j1")["access_token"]
+
+    def _db():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = _db
+    auth = {"Authorization": f"Bearer {admin_token}"}
+
+    with assert_max_queries(1):
+        assert client.get("/users/me", headers=auth).json()["email"] == "admin@example.com"
+    with assert_max_queries(0):
+        assert client.get("/users/me", headers=auth).status_code == 200
+
+    # a cached user is attached to the request's session, so handlers can still write through it
+    assert client.put("/users/me", json={"display_name": "Curator"}, headers=auth).status_code == 200
+    with assert_max_queries(1):
+        assert client.get("/users/me", headers=auth).json()["display_name"] == "Curator"
+
+    # handlers that hash await the bcrypt pool instead of parking a threadpool thread on it
+    from app.api.routers import users
+
+    hashing = (users.create_user_endpoint, users.change_password, users.update_user_admin)
+    assert all(asyncio.iscoroutinefunction(handler) for handler in hashing)
+    created = client.post("/users", json={"email": "author@example.com", "password": "author-pass", "role": "AUTHOR"}, headers=auth)
+    assert created.status_code == 201
+    assert client.put(f"/users/{created.json()['id']}", json={"password": "other-pass"}, headers=auth).status_code == 200
+    with sqlite_session_factory() as db:
+        assert bcrypt.checkpw(b"other-pass", db.get(User, created.json()["id"]).password_hash.encode())
+
+    # a password change bumps the token version, which revokes tokens issued before it
+    changed = client.post("/users/me/password", json={"old_password": "old-password", "new_password": "new-password"}, headers=auth)
+    assert changed.status_code == 204
+    assert client.get("/users/me", headers=auth).status_code == 401
+    with sqlite_session_factory() as db:
+        assert db.get(User, 1).token_version == 1
+
+    monkeypatch.setattr(settings, "ACCESS_TOKEN_ROLE_CLAIMS", True)
+    with sqlite_session_factory() as db:
+        editor_token = issue_tokens_for_user(db.get(User, 2), session_id="s2", refresh_jti="j2")["access_token"]
+    # the role claim alone settles an admin-only route
+    with assert_max_queries(0):
+        assert client.delete("/users/1", headers={"Authorization": f"Bearer {editor_token}"}).status_code == 403
+
+    # a passing claim decodes the token once and takes the user from the cache
+    from app.api import deps
+    from app.models.blog_category import BlogCategory
+    from app.models.home_section import HomeSection
+
+    BlogCategory.__table__.create(engine)
+    HomeSection.__table__.create(engine)
+    decode_token = deps.decode_token
+    decoded: list[str] = []
+    monkeypatch.setattr(deps, "decode_token", lambda token: decoded.append(token) or decode_token(token))
+    editor_auth = {"Authorization": f"Bearer {editor_token}"}
+    assert client.get("/home/sections/admin", headers=editor_auth).status_code == 200
+    decoded.clear()
+    # only the section listing itself
+    with assert_max_queries(1):
+        assert client.get("/home/sections/admin", headers=editor_auth).status_code == 200
+    assert decoded == [editor_token]
+
+
+def test_login_throttles_before_bcrypt_and_rehashes_on_cost_change(client: TestClient, monkeypatch):
+    import bcrypt
+
+    from app.api.deps import get_async_db_session
+    from app.core import rate_limit
+    from app.models.user import User, UserRole
+    from app.services import auth as auth_service
+
+    user = User(
+        id=7,
+        email="painter@example.com",
+        password_hash=bcrypt.hashpw(b"s3cret-pass", bcrypt.gensalt(4)).decode(),
+        role=UserRole.AUTHOR,
+        token_version=0,
+    )
+
+    class _Result:
+        def scalars(self):
+            return self
+
+        def first(self):
+            return user
+
+    class _Session:
+        commits = 0
+
+        def add(self, _obj):
+            pass
+
+        async def execute(self, _statement):
+            return _Result()
+
+        async def commit(self):
+            _Session.commits += 1
+
+    async def _db():
+        yield _Session()
+
+    checks = []
+    real_verify = auth_service.averify_password
+
+    async def _counting_verify(plain, hashed):
+        checks.append(plain)
+        return await real_verify(plain, hashed)
+
+    app.dependency_overrides[get_async_db_session] = _db
+    monkeypatch.setattr(auth_service, "averify_password", _counting_verify)
+    monkeypatch.setattr(auth_service, "limiter", rate_limit.RateLimiter(rate_limit.MemoryStore()))
+    monkeypatch.setattr(auth_service, "_login_account_rate", rate_limit.Rate.parse("2/minute"))
+    monkeypatch.setattr(settings, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(settings, "PASSWORD_BCRYPT_ROUNDS", 5)
+
+    ok = client.post("/auth/login", json={"email": "painter@example.com", "password": "s3cret-pass"})
+    assert ok.status_code == 200 and ok.json()["access_token"]
+    # the stored hash is upgraded to the configured cost on a successful login (then the session is stored)
+    assert user.password_hash.startswith("$2b$05$") and _Session.commits == 2
+    assert bcrypt.checkpw(b"s3cret-pass", user.password_hash.encode())
+
+    wrong = client.post("/auth/login", json={"email": "Painter@example.com", "password": "guess"})
+    assert wrong.status_code == 401
+    throttled = client.post("/auth/login", json={"email": "painter@example.com", "password": "guess-2"})
+    assert throttled.status_code == 429 and int(throttled.headers["Retry-After"]) > 0
+    # the throttled attempt never reached bcrypt
+    assert checks == ["s3cret-pass", "guess"]
+
+
+def test_refresh_tokens_rotate_and_revocation_needs_no_lookup(client: TestClient, sqlite_session_factory, assert_max_queries):
+    from collections import namedtuple
+    from datetime import datetime, timedelta, timezone
+
+    from app.api.deps import get_db_session
+    from app.db.invalidation import listener
+    from app.models.auth_session import AuthSession
+    from app.models.user import User, UserRole
+    from app.services import sessions
+    from app.services.auth import issue_tokens_for_user
+
+    engine = sqlite_session_factory.kw["bind"]
+    User.__table__.create(engine)
+    AuthSession.__table__.create(engine)
+    expires = datetime.now(timezone.utc) + timedelta(days=1)
+    with sqlite_session_factory() as db:
+        user = User(id=3, email="reader@example.com", password_hash="x", role=UserRole.READER)
+        db.add_all([user, *(AuthSession(id=sid, user_id=3, refresh_jti="j0", expires_at=expires) for sid in ("s-a", "s-b"))])
+        db.commit()
+        first = issue_tokens_for_user(user, session_id="s-a", refresh_jti="j0")
+        other = issue_tokens_for_user(user, session_id="s-b", refresh_jti="j0")
+
+    def _db():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db_session] = _db
+
+    def _refresh(tokens):
+        return client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+
+    second = _refresh(first)
+    assert second.status_code == 200
+    # a retry of the token just rotated (two tabs refreshing together) is answered, not punished
+    assert _refresh(first).status_code == 200
+    # the user comes from the cache, so a refresh is the single rotating UPDATE
+    with assert_max_queries(1):
+        third = _refresh(second.json())
+    assert third.status_code == 200
+
+    # an older token coming back means it leaked: the whole session ends
+    assert _refresh(first).status_code == 401
+    assert _refresh(third.json()).status_code == 401
+    with assert_max_queries(0):
+        revoked = client.get("/auth/verify", headers={"Authorization": f"Bearer {third.json()['access_token']}"})
+    assert revoked.status_code == 401 and revoked.json()["detail"] == "Session revoked"
+
+    # logout ends only the current session
+    other_auth = {"Authorization": f"Bearer {other['access_token']}"}
+    assert client.get("/auth/verify", headers=other_auth).status_code == 200
+    assert client.post("/auth/logout", headers=other_auth).status_code == 204
+    assert client.get("/auth/verify", headers=other_auth).status_code == 401
+    with sqlite_session_factory() as db:
+        assert all(session.revoked_at is not None for session in db.query(AuthSession))
+
+    # revocations made by other workers arrive over NOTIFY
+    notify = namedtuple("Notify", "channel payload pid")
+    listener._on_notify(notify(settings.AUTH_REVOCATION_CHANNEL, "s-elsewhere", 1))
+    assert "s-elsewhere" in sessions.revoked and "s-unknown" not in sessions.revoked
+
+
+def test_revoked_session_reload_merges_with_local_revocations(monkeypatch, sqlite_session_factory):
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import session as db_session
+    from app.models.auth_session import AuthSession
+    from app.models.user import User
+    from app.services import sessions
+
+    engine = sqlite_session_factory.kw["bind"]
+    User.__table__.create(engine)
+    AuthSession.__table__.create(engine)
+    now = datetime.now(timezone.utc)
+    with sqlite_session_factory() as db:
+        db.add_all(
+            [
+                AuthSession(id="s-stored", user_id=3, refresh_jti="j0", expires_at=now + timedelta(days=1), revoked_at=now),
+                AuthSession(id="s-old", user_id=3, refresh_jti="j1", expires_at=now + timedelta(days=1), revoked_at=now - timedelta(days=1)),
+            ]
+        )
+        db.commit()
+    monkeypatch.setattr(db_session, "SessionLocal", sqlite_session_factory)
+
+    # revoked locally while the reload was reading: the reload's rows must not drop it
+    sessions.revoked.add("s-local")
+    sessions.load_revoked()
+    assert "s-local" in sessions.revoked and "s-stored" in sessions.revoked
+    assert "s-old" not in sessions.revoked
+
+
+def test_trusted_models_skip_response_validation_with_identical_bodies(client: TestClient, monkeypatch, sqlite_session_factory):
+    from datetime import datetime, timezone
+
+    from fastapi import routing
+    from fastapi.responses import ORJSONResponse
+
+    from app.api.deps import get_read_db_session
+    from app.models.museum_room import MuseumRoom
+    from app.schemas.museum import MuseumRoomRead
+
+    engine = sqlite_session_factory.kw["bind"]
+    MuseumRoom.__table__.create(engine)
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    with sqlite_session_factory() as db:
+        db.add_all([
+            MuseumRoom(id=2, title="Gallery B", slug="gallery-b", sort=1, created_at=now, updated_at=now),
+            MuseumRoom(id=1, title="Galerie A – été", slug="galerie-a", intro="Oil", sort=0, created_at=now, updated_at=now),
+        ])
+        db.commit()
+
+    def _db():
+        with sqlite_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_read_db_session] = _db
+    assert app.router.default_response_class is ORJSONResponse
+    revalidated: list[object] = []
+    serialize_response = routing.serialize_response
+
+    async def _counting(**kwargs):
+        revalidated.append(kwargs["response_content"])
+        return await serialize_response(**kwargs)
+
+    monkeypatch.setattr(routing, "serialize_response", _counting)
+
+    trusted = client.get("/museum/rooms")
+    assert trusted.status_code == 200
+    assert revalidated == []
+    assert trusted.headers["content-type"] == "application/json"
+    assert [room["slug"] for room in trusted.json()] == ["galerie-a", "gallery-b"]
+    assert "Surrogate-Key" in trusted.headers and "Cache-Control" in trusted.headers
+
+    monkeypatch.setattr(settings, "RESPONSE_VALIDATE_TRUSTED", True)
+    validated = client.get("/museum/rooms")
+    assert [type(room) for room in revalidated[0]] == [MuseumRoomRead, MuseumRoomRead]
+    assert validated.content == trusted.content
+    assert validated.headers["Cache-Control"] == trusted.headers["Cache-Control"]
+
+
+def test_compression_streams_negotiated_encodings_and_reuses_cached_variants(tmp_path, monkeypatch):
+    import asyncio
+    import gzip
+    import zlib
+
+    from starlette.applications import Starlette
+    from starlette.responses import Response, StreamingResponse
+    from starlette.routing import Route
+
+    from app.core import compression
+    from app.middleware.compression import CompressionMiddleware
+    from app.middleware.response_cache import FileBackend, ResponseCacheMiddleware
+
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    assert compression.negotiate("br;q=1, gzip;q=0.5") == "gzip"
+    assert compression.negotiate("gzip;q=0, identity") is None
+    assert compression.negotiate("*") == "gzip"
+    assert compression.negotiate("") is None
+
+    document = b'{"items":[' + b",".join(b'{"content_md":"%d word word word"}' % i for i in range(400)) + b"]}"
+    chunks = [document[:3000], document[3000:9000], document[9000:]]
+    produced: list[int] = []
+    fills: list[str] = []
+
+    async def stream(request):
+        async def _body():
+            for chunk in chunks:
+                produced.append(len(chunk))
+                yield chunk
+
+        return StreamingResponse(_body(), media_type="application/json", headers={"ETag": '"s1"'})
+
+    async def blogs(request):
+        fills.append(request.url.path)
+        return Response(document, media_type="application/json", headers={"ETag": '"b1"'})
+
+    async def small(request):
+        return Response(b'{"ok":true}', media_type="application/json")
+
+    async def whole(request):
+        return Response(document, media_type="application/json")
+
+    async def image(request):
+        return Response(b"\x89PNG" + bytes(4096), media_type="image/png")
+
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_ENABLED", True)
+    cache = FileBackend(tmp_path)
+    inner = Starlette(routes=[Route(path, handler) for path, handler in [("/stream", stream), ("/blogs", blogs), ("/small", small), ("/whole", whole), ("/image.png", image)]])
+    app_ = CompressionMiddleware(ResponseCacheMiddleware(inner, cache=cache))
+
+    async def _get(path: str, accept: bytes = b"gzip, deflate, br", extra: list | None = None):
+        messages = []
+        body_sizes = []
+
+        async def _send(message):
+            if message["type"] == "http.response.body":
+                # every chunk leaves as soon as the app produced it
+                body_sizes.append(sum(produced))
+            messages.append(message)
+
+        async def _receive():
+            if not received:
+                received.append(True)
+                return {"type": "http.request", "body": b""}
+            await asyncio.Event().wait()
+
+        received: list[bool] = []
+        scope = {"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": [(b"accept-encoding", accept)] + (extra or [])}
+        await app_(scope, _receive, _send)
+        headers = {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+        bodies = [message["body"] for message in messages[1:]]
+        return messages[0]["status"], headers, bodies, body_sizes
+
+    async def _scenario():
+        status, headers, bodies, sizes = await _get("/stream")
+        assert headers["content-encoding"] == "gzip" and "content-length" not in headers
+        assert headers["vary"] == "Accept-Encoding" and headers["etag"] == 'W/"s1"'
+        # Starlette closes the stream with an empty final chunk
+        assert sizes == [3000, 9000, len(document), len(document)]
+        # each flushed chunk decodes on its own, before the next one arrives
+        decoder = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        assert decoder.decompress(bodies[0]) == chunks[0]
+        assert gzip.decompress(b"".join(bodies)) == document
+        assert sum(map(len, bodies)) < len(document) / 4
+
+        status, headers, bodies, _ = await _get("/stream", accept=b"identity")
+        assert "content-encoding" not in headers and headers["vary"] == "Accept-Encoding"
+        assert b"".join(bodies) == document
+
+        _, headers, bodies, _ = await _get("/small")
+        assert "content-encoding" not in headers and bodies == [b'{"ok":true}']
+        # a body sent in one message is encoded whole and keeps its length
+        _, headers, bodies, _ = await _get("/whole")
+        assert headers["content-encoding"] == "gzip" and int(headers["content-length"]) == len(bodies[0])
+        assert gzip.decompress(bodies[0]) == document
+        _, headers, _, _ = await _get("/image.png")
+        assert "content-encoding" not in headers and "vary" not in headers
+
+        # the cache stores the identity body with a gzip copy made once, at fill time
+        _, miss, bodies, _ = await _get("/blogs")
+        assert miss["x-cache"] == "MISS" and miss["content-encoding"] == "gzip"
+        assert int(miss["content-length"]) == len(bodies[0]) and gzip.decompress(bodies[0]) == document
+        entry = cache.get("/blogs")
+        assert entry.body == document and set(entry.variants) == {"gzip"}
+        _, hit, hit_bodies, _ = await _get("/blogs")
+        assert hit["x-cache"] == "HIT" and hit_bodies == bodies
+        _, plain, plain_bodies, _ = await _get("/blogs", accept=b"identity")
+        assert plain["etag"] == '"b1"' and plain_bodies == [document] and plain["vary"] == "Accept-Encoding"
+        status, headers, _, _ = await _get("/blogs", extra=[(b"if-none-match", b'W/"b1"')])
+        assert status == 304 and "content-encoding" not in headers
+        assert fills == ["/blogs"]
+
+    asyncio.run(_scenario())
+
+
+def test_media_files_cache_descriptors_and_serve_ranges_and_precompressed_variants(tmp_path, monkeypatch):
+    import asyncio
+    import gzip
+    import os
+
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+
+    from app.core import compression
+    from app.core.media_files import FileCache, MediaFiles
+    from app.core.storage import content_hashed, precompress_file
+    from app.middleware.compression import CompressionMiddleware
+
+    monkeypatch.setattr(compression, "ENCODINGS", ("gzip",))
+    root = tmp_path / "media"
+    root.mkdir()
+    (tmp_path / "secret.txt").write_text("nope")
+    audio = root / "Ambient.mp3"
+    audio.write_bytes(bytes(range(256)) * 8)
+    photo = root / "photo.jpg"
+    photo.write_bytes(b"\xff\xd8" + bytes(2000))
+    photo = content_hashed(photo)
+    assert photo.name.startswith("photo.") and len(photo.suffixes) == 2 and not (root / "photo.jpg").exists()
+    svg = root / "logo.svg"
+    svg.write_text('<svg xmlns="http://www.w3.org/2000/svg">' + "<rect/>" * 400 + "</svg>")
+    precompress_file(svg)
+
+    now = [0.0]
+    opened: list[str] = []
+    cache = FileCache(maxsize=2, ttl=5, clock=lambda: now[0])
+    original_open = FileCache._open
+    monkeypatch.setattr(FileCache, "_open", staticmethod(lambda path, result, at: opened.append(path) or original_open(path, result, at)))
+    client = TestClient(CompressionMiddleware(Starlette(routes=[Mount("/media", MediaFiles(root, cache=cache))])))
+
+    response = client.get("/media/Ambient.mp3")
+    assert response.status_code == 200 and response.content == audio.read_bytes()
+    assert response.headers["content-type"] == "audio/mpeg" and response.headers["accept-ranges"] == "bytes"
+    assert response.headers["cache-control"] == f"public, max-age={settings.MEDIA_CACHE_MAX_AGE_SECONDS}"
+    etag = response.headers["etag"]
+    assert client.get(f"/media/{photo.name}").headers["cache-control"] == "public, max-age=31536000, immutable"
+
+    ranged = client.get("/media/Ambient.mp3", headers={"Range": "bytes=2-5"})
+    assert ranged.status_code == 206 and ranged.content == bytes([2, 3, 4, 5])
+    assert ranged.headers["content-range"] == "bytes 2-5/2048" and ranged.headers["content-length"] == "4"
+    assert client.get("/media/Ambient.mp3", headers={"Range": "bytes=-3"}).content == bytes([253, 254, 255])
+    unsatisfiable = client.get("/media/Ambient.mp3", headers={"Range": "bytes=4096-"})
+    assert unsatisfiable.status_code == 416 and unsatisfiable.headers["content-range"] == "bytes */2048"
+    assert client.get("/media/Ambient.mp3", headers={"Range": "bytes=0-1", "If-Range": etag}).status_code == 206
+    stale = client.get("/media/Ambient.mp3", headers={"Range": "bytes=0-1", "If-Range": '"old"'})
+    assert stale.status_code == 200 and len(stale.content) == 2048
+    assert client.get("/media/Ambient.mp3", headers={"If-None-Match": etag}).status_code == 304
+    # one open per file however many requests hit it
+    assert opened == [str(audio), str(photo)]
+
+    encoded = client.get("/media/logo.svg", headers={"Accept-Encoding": "gzip"})
+    assert encoded.headers["content-encoding"] == "gzip" and encoded.headers["vary"] == "Accept-Encoding"
+    assert int(encoded.headers["content-length"]) == (root / "logo.svg.gz").stat().st_size
+    assert encoded.content == svg.read_bytes() and "accept-ranges" not in encoded.headers
+    plain = client.get("/media/logo.svg", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.content == svg.read_bytes()
+    # a range is served from the identity file and the middleware leaves it alone
+    partial = client.get("/media/logo.svg", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-3"})
+    assert partial.status_code == 206 and partial.content == b"<svg" and "content-encoding" not in partial.headers
+    assert gzip.decompress((root / "logo.svg.gz").read_bytes()) == svg.read_bytes()
+
+    # the cache holds two files: the SVG and its variant pushed the audio out
+    opened.clear()
+    assert len(client.get("/media/Ambient.mp3").content) == 2048
+    assert opened == [str(audio)]
+    # a replaced file is picked up once its entry is older than the TTL
+    (root / "upload.tmp").write_bytes(b"new")
+    os.replace(root / "upload.tmp", audio)
+    assert len(client.get("/media/Ambient.mp3").content) == 2048
+    now[0] = 10
+    assert client.get("/media/Ambient.mp3").content == b"new"
+    assert opened == [str(audio), str(audio)]
+
+    assert client.get("/media/../secret.txt").status_code == 404
+    assert client.get("/media/missing.jpg").status_code == 404
+    assert client.post("/media/Ambient.mp3").status_code == 405
+
+    # a server offering zerocopysend gets the file itself; the held start still goes first
+    (root / "notes.txt").write_text("word " * 1000)
+    sent: list[dict] = []
+
+    async def _send(message):
+        sent.append(message)
+
+    async def _receive():
+        return {"type": "http.request", "body": b""}
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": "/media/notes.txt",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"accept-encoding", b"gzip")],
+        "extensions": {"http.response.zerocopysend": {}},
+    }
+    asyncio.run(client.app(scope, _receive, _send))
+    assert [message["type"] for message in sent] == ["http.response.start", "http.response.zerocopysend"]
+    headers = dict(sent[0]["headers"])
+    assert b"content-encoding" not in headers and headers[b"content-length"] == b"5000"
+
+
+def test_bulkheads_queue_hand_over_slots_and_shed_load_with_retry_after(client: TestClient, monkeypatch):
+    import asyncio
+
+    import httpx
+    from fastapi import FastAPI
+
+    from app.api import bulkheads
+    from app.api.deps import get_current_user
+    from app.models.user import User, UserRole
+
+    monkeypatch.setattr(bulkheads, "bulkheads", dict(bulkheads.bulkheads))
+    monkeypatch.setattr(settings, "BULKHEAD_MAX_WAIT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "BULKHEAD_MAX_QUEUE", 1)
+    monkeypatch.setattr(settings, "BULKHEAD_LIMITS", {"exports": 1})
+    gate = asyncio.Event()
+    order: list[str] = []
+    demo = FastAPI()
+
+    # the configured limit wins over the declared one
+    @demo.get("/export", dependencies=[bulkheads.bulkhead("exports", limit=5, only_if=lambda request: "q" in request.query_params)])
+    async def export(name: str, q: str | None = None):
+        order.append(name)
+        await gate.wait()
+        return {"name": name}
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=demo)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            first = asyncio.create_task(http.get("/export", params={"name": "first", "q": "1"}))
+            await asyncio.sleep(0.01)
+            second = asyncio.create_task(http.get("/export", params={"name": "second", "q": "1"}))
+            await asyncio.sleep(0.01)
+            # the single queue place is taken: rejected at once
+            full = await http.get("/export", params={"name": "third", "q": "1"})
+            # requests outside ``only_if`` never wait
+            unlimited = asyncio.create_task(http.get("/export", params={"name": "plain"}))
+            await asyncio.sleep(0.01)
+            busy = bulkheads.snapshot()["exports"]
+            gate.set()
+            responses = await asyncio.gather(first, second, unlimited)
+            # nothing releases the slot this time, so the waiter times out
+            gate.clear()
+            held = asyncio.create_task(http.get("/export", params={"name": "held", "q": "1"}))
+            await asyncio.sleep(0.01)
+            timed_out = await http.get("/export", params={"name": "late", "q": "1"})
+            gate.set()
+            await held
+            return full, busy, responses, timed_out
+
+    full, busy, responses, timed_out = asyncio.run(scenario())
+    assert full.status_code == 503 and full.headers["retry-after"] == "1"
+    assert busy["limit"] == 1 and busy["in_use"] == 1 and busy["queued"] == 1 and busy["saturation"] == 2
+    assert [response.json()["name"] for response in responses] == ["first", "second", "plain"]
+    assert order == ["first", "plain", "second", "held"]
+    assert timed_out.status_code == 503 and int(timed_out.headers["retry-after"]) >= 1
+
+    app.dependency_overrides[get_current_user] = lambda: User(id=1, email="a@example.com", role=UserRole.ADMIN)
+    snapshot = client.get("/metrics/bulkheads").json()
+    assert snapshot["exports"]["in_use"] == 0 and snapshot["exports"]["queued"] == 0
+    assert snapshot["exports"]["rejected"] == {"queue_full": 1, "timeout": 1}
+    assert {"uploads", "lqip", "woocommerce_sync", "search"} <= snapshot.keys()
+
+
+def test_bulkhead_slots_go_only_to_authorized_requests_doing_the_work(client: TestClient, monkeypatch):
+    import threading
+
+    from fastapi import FastAPI
+
+    from app.api import bulkheads
+    from app.api.deps import get_current_user
+    from app.models.user import User, UserRole
+
+    # refused callers are turned away before the bulkhead is reached
+    compartment = bulkheads.bulkheads["woocommerce_sync"]
+    acquired: list[str] = []
+    original_acquire = compartment.acquire
+
+    async def _acquire():
+        acquired.append(compartment.name)
+        await original_acquire()
+
+    monkeypatch.setattr(compartment, "acquire", _acquire)
+    assert client.post("/integrations/wc/sync/1", params={"kind": "painting"}).status_code == 401
+    app.dependency_overrides[get_current_user] = lambda: User(id=2, email="r@example.com", role=UserRole.READER)
+    assert client.post("/integrations/wc/sync/1", params={"kind": "painting"}).status_code == 403
+    assert acquired == [] and compartment.in_use == 0
+
+    # a sync handler holds a slot around the optional work only
+    monkeypatch.setattr(bulkheads, "bulkheads", dict(bulkheads.bulkheads))
+    monkeypatch.setattr(settings, "BULKHEAD_MAX_QUEUE", 0)
+    slot = bulkheads.bulkhead_slot("thumbnails", limit=1)
+    busy = threading.Event()
+    release = threading.Event()
+    demo = FastAPI()
+
+    @demo.get("/thumb")
+    def thumb(render: bool = False):
+        if not render:
+            return {"rendered": False}
+        with slot():
+            busy.set()
+            release.wait(5)
+        return {"rendered": True}
+
+    with TestClient(demo) as raw:
+        worker = threading.Thread(target=lambda: raw.get("/thumb", params={"render": "true"}))
+        worker.start()
+        assert busy.wait(5)
+        assert bulkheads.snapshot()["thumbnails"]["in_use"] == 1
+        assert raw.get("/thumb").json() == {"rendered": False}
+        full = raw.get("/thumb", params={"render": "true"})
+        assert full.status_code == 503 and "retry-after" in full.headers
+        release.set()
+        worker.join(5)
+    assert bulkheads.snapshot()["thumbnails"]["in_use"] == 0
+
+
+def test_async_read_handlers_run_on_a_real_async_session(client: TestClient, tmp_path):
+    import asyncio
+
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    from app.api.deps import get_async_read_db_session, get_async_read_session_opener
+    from app.api.routers.home_sections import enabled_sections_cache
+    from app.models.blog_category import BlogCategory
+    from app.models.home_section import HomeSection, HomeSectionKind
+    from app.models.page import Page, PageSection
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reads.db'}")
+    factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+
+    async def _seed():
+        async with engine.begin() as conn:
+            for model in (BlogCategory, HomeSection, Page, PageSection):
+                await conn.run_sync(model.__table__.create)
+        async with factory() as db:
+            page = Page(slug="about", title="About", is_active=True)
+            page.sections = [PageSection(title="Later", content="b", order=2), PageSection(title="First", content="a", order=1)]
+            db.add_all([
+                page,
+                Page(slug="draft", title="Draft", is_active=False),
+                HomeSection(kind=HomeSectionKind.AD, title="Shown", sort_order=2, enabled=True),
+                HomeSection(kind=HomeSectionKind.AD, title="Top", sort_order=1, enabled=True),
+                HomeSection(kind=HomeSectionKind.AD, title="Hidden", sort_order=0, enabled=False),
+            ])
+            await db.commit()
+
+    asyncio.run(_seed())
+
+    async def _session():
+        async with factory() as db:
+            yield db
+
+    enabled_sections_cache.clear()
+    app.dependency_overrides[get_async_read_db_session] = _session
+    app.dependency_overrides[get_async_read_session_opener] = lambda: factory
+    try:
+        page = client.get("/pages/about")
+        assert page.status_code == 200
+        assert [section["title"] for section in page.json()["sections"]] == ["First", "Later"]
+        assert client.get("/pages/about", headers={"If-None-Match": page.headers["ETag"]}).status_code == 304
+        assert client.get("/pages/draft").status_code == 404
+
+        sections = client.get("/home/sections")
+        assert sections.status_code == 200
+        assert [section["title"] for section in sections.json()] == ["Top", "Shown"]
+    finally:
+        enabled_sections_cache.clear()
+        asyncio.run(engine.dispose())